@@ -0,0 +1,6 @@
+"""
+CS331 Assignment 2: DNS resolution experiments on a Mininet topology
+
+Command line: python3 -m cn_a2 <command> --help
+Modules are not imported here; each subcommand loads only what it needs.
+"""
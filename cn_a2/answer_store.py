@@ -0,0 +1,174 @@
+"""
+Domain -> Answer Store
+One SQLite database shared by every harness, keyed by (domain, run ID, host),
+replacing the per-harness resolved_*.txt dumps. Text files in the old
+formats can still be exported from it.
+
+Run outside Mininet:
+  python3 -m cn_a2 answers lookup <domain> [--run-id RUN_ID]
+  python3 -m cn_a2 answers export <run_id> <host> --format part_b|part_d [--output FILE]
+"""
+
+import os
+import re
+import sqlite3
+import sys
+
+DB_FILE = 'results/answers.db'
+
+# DNS response codes (RFC 1035 / 6895)
+RCODES = {'NOERROR': 0, 'FORMERR': 1, 'SERVFAIL': 2, 'NXDOMAIN': 3, 'NOTIMP': 4, 'REFUSED': 5}
+RCODE_NAMES = {v: k for k, v in RCODES.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    domain     TEXT    NOT NULL,
+    run_id     TEXT    NOT NULL,
+    host       TEXT    NOT NULL,
+    answers    TEXT    NOT NULL,   -- comma-separated A records, '' if none
+    ttl        INTEGER,            -- minimum answer TTL (s), NULL if unknown
+    rcode      INTEGER NOT NULL,
+    latency_ms REAL,
+    PRIMARY KEY (domain, run_id, host)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS answers_by_run ON answers (run_id, host);
+"""
+
+UPSERT = """
+INSERT INTO answers (domain, run_id, host, answers, ttl, rcode, latency_ms)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (domain, run_id, host) DO UPDATE SET
+    answers = excluded.answers, ttl = excluded.ttl,
+    rcode = excluded.rcode, latency_ms = excluded.latency_ms
+"""
+
+
+def dig_rcode(dig_output):
+    """Response code from dig's header line (status: NOERROR), -1 if no reply"""
+    match = re.search(r'status: (\w+)', dig_output)
+    if not match:
+        return -1
+    return RCODES.get(match.group(1), -1)
+
+
+def dig_min_ttl(answer_section):
+    """Smallest TTL among the A records of a dig ANSWER SECTION, None if none"""
+    ttls = re.findall(r'\s(\d+)\s+IN\s+A\s', answer_section)
+    return min(int(t) for t in ttls) if ttls else None
+
+
+class AnswerStore:
+    """SQLite-backed store; use as a context manager or call close()"""
+
+    def __init__(self, path=DB_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def upsert_many(self, rows):
+        """
+        Bulk insert-or-update in one transaction. Each row is
+        (domain, run_id, host, answers, ttl, rcode, latency_ms) where
+        answers is a list of IPs.
+        """
+        with self.conn:
+            self.conn.executemany(UPSERT, (
+                (domain, run_id, host, ','.join(ips), ttl, rcode, latency)
+                for domain, run_id, host, ips, ttl, rcode, latency in rows
+            ))
+
+    def lookup(self, domain, run_id=None, host=None):
+        """All stored results for a domain (primary-key lookup), newest run first"""
+        sql = 'SELECT domain, run_id, host, answers, ttl, rcode, latency_ms FROM answers WHERE domain = ?'
+        args = [domain]
+        if run_id:
+            sql += ' AND run_id = ?'
+            args.append(run_id)
+        if host:
+            sql += ' AND host = ?'
+            args.append(host)
+        sql += ' ORDER BY run_id DESC'
+        return [self._row(r) for r in self.conn.execute(sql, args)]
+
+    def results(self, run_id, host):
+        """Every result of one host in one run, in domain order"""
+        cur = self.conn.execute(
+            'SELECT domain, run_id, host, answers, ttl, rcode, latency_ms FROM answers '
+            'WHERE run_id = ? AND host = ? ORDER BY domain', (run_id, host))
+        return [self._row(r) for r in cur]
+
+    @staticmethod
+    def _row(r):
+        return {
+            'domain': r[0], 'run_id': r[1], 'host': r[2],
+            'ips': r[3].split(',') if r[3] else [],
+            'ttl': r[4], 'rcode': r[5], 'latency_ms': r[6],
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================================
+# Text exports in the formats the harnesses used to write
+# ============================================================================
+
+def format_part_b(rows, host):
+    """domains/resolved_h*.txt layout (test_part_b / part_b_simple)"""
+    ok = [r for r in rows if r['rcode'] == 0 and r['ips']]
+    nodata = sum(1 for r in rows if r['rcode'] == 0 and not r['ips'])   # failures, as Status.NODATA
+    latencies = [r['latency_ms'] for r in ok if r['latency_ms'] is not None]
+    avg_latency = sum(latencies) / len(latencies) if latencies else 0
+    lines = [
+        f"DNS Resolution Results for {host.upper()}",
+        f"{'='*70}",
+        f"Total: {len(rows)}, Successful: {len(ok)}, Failed: {len(rows) - len(ok)} (NODATA: {nodata})",
+        f"Average Latency: {avg_latency:.2f} ms",
+        f"{'='*70}",
+        "",
+    ]
+    for r in ok:
+        lines.append(r['domain'])
+        for ip in r['ips']:
+            lines.append(f"  -> {ip}")
+        lines.append(f"  Latency: {r['latency_ms']:.2f} ms")
+        lines.append("")
+    return '\n'.join(lines) + '\n'
+
+
+def format_part_d(rows, host):
+    """results/resolved_h*_part_d.txt layout"""
+    return '\n'.join(f"{r['domain']}: {', '.join(r['ips'])}" for r in rows if r['rcode'] == 0)
+
+
+EXPORTS = {'part_b': format_part_b, 'part_d': format_part_d}
+
+
+def run(args):
+    """`cn_a2 answers` entry point"""
+    with AnswerStore(args.db) as store:
+        if args.command == 'lookup':
+            rows = store.lookup(args.domain, args.run_id, args.host)
+            if not rows:
+                print(f"[FAIL] No stored answers for {args.domain}")
+            for r in rows:
+                ttl = f"{r['ttl']}s" if r['ttl'] is not None else 'N/A'
+                latency = f"{r['latency_ms']:.1f} ms" if r['latency_ms'] is not None else 'N/A'
+                print(f"{r['run_id']:<32} {r['host']:<4} {RCODE_NAMES.get(r['rcode'], 'TIMEOUT'):<9} "
+                      f"ttl={ttl:<7} {latency:>10}  {', '.join(r['ips']) or '-'}")
+        elif args.command == 'export':
+            text = EXPORTS[args.format](store.results(args.run_id, args.host), args.host)
+            if args.output:
+                with open(args.output, 'w') as f:
+                    f.write(text)
+                print(f"[OK] Exported {args.host} of {args.run_id} to {args.output}")
+            else:
+                sys.stdout.write(text)
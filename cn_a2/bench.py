@@ -0,0 +1,118 @@
+"""
+Mininet Benchmark Runner
+Builds the DNSLinear topology with NAT (what `mn --custom as2dns.py --topo
+dnsline --nat` does), runs the selected harnesses and tears it down again,
+restoring the VM's /etc/resolv.conf (Part C rewrites it from inside a host)
+
+Run: sudo python3 -m cn_a2 bench [--parts b,c,d,r,t,w,s] [--resolvers K] [--speed N|afap] [--profile] [--cli]
+"""
+
+import os
+import shutil
+from contextlib import contextmanager
+
+# Harnesses in the order they have to run: Part B uses the default resolver,
+# Part C switches the hosts to 10.0.0.5, Part D, the pcap replay (r) and the
+# DNS over TCP comparison (t) need that resolver up; the resolver worker
+# scaling run (w) and the sharded resolvers (s) pause dnsmasq while they hold
+# port 53
+PARTS = ('b', 'c', 'd', 'r', 't', 'w', 's')
+RESOLV_CONF = '/etc/resolv.conf'
+RESOLV_BACKUP = '/tmp/vm_resolv.conf.backup'
+
+
+@contextmanager
+def network(topo_params=None, stop_dnsmasq=True):
+    """
+    Running DNSLinear network with NAT (topo_params go to DNSLinear); on exit
+    stops dnsmasq and the network and restores the VM's resolv.conf
+    """
+    from mininet.net import Mininet
+    from mininet.link import TCLink
+    from mininet.log import setLogLevel
+    from .topology import DNSLinear
+
+    setLogLevel('warning')
+    shutil.copy(RESOLV_CONF, RESOLV_BACKUP)
+    print(f"[*] Backed up {RESOLV_CONF} to {RESOLV_BACKUP}")
+
+    net = Mininet(topo=DNSLinear(**(topo_params or {})), link=TCLink)
+    try:
+        net.addNAT().configDefault()
+        net.start()
+        yield net
+    finally:
+        if stop_dnsmasq:
+            from .upstream_fixture import stop_on_host
+            net.get('dns').cmd('killall dnsmasq 2>/dev/null')
+            stop_on_host(net.get('dns'))
+        net.stop()
+        shutil.copy(RESOLV_BACKUP, RESOLV_CONF)
+        print(f"[OK] Restored {RESOLV_CONF}")
+
+
+def run_parts(net, parts, args):
+    """Run the selected harnesses in PARTS order with the bench options in `args`"""
+    from contextlib import nullcontext
+    from .metrics import live_metrics
+    from .netstats import NetSampler
+
+    sampler = NetSampler(net, args.netstats) if args.netstats else nullcontext()
+    with sampler, live_metrics(args.metrics_port, args.live) as metrics:
+        if 'b' in parts:
+            from .part_b_mininet import test_part_b
+            from .query_policy import QueryPolicy
+            test_part_b(net, profile=args.profile, domains=args.domains, shared_queue=args.shared_queue,
+                        policy=QueryPolicy(hedge=args.hedge), metrics=metrics)
+        if 'c' in parts:
+            from .part_c import part_c
+            part_c(net, upstream=args.upstream, fixture=args.fixture, latency_scale=args.latency_scale)
+        if 'd' in parts:
+            from .part_d import part_d
+            from .query_policy import QueryPolicy
+            # Fresh policy: the dnsmasq RTT distribution differs from Part B's resolver
+            part_d(net, profile=args.profile, domains=args.domains,
+                   policy=QueryPolicy(hedge=args.hedge), metrics=metrics,
+                   capture_limits={'segment_mb': args.capture_mb, 'segment_seconds': args.capture_seconds,
+                                   'max_files': args.capture_files})
+        if 'r' in parts:
+            from .replay import replay_pcaps
+            replay_pcaps(net, args.pcaps, speed=args.speed)
+        if 't' in parts:
+            from .dns_tcp import tcp_bench
+            tcp_bench(net, args.domains, connections=args.connections, pipeline=args.pipeline)
+        if 'w' in parts:
+            from .resolver_pool import resolver_scaling
+            resolver_scaling(net, args.domains, workers=[int(w) for w in args.workers.split(',') if w.strip()],
+                             cache_mode=args.resolver_cache)
+        if 's' in parts:
+            from .sharding import shard_bench
+            shard_bench(net, args.domains, epsilon=args.shard_epsilon)
+
+
+def parse_parts(value):
+    """List of parts, or None after printing the error for unknown ones"""
+    parts = [p.strip().lower() for p in value.split(',') if p.strip()]
+    unknown = [p for p in parts if p not in PARTS]
+    if unknown:
+        print(f"[FAIL] Unknown parts: {', '.join(unknown)} (choose from {', '.join(PARTS)})")
+        return None
+    return parts
+
+
+def run(args):
+    """`cn_a2 bench` entry point"""
+    parts = parse_parts(args.parts)
+    if parts is None:
+        return 2
+    if os.geteuid() != 0:
+        print("[FAIL] Mininet needs root: sudo python3 -m cn_a2 bench ...")
+        return 1
+
+    with network({'resolvers': args.resolvers}, stop_dnsmasq='c' in parts) as net:
+        print(f"[OK] DNSLinear topology started (parts: {', '.join(p.upper() for p in PARTS if p in parts)})")
+        run_parts(net, parts, args)
+
+        if args.cli:
+            from mininet.cli import CLI
+            CLI(net)
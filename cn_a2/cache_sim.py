@@ -0,0 +1,625 @@
+"""
+Offline DNS Cache Policy Simulator
+Replay captured query traces through LRU, LFU, ARC, 2Q and W-TinyLFU caches
+and sweep cache sizes to produce hit-ratio-vs-size curves
+
+Run outside Mininet: python3 -m cn_a2 simulate domains/*.txt --sizes 10,100,1000
+"""
+
+import csv
+import os
+import time
+from array import array
+from datetime import datetime
+
+DEFAULT_TTL = 300          # seconds, used when the trace carries no TTL
+DEFAULT_INTERVAL = 0.1     # seconds between queries for untimed domain lists
+DEFAULT_SIZES = '10,25,50,100,250,500,1000,2500,5000,10000'
+POLICIES = ['lru', 'lfu', 'arc', '2q', 'wtinylfu']
+
+
+# ============================================================================
+# Trace loading
+# ============================================================================
+
+class Trace:
+    """Query trace held in flat arrays: key ids, timestamps and per-key TTLs"""
+    __slots__ = ('keys', 'times', 'ttls', 'names')
+
+    def __init__(self):
+        self.keys = array('i')     # interned domain id per query
+        self.times = array('d')    # query timestamp (seconds)
+        self.ttls = array('i')     # TTL per interned domain
+        self.names = []            # id -> domain
+
+    def __len__(self):
+        return len(self.keys)
+
+    def intern(self, index, domain, ttl=None):
+        """Return the id for domain, adding it (and its TTL) if new"""
+        key = index.get(domain)
+        if key is None:
+            key = len(self.names)
+            index[domain] = key
+            self.names.append(domain)
+            self.ttls.append(DEFAULT_TTL if ttl is None else int(ttl))
+        elif ttl is not None:
+            self.ttls[key] = int(ttl)
+        return key
+
+
+def _load_pcap(path, trace, index):
+    """Queries (qr == 0) become accesses; responses (qr == 1) provide min answer TTL"""
+    from scapy.all import PcapReader, DNS, DNSQR  # heavy import, only for pcaps
+
+    answer_ttls = {}
+    with PcapReader(path) as pcap:
+        for pkt in pcap:
+            if not (pkt.haslayer(DNS) and pkt.haslayer(DNSQR)):
+                continue
+            try:
+                domain = pkt[DNSQR].qname.decode().rstrip('.').lower()
+            except Exception:
+                continue
+            dns = pkt[DNS]
+            if dns.qr == 0:
+                trace.keys.append(trace.intern(index, domain))
+                trace.times.append(float(pkt.time))
+            elif dns.ancount:
+                ttls = [dns.an[i].ttl for i in range(dns.ancount)
+                        if hasattr(dns.an[i], 'ttl')]
+                if ttls:
+                    answer_ttls[domain] = min(ttls)
+
+    for domain, ttl in answer_ttls.items():
+        key = index.get(domain)
+        if key is not None:
+            trace.ttls[key] = ttl
+
+
+def _load_query_log(path, trace, index):
+    """part_d detailed log: every logged query is an access at its timestamp"""
+    from .jsonl_log import iter_logs
+
+    for log in iter_logs(path):
+        trace.keys.append(trace.intern(index, log['domain'].lower()))
+        trace.times.append(datetime.fromisoformat(log['timestamp']).timestamp())
+
+
+def _load_text(path, trace, index, interval):
+    """
+    Text traces: either a domain list (one name per line, spaced `interval`
+    seconds apart) or 'timestamp domain [ttl]' lines
+    """
+    start = trace.times[-1] + interval if len(trace.times) else 0.0
+    with open(path, 'r') as f:
+        for n, line in enumerate(f):
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if len(fields) == 1:
+                ts, domain, ttl = start + n * interval, fields[0], None
+            else:
+                ts, domain = float(fields[0]), fields[1]
+                ttl = fields[2] if len(fields) > 2 else None
+            trace.keys.append(trace.intern(index, domain.lower(), ttl))
+            trace.times.append(ts)
+
+
+def _load_workload(path, trace, index):
+    """Synthetic workload directory (workload.py): every query with its name's TTL"""
+    from .workload import load_workload, iter_trace
+
+    workload, _ = load_workload(path)
+    keys = {}                  # name index -> trace key, so names are formatted once
+    start = trace.times[-1] if len(trace.times) else 0.0
+    for offset, name, ttl in iter_trace(path):
+        key = keys.get(name)
+        if key is None:
+            key = keys[name] = trace.intern(index, workload.name(name), ttl)
+        trace.keys.append(key)
+        trace.times.append(start + offset)
+
+
+def load_trace(paths, interval=DEFAULT_INTERVAL):
+    """Concatenate traces from pcaps, capture rings, synthetic workloads, part_d JSON logs and text files"""
+    trace = Trace()
+    index = {}
+    for path in paths:
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, 'meta.json')):
+            _load_workload(path, trace, index)
+        elif os.path.isdir(path) and os.path.exists(os.path.join(path, 'index.json')):
+            from .capture_ring import segments_for
+            for segment in segments_for(path):      # capture ring, oldest segment first
+                _load_pcap(segment, trace, index)
+        elif path.endswith(('.pcap', '.pcapng')):
+            _load_pcap(path, trace, index)
+        elif path.endswith(('.json', '.jsonl')):
+            _load_query_log(path, trace, index)
+        else:
+            _load_text(path, trace, index, interval)
+    return trace
+
+
+# ============================================================================
+# Array-backed doubly linked lists
+# ============================================================================
+
+class _Lists:
+    """
+    Several doubly linked lists over the same key space, stored in flat arrays.
+    Nodes 0..nkeys-1 are keys, nodes nkeys.. are list sentinels. A key is in
+    at most one list at a time; `where[key]` holds its list (-1 if none).
+    """
+    __slots__ = ('prev', 'next', 'where', 'size', 'base')
+
+    def __init__(self, nkeys, nlists):
+        total = nkeys + nlists
+        self.prev = array('i', range(total))
+        self.next = array('i', range(total))
+        self.where = array('b', [-1]) * nkeys
+        self.size = [0] * nlists
+        self.base = nkeys
+
+    def push_front(self, lst, key):
+        head = self.base + lst
+        first = self.next[head]
+        self.prev[key] = head
+        self.next[key] = first
+        self.prev[first] = key
+        self.next[head] = key
+        self.where[key] = lst
+        self.size[lst] += 1
+
+    def remove(self, key):
+        p, n = self.prev[key], self.next[key]
+        self.next[p] = n
+        self.prev[n] = p
+        self.size[self.where[key]] -= 1
+        self.where[key] = -1
+
+    def move_front(self, lst, key):
+        self.remove(key)
+        self.push_front(lst, key)
+
+    def back(self, lst):
+        return self.prev[self.base + lst]
+
+    def pop_back(self, lst):
+        key = self.prev[self.base + lst]
+        self.remove(key)
+        return key
+
+
+# ============================================================================
+# Cache policies
+# ============================================================================
+# Every policy implements lookup(key) -> bool (hit) and, on a miss, inserts the
+# key itself. TTL expiry is handled by simulate(): an expired entry is counted
+# as a miss and then touched like a fresh insert.
+
+class LRU:
+    __slots__ = ('cap', 'lists')
+
+    def __init__(self, capacity, nkeys):
+        self.cap = capacity
+        self.lists = _Lists(nkeys, 1)
+
+    def lookup(self, key):
+        lists = self.lists
+        if lists.where[key] == 0:
+            lists.move_front(0, key)
+            return True
+        if lists.size[0] >= self.cap:
+            lists.pop_back(0)
+        lists.push_front(0, key)
+        return False
+
+
+class LFU:
+    """LFU with saturating counters; ties broken by recency within a bucket"""
+    __slots__ = ('cap', 'lists', 'min_freq', 'count')
+    MAX_FREQ = 64
+
+    def __init__(self, capacity, nkeys):
+        self.cap = capacity
+        self.lists = _Lists(nkeys, self.MAX_FREQ + 1)
+        self.min_freq = 1
+        self.count = 0
+
+    def lookup(self, key):
+        lists = self.lists
+        f = lists.where[key]
+        if f > 0:
+            if f < self.MAX_FREQ:
+                lists.remove(key)
+                lists.push_front(f + 1, key)
+                if f == self.min_freq and lists.size[f] == 0:
+                    self.min_freq = f + 1
+            else:
+                lists.move_front(f, key)
+            return True
+        if self.count >= self.cap:
+            m = self.min_freq
+            while lists.size[m] == 0:
+                m += 1
+            lists.pop_back(m)
+            self.count -= 1
+        lists.push_front(1, key)
+        self.min_freq = 1
+        self.count += 1
+        return False
+
+
+class ARC:
+    """Adaptive Replacement Cache (Megiddo & Modha)"""
+    __slots__ = ('cap', 'lists', 'p')
+    T1, T2, B1, B2 = 0, 1, 2, 3
+
+    def __init__(self, capacity, nkeys):
+        self.cap = capacity
+        self.lists = _Lists(nkeys, 4)
+        self.p = 0
+
+    def _replace(self, in_b2):
+        lists = self.lists
+        t1 = lists.size[self.T1]
+        if t1 and (t1 > self.p or (in_b2 and t1 == self.p) or not lists.size[self.T2]):
+            lists.push_front(self.B1, lists.pop_back(self.T1))
+        else:
+            lists.push_front(self.B2, lists.pop_back(self.T2))
+
+    def lookup(self, key):
+        lists = self.lists
+        size = lists.size
+        where = lists.where[key]
+        c = self.cap
+        if where == self.T1 or where == self.T2:
+            lists.move_front(self.T2, key)
+            return True
+        if where == self.B1:
+            self.p = min(c, self.p + max(size[self.B2] // max(size[self.B1], 1), 1))
+            lists.remove(key)
+            self._replace(False)
+            lists.push_front(self.T2, key)
+            return False
+        if where == self.B2:
+            self.p = max(0, self.p - max(size[self.B1] // max(size[self.B2], 1), 1))
+            lists.remove(key)
+            self._replace(True)
+            lists.push_front(self.T2, key)
+            return False
+        l1 = size[self.T1] + size[self.B1]
+        if l1 == c:
+            if size[self.T1] < c:
+                lists.pop_back(self.B1)
+                self._replace(False)
+            else:
+                lists.pop_back(self.T1)
+        elif l1 < c and l1 + size[self.T2] + size[self.B2] >= c:
+            if l1 + size[self.T2] + size[self.B2] == 2 * c:
+                lists.pop_back(self.B2)
+            self._replace(False)
+        lists.push_front(self.T1, key)
+        return False
+
+
+class TwoQ:
+    """Full 2Q (Johnson & Shasha): A1in FIFO, A1out ghost FIFO, Am LRU"""
+    __slots__ = ('cap', 'lists', 'kin', 'kout')
+    A1IN, A1OUT, AM = 0, 1, 2
+
+    def __init__(self, capacity, nkeys):
+        self.cap = capacity
+        self.lists = _Lists(nkeys, 3)
+        self.kin = max(1, capacity // 4)
+        self.kout = max(1, capacity // 2)
+
+    def _reclaim(self):
+        lists = self.lists
+        size = lists.size
+        if size[self.A1IN] + size[self.AM] < self.cap:
+            return
+        if size[self.A1IN] > self.kin or size[self.AM] == 0:
+            lists.push_front(self.A1OUT, lists.pop_back(self.A1IN))
+            if size[self.A1OUT] > self.kout:
+                lists.pop_back(self.A1OUT)
+        else:
+            lists.pop_back(self.AM)
+
+    def lookup(self, key):
+        lists = self.lists
+        where = lists.where[key]
+        if where == self.AM:
+            lists.move_front(self.AM, key)
+            return True
+        if where == self.A1IN:
+            return True
+        if where == self.A1OUT:
+            lists.remove(key)
+            self._reclaim()
+            lists.push_front(self.AM, key)
+            return False
+        self._reclaim()
+        lists.push_front(self.A1IN, key)
+        return False
+
+
+class WTinyLFU:
+    """
+    W-TinyLFU (Einziger et al.): 1% LRU window, segmented LRU main cache
+    (20% probation / 80% protected) and a count-min sketch of 4-bit counters
+    that decides whether a window victim may replace the probation victim
+    """
+    __slots__ = ('lists', 'window_cap', 'protected_cap', 'main_cap',
+                 'sketch', 'mask', 'shift', 'additions', 'sample')
+    WINDOW, PROBATION, PROTECTED = 0, 1, 2
+    SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+
+    def __init__(self, capacity, nkeys):
+        self.lists = _Lists(nkeys, 3)
+        # window + main == capacity; a 1-entry cache is the main segment alone (with admission)
+        self.window_cap = max(1, capacity // 100) if capacity > 1 else 0
+        self.main_cap = capacity - self.window_cap
+        self.protected_cap = max(1, self.main_cap * 4 // 5)
+        bits = max(4, (capacity * 4).bit_length())
+        self.mask = (1 << bits) - 1
+        self.shift = 32 - bits
+        self.sketch = [array('B', [0]) * (self.mask + 1) for _ in self.SEEDS]
+        self.additions = 0
+        self.sample = 10 * capacity
+
+    def _increment(self, key):
+        for row, seed in zip(self.sketch, self.SEEDS):
+            i = ((key * seed) & 0xFFFFFFFF) >> self.shift
+            if row[i] < 15:
+                row[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample:
+            for n, row in enumerate(self.sketch):
+                self.sketch[n] = array('B', row.tobytes().translate(_HALVE))
+            self.additions //= 2
+
+    def _estimate(self, key):
+        return min(row[((key * seed) & 0xFFFFFFFF) >> self.shift]
+                   for row, seed in zip(self.sketch, self.SEEDS))
+
+    def lookup(self, key):
+        self._increment(key)
+        lists = self.lists
+        size = lists.size
+        where = lists.where[key]
+        if where == self.WINDOW:
+            lists.move_front(self.WINDOW, key)
+            return True
+        if where == self.PROTECTED:
+            lists.move_front(self.PROTECTED, key)
+            return True
+        if where == self.PROBATION:
+            lists.remove(key)
+            lists.push_front(self.PROTECTED, key)
+            if size[self.PROTECTED] > self.protected_cap:
+                lists.push_front(self.PROBATION, lists.pop_back(self.PROTECTED))
+            return True
+
+        lists.push_front(self.WINDOW, key)
+        if size[self.WINDOW] <= self.window_cap:
+            return False
+        candidate = lists.pop_back(self.WINDOW)
+        if size[self.PROBATION] + size[self.PROTECTED] < self.main_cap:
+            lists.push_front(self.PROBATION, candidate)
+            return False
+        victim_list = self.PROBATION if size[self.PROBATION] else self.PROTECTED
+        victim = lists.back(victim_list)
+        if self._estimate(candidate) > self._estimate(victim):
+            lists.remove(victim)
+            lists.push_front(self.PROBATION, candidate)
+        return False
+
+
+_HALVE = bytes(v >> 1 for v in range(256))
+
+POLICY_CLASSES = {
+    'lru': LRU,
+    'lfu': LFU,
+    'arc': ARC,
+    '2q': TwoQ,
+    'wtinylfu': WTinyLFU,
+}
+
+
+# ============================================================================
+# Simulation
+# ============================================================================
+
+def simulate(trace, policy, capacity):
+    """Replay the trace through one policy at one capacity; returns hit count"""
+    cache = POLICY_CLASSES[policy](capacity, len(trace.names))
+    lookup = cache.lookup
+    ttls = trace.ttls
+    times = trace.times
+    expires = array('d', [0.0]) * len(trace.names)
+    hits = 0
+    for i, key in enumerate(trace.keys):
+        now = times[i]
+        if lookup(key) and expires[key] > now:
+            hits += 1
+        else:
+            expires[key] = now + ttls[key]
+    return hits
+
+
+def lru_stack_distances(trace):
+    """
+    One-pass LRU sweep (Mattson stack distances via a Fenwick tree over query
+    positions). Returns (histogram, cold) where histogram[d] counts accesses
+    found at stack depth d and `cold` counts first-time or TTL-expired misses.
+    An LRU cache of capacity C hits exactly the accesses with depth < C.
+    With TTLs the expiry clock restarts at the last fetch after expiry, not
+    after a capacity eviction, so small caches can be credited a few extra
+    hits compared with simulate(trace, 'lru', C).
+    """
+    n = len(trace)
+    tree = array('i', [0]) * (n + 1)
+    last = array('q', [-1]) * len(trace.names)
+    expires = array('d', [0.0]) * len(trace.names)
+    hist = array('q', [0]) * (len(trace.names) + 1)
+    ttls = trace.ttls
+    times = trace.times
+    cold = 0
+    markers = 0
+
+    for t, key in enumerate(trace.keys):
+        now = times[t]
+        p = last[key]
+        if p >= 0:
+            # markers at positions <= p
+            s = 0
+            i = p + 1
+            while i > 0:
+                s += tree[i]
+                i -= i & -i
+            if expires[key] > now:
+                hist[markers - s] += 1
+            else:
+                cold += 1
+            i = p + 1
+            while i <= n:
+                tree[i] -= 1
+                i += i & -i
+            markers -= 1
+        else:
+            cold += 1
+        if expires[key] <= now:
+            expires[key] = now + ttls[key]
+        i = t + 1
+        while i <= n:
+            tree[i] += 1
+            i += i & -i
+        markers += 1
+        last[key] = t
+
+    return hist, cold
+
+
+def lru_curve(hist, sizes):
+    """Cumulative hits for each capacity from a stack-distance histogram"""
+    hits = {}
+    running = 0
+    depth = 0
+    for size in sorted(sizes):
+        while depth < min(size, len(hist)):
+            running += hist[depth]
+            depth += 1
+        hits[size] = running
+    return hits
+
+
+_TRACE = None  # set in each sweep worker by _init_worker
+
+
+def _init_worker(trace):
+    global _TRACE
+    _TRACE = trace
+
+
+def _simulate_job(job):
+    policy, capacity = job
+    return policy, capacity, simulate(_TRACE, policy, capacity)
+
+
+def sweep(trace, policies, sizes, jobs=1):
+    """Hit counts for every (policy, size); LRU uses the one-pass stack sweep"""
+    results = {}
+    if 'lru' in policies:
+        hist, _ = lru_stack_distances(trace)
+        for size, hits in lru_curve(hist, sizes).items():
+            results[('lru', size)] = hits
+
+    work = [(p, s) for p in policies if p != 'lru' for s in sizes]
+    if jobs > 1 and len(work) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        # The trace goes to each worker once through the initializer (any start method)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(trace,)) as pool:
+            for policy, size, hits in pool.map(_simulate_job, work):
+                results[(policy, size)] = hits
+    else:
+        for policy, size in work:
+            results[(policy, size)] = simulate(trace, policy, size)
+    return results
+
+
+def plot_curves(results, total, policies, sizes, output_plot):
+    """Hit ratio vs cache size, one line per policy (log-scaled x axis)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for policy in policies:
+        ratios = [results[(policy, s)] / total * 100 for s in sizes]
+        ax.plot(sizes, ratios, marker='o', label=policy.upper())
+    ax.set_xscale('log')
+    ax.set_xlabel('Cache Size (entries)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Hit Ratio (%)', fontsize=12, fontweight='bold')
+    ax.set_title('DNS Cache Hit Ratio vs Cache Size', fontsize=13, fontweight='bold')
+    ax.grid(alpha=0.3)
+    ax.legend(fontsize=10)
+    plt.tight_layout()
+    plt.savefig(output_plot, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+def run(args):
+    """`cn_a2 simulate` entry point (options left as None take the defaults above)"""
+    policies = [p.strip().lower() for p in (args.policies or ','.join(POLICIES)).split(',') if p.strip()]
+    unknown = [p for p in policies if p not in POLICY_CLASSES]
+    if unknown:
+        print(f"[FAIL] Unknown policies: {', '.join(unknown)} (choose from {', '.join(POLICIES)})")
+        return 2
+    sizes = sorted({int(s) for s in (args.sizes or DEFAULT_SIZES).split(',') if s.strip()})
+    if not sizes or sizes[0] < 1:
+        print("[FAIL] Cache sizes must be at least 1 entry")
+        return 2
+    interval = args.interval if args.interval is not None else DEFAULT_INTERVAL
+    jobs = args.jobs or os.cpu_count() or 1
+
+    print("\n" + "="*80)
+    print("DNS CACHE POLICY SIMULATION")
+    print("="*80)
+
+    start = time.time()
+    trace = load_trace(args.traces, interval)
+    if not len(trace):
+        print("[FAIL] No queries found in the given traces")
+        return 1
+    print(f"[*] Loaded {len(trace)} queries for {len(trace.names)} distinct domains "
+          f"in {time.time() - start:.1f}s")
+
+    start = time.time()
+    results = sweep(trace, policies, sizes, jobs)
+    print(f"[*] Simulated {len(policies)} policies x {len(sizes)} sizes "
+          f"in {time.time() - start:.1f}s\n")
+
+    total = len(trace)
+    header = f"{'Size':>8} " + ' '.join(f"{p.upper():>10}" for p in policies)
+    print(header)
+    print("-"*len(header))
+    for size in sizes:
+        row = ' '.join(f"{results[(p, size)] / total * 100:>9.2f}%" for p in policies)
+        print(f"{size:>8} {row}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['policy', 'capacity', 'queries', 'hits', 'hit_ratio'])
+        for policy in policies:
+            for size in sizes:
+                hits = results[(policy, size)]
+                writer.writerow([policy, size, total, hits, round(hits / total, 6)])
+    print(f"\n[OK] Curves saved: {args.output}")
+
+    if args.plot:
+        plot_curves(results, total, policies, sizes, args.plot)
+        print(f"[OK] Plot saved: {args.plot}")
+
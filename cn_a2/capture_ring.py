@@ -0,0 +1,279 @@
+"""
+Bounded Capture Ring
+Packet capture split into segments as it is written, instead of one
+unbounded tcpdump file: tcpdump writes the pcap stream to a pipe and a
+reader thread in the harness process cuts it into ring_<NNNNN>.pcap files,
+rotating on size or on packet time, and deletes the oldest segment once more
+than `max_files` exist. index.json in the ring directory lists every kept
+segment with its first/last packet time and packet count, so analysers open
+only the segments that overlap a time window.
+
+Record:   ring = CaptureRing(dns_host, 'dns-eth0', 'results/capture_part_d').start() ... ring.stop()
+Inspect:  python3 -m cn_a2 capture results/capture_part_d
+Window:   python3 -m cn_a2 capture results/capture_part_d --start 12:00:05 --end 12:00:10 --extract slice.pcap
+"""
+
+import json
+import os
+import struct
+import subprocess
+import threading
+from datetime import datetime
+
+RING_DIR = 'results/capture_part_d'
+INDEX = 'index.json'
+SEGMENT_MB = 16
+SEGMENT_SECONDS = 60
+MAX_FILES = 32             # at most 512 MB of capture with the defaults
+
+GLOBAL_HEADER = 24
+RECORD_HEADER = 16
+# pcap magic -> (byte order, timestamp fraction divisor)
+MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e6), b'\xa1\xb2\xc3\xd4': ('>', 1e6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e9), b'\xa1\xb2\x3c\x4d': ('>', 1e9),
+}
+
+
+def _read_exact(stream, n):
+    data = stream.read(n)
+    while data and len(data) < n:
+        more = stream.read(n - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def _pcap_format(header):
+    if header[:4] not in MAGIC:
+        raise ValueError(f"not a pcap stream (magic {header[:4].hex()})")
+    order, divisor = MAGIC[header[:4]]
+    return struct.Struct(order + 'IIII'), divisor
+
+
+class CaptureRing:
+    """
+    tcpdump on `node`:`intf` into a bounded ring of pcap segments in `directory`.
+    A segment is closed once it reaches `segment_mb` MB or spans
+    `segment_seconds` of packet time; index.json is rewritten on every rotation.
+    """
+
+    def __init__(self, node, intf, directory=RING_DIR, bpf='port 53',
+                 segment_mb=SEGMENT_MB, segment_seconds=SEGMENT_SECONDS, max_files=MAX_FILES):
+        self.node = node
+        self.intf = intf
+        self.directory = directory
+        self.bpf = bpf
+        self.segment_bytes = int(segment_mb * 1024 * 1024)
+        self.segment_seconds = segment_seconds
+        self.max_files = max_files
+        self.segments = []         # index entries of the closed segments still on disk
+        self.deleted = 0
+        self.packets = 0
+        self._seq = 0
+        self._file = None
+        self._current = None
+        self._header = None
+        self._proc = None
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if (name.startswith('ring_') and name.endswith('.pcap')) or name == INDEX:
+                os.remove(os.path.join(self.directory, name))
+        self._proc = self.node.popen(['tcpdump', '-i', self.intf, '-U', '-w', '-', *self.bpf.split()],
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._thread = threading.Thread(target=self._reader, name='capture-ring', daemon=True)
+        self._thread.start()
+        print(f"[*] Capturing {self.intf} ({self.bpf}) -> {self.directory}/ "
+              f"({self.segment_bytes / 2**20:g} MB / {self.segment_seconds:g}s segments, at most {self.max_files} files)")
+        return self
+
+    def _reader(self):
+        stream = self._proc.stdout
+        self._header = _read_exact(stream, GLOBAL_HEADER)
+        if len(self._header) < GLOBAL_HEADER:
+            return
+        record, divisor = _pcap_format(self._header)
+        while True:
+            rec = _read_exact(stream, RECORD_HEADER)
+            if len(rec) < RECORD_HEADER:
+                break
+            sec, frac, caplen, _ = record.unpack(rec)
+            data = _read_exact(stream, caplen)
+            if len(data) < caplen:
+                break
+            ts = sec + frac / divisor
+            cur = self._current
+            if cur is None or cur['bytes'] >= self.segment_bytes or ts - cur['first_ts'] >= self.segment_seconds:
+                self._rotate(ts)
+                cur = self._current
+            self._file.write(rec)
+            self._file.write(data)
+            cur['last_ts'] = ts
+            cur['packets'] += 1
+            cur['bytes'] += RECORD_HEADER + caplen
+            self.packets += 1
+
+    def _rotate(self, first_ts):
+        self._close_segment()
+        self._seq += 1
+        name = f'ring_{self._seq:05d}.pcap'
+        self._file = open(os.path.join(self.directory, name), 'wb')
+        self._file.write(self._header)
+        self._current = {'file': name, 'first_ts': first_ts, 'last_ts': first_ts,
+                         'packets': 0, 'bytes': GLOBAL_HEADER}
+        while len(self.segments) >= self.max_files:
+            oldest = self.segments.pop(0)
+            os.remove(os.path.join(self.directory, oldest['file']))
+            self.deleted += 1
+        self._write_index()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self.segments.append(self._current)
+        self._current = None
+
+    def _write_index(self):
+        index = {
+            'interface': self.intf,
+            'filter': self.bpf,
+            'segment_bytes': self.segment_bytes,
+            'segment_seconds': self.segment_seconds,
+            'max_files': self.max_files,
+            'deleted_segments': self.deleted,
+            'segments': self.segments,
+            'open_segment': self._current['file'] if self._current else None,
+        }
+        path = os.path.join(self.directory, INDEX)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(index, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def stop(self):
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+        self._thread.join()
+        self._close_segment()
+        self._write_index()
+        size = sum(s['bytes'] for s in self.segments)
+        print(f"[OK] Captured {self.packets} packets into {len(self.segments)} segments "
+              f"({size / 1e6:.1f} MB kept, {self.deleted} rotated out) in {self.directory}/")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============================================================================
+# Reading
+# ============================================================================
+
+def load_index(directory=RING_DIR):
+    with open(os.path.join(directory, INDEX), 'r') as f:
+        return json.load(f)
+
+
+def segments_for(directory, start=None, end=None):
+    """Paths of the segments whose packets overlap [start, end] (epoch seconds, None = open)"""
+    index = load_index(directory)
+    return [os.path.join(directory, s['file']) for s in index['segments']
+            if (start is None or s['last_ts'] >= start) and (end is None or s['first_ts'] <= end)]
+
+
+def iter_packets(path, start=None, end=None):
+    """(ts, record header, packet bytes) of one pcap file, limited to [start, end]"""
+    with open(path, 'rb') as f:
+        header = _read_exact(f, GLOBAL_HEADER)
+        if len(header) < GLOBAL_HEADER:
+            return
+        record, divisor = _pcap_format(header)
+        while True:
+            rec = _read_exact(f, RECORD_HEADER)
+            if len(rec) < RECORD_HEADER:
+                return
+            sec, frac, caplen, _ = record.unpack(rec)
+            data = _read_exact(f, caplen)
+            ts = sec + frac / divisor
+            if (start is None or ts >= start) and (end is None or ts <= end):
+                yield ts, rec, data
+
+
+def extract_window(directory, start, end, out_path):
+    """
+    Write the packets in [start, end] to one pcap; returns (segments opened,
+    packets written). No file is created when no segment overlaps the window.
+    """
+    paths = segments_for(directory, start, end)
+    written = 0
+    if not paths:
+        return 0, 0
+    with open(out_path, 'wb') as out:
+        for i, path in enumerate(paths):
+            with open(path, 'rb') as f:
+                header = f.read(GLOBAL_HEADER)
+            if i == 0:
+                out.write(header)
+            for _, rec, data in iter_packets(path, start, end):
+                out.write(rec)
+                out.write(data)
+                written += 1
+    return len(paths), written
+
+
+def _parse_time(value):
+    """Epoch seconds, an ISO date-time, or HH:MM:SS[.fff] on `today`"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if 'T' in value or '-' in value:
+        return datetime.fromisoformat(value).timestamp()
+    clock = datetime.strptime(value, '%H:%M:%S.%f' if '.' in value else '%H:%M:%S').time()
+    return datetime.combine(datetime.now().date(), clock).timestamp()
+
+
+def _clock(ts):
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def run(args):
+    """`cn_a2 capture` entry point"""
+    if not os.path.exists(os.path.join(args.directory, INDEX)):
+        print(f"[FAIL] No capture index in {args.directory}")
+        return 1
+    index = load_index(args.directory)
+    start, end = _parse_time(args.start), _parse_time(args.end)
+
+    print("="*100)
+    print(f"CAPTURE RING {args.directory} ({index['interface']}, '{index['filter']}', "
+          f"{len(index['segments'])} segments, {index['deleted_segments']} rotated out)")
+    print("="*100)
+    print(f"{'Segment':<18} {'First packet':<24} {'Last packet':<24} {'Packets':>9} {'MB':>8}")
+    print("-"*100)
+    selected = set(segments_for(args.directory, start, end))
+    for s in index['segments']:
+        mark = '*' if os.path.join(args.directory, s['file']) in selected and (start or end) else ' '
+        print(f"{s['file']:<17}{mark} {_clock(s['first_ts']):<24} {_clock(s['last_ts']):<24} "
+              f"{s['packets']:>9} {s['bytes'] / 1e6:>8.2f}")
+    if start is not None or end is not None:
+        print(f"\n[*] {len(selected)} of {len(index['segments'])} segments (*) cover the window")
+    if args.extract:
+        opened, written = extract_window(args.directory, start, end, args.extract)
+        if not opened:
+            print(f"[FAIL] No segment covers the window; {args.extract} not written")
+            return 1
+        print(f"[OK] {written} packets from {opened} segments written to {args.extract}")
+    return 0
@@ -0,0 +1,266 @@
+"""
+Command-line interface: python3 -m cn_a2 <command> [options]
+
+Every subcommand's parser is defined here and its module is imported only
+after the command has been chosen, so `--help` and light commands never load
+scapy, numpy, matplotlib or mininet.
+"""
+
+import argparse
+import importlib
+
+
+def _add_domain_options(parser):
+    parser.add_argument('--domains', default='domains/domains_PCAP_*_H*.txt',
+                        help='comma-separated globs of domain files (a _H<n>.txt suffix picks the host)')
+    parser.add_argument('--shared-queue', action='store_true',
+                        help='drop duplicate names across files and let idle hosts steal work (Part B)')
+    parser.add_argument('--hedge', action='store_true',
+                        help='send a duplicate query when the first is slower than the p95 RTT')
+    parser.add_argument('--live', action='store_true',
+                        help='print a status line (QPS, success %%, p50/p99 over the last 10 s) every 5 s')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='serve live Prometheus metrics on http://127.0.0.1:PORT/metrics')
+
+
+def _add_bench_options(parser):
+    parser.add_argument('--parts', default='c,d',
+                        help='comma-separated subset of b,c,d,r,t,w,s (r = pcap replay, t = DNS over TCP, '
+                             'w = resolver worker scaling, s = sharded resolvers; default: c,d)')
+    parser.add_argument('--profile', action='store_true', help='per-stage timing breakdown of Parts B/D')
+    parser.add_argument('--pcaps', default='as2pcaps/*.pcap', help='captures (or a cn_a2 workload directory) to replay with part r')
+    parser.add_argument('--speed', type=_speed, default=1.0,
+                        help="replay timing for part r: 1 = original, N = N times faster, 'afap' = as fast as possible")
+    parser.add_argument('--connections', type=int, default=4, help='TCP connections per host for part t')
+    parser.add_argument('--pipeline', type=int, default=16, help='queries in flight per TCP connection for part t')
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated resolver worker counts for part w')
+    parser.add_argument('--netstats', type=float, default=None, metavar='SECONDS',
+                        help='sample tc qdisc and OVS port counters at this interval into results/netstats.jsonl')
+    parser.add_argument('--capture-mb', type=float, default=16, metavar='MB',
+                        help='rotate the Part D capture segment at this size')
+    parser.add_argument('--capture-seconds', type=float, default=60, metavar='SECONDS',
+                        help='rotate the Part D capture segment after this much packet time')
+    parser.add_argument('--capture-files', type=int, default=32, metavar='N',
+                        help='keep at most N Part D capture segments, deleting the oldest')
+    parser.add_argument('--upstream', choices=('live', 'record', 'replay'), default='live',
+                        help="Part C dnsmasq upstream: live, live while recording to --fixture, or replayed from it")
+    parser.add_argument('--fixture', default='fixtures/upstream.fix', help='upstream fixture for --upstream record/replay')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='multiply recorded upstream latencies by this with --upstream replay (0 = answer at once)')
+    parser.add_argument('--resolver-cache', choices=('shared', 'partitioned', 'none'), default='shared',
+                        help='cache mode of the part w resolver workers')
+    parser.add_argument('--resolvers', type=int, default=1, metavar='K',
+                        help='resolver hosts in the topology (dns, dns2, ... at 10.0.0.5, 10.0.0.6, ...; at most 8)')
+    parser.add_argument('--shard-epsilon', type=float, default=0.25, metavar='EPS',
+                        help='part s: cap each shard at (1 + EPS) x the mean query load')
+    _add_domain_options(parser)
+
+
+def _speed(value):
+    if value.lower() in ('afap', 'max'):
+        return 0.0
+    return float(value)
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cn_a2', description='CS331 Assignment 2: DNS resolution experiments on Mininet')
+    sub = parser.add_subparsers(dest='subcommand', metavar='<command>', required=True)
+
+    p = sub.add_parser('extract', help='extract unique query domains from PCAPs')
+    p.add_argument('--pcap-dir', default='as2pcaps')
+    p.add_argument('--output-dir', default='domains')
+    p.set_defaults(module='extract_all_domains')
+
+    p = sub.add_parser('overlap', help='pairwise Jaccard and union size of captures from their sketches')
+    p.add_argument('--sketch-dir', default='domains/sketches')
+    p.add_argument('--top', type=int, default=10, help='most similar pairs to list')
+    p.add_argument('--csv', default=None, help='write every pair to this CSV')
+    p.add_argument('--exact', action='store_true', help='check the estimates against the extracted domain lists')
+    p.add_argument('--domains-dir', default='domains', help='domain lists for --exact')
+    p.set_defaults(module='sketches')
+
+    p = sub.add_parser('bench', help='run harnesses inside the DNSLinear topology (needs root)')
+    _add_bench_options(p)
+    p.add_argument('--cli', action='store_true', help='open the Mininet CLI before tearing down')
+    p.set_defaults(module='bench')
+
+    p = sub.add_parser('sweep', help='run harnesses over a matrix of link parameters (needs root)')
+    p.add_argument('--vary', action='append', metavar='CLASS.PARAM=V1,V2,...',
+                   help='link class (access, dns, core) and parameter (delay, bw, loss, jitter) '
+                        'to sweep, e.g. core.delay=5ms,20ms; repeat for more dimensions')
+    p.add_argument('--name', default='default', help='sweep directory; re-running it resumes')
+    p.add_argument('--root', default='results/sweeps')
+    p.add_argument('--plan', action='store_true', help='list configurations and which are cached, then exit')
+    p.add_argument('--force', action='store_true', help='re-run configurations that are cached')
+    _add_bench_options(p)
+    p.set_defaults(module='sweep')
+
+    p = sub.add_parser('resolve', help="resolve every host's domains with the system resolver")
+    _add_domain_options(p)
+    p.set_defaults(module='part_b_simple')
+
+    p = sub.add_parser('analyze', help='Part D analysis and plots')
+    p.add_argument('--all-hosts', action='store_true',
+                   help='analyze every host and query (CDFs, percentile bands, speedups)')
+    p.add_argument('--no-plots', action='store_true',
+                   help='text reports only (matplotlib is never imported)')
+    p.set_defaults(module='part_d_analyze')
+
+    p = sub.add_parser('simulate', help='trace-driven cache policy simulation')
+    p.add_argument('traces', nargs='+',
+                   help='pcap files, capture ring or workload directories, part_d JSONL/JSON logs, domain lists or "ts domain [ttl]" traces')
+    p.add_argument('--policies', default=None, help='comma-separated subset of lru,lfu,arc,2q,wtinylfu')
+    p.add_argument('--sizes', default=None, help='comma-separated cache capacities (entries)')
+    p.add_argument('--interval', type=float, default=None,
+                   help='seconds between queries for untimed domain lists (default: 0.1)')
+    p.add_argument('--jobs', type=int, default=None, help='worker processes for non-LRU policies')
+    p.add_argument('--output', default='results/cache_sim_curves.csv')
+    p.add_argument('--plot', default=None, help='optional PNG for the curves')
+    p.set_defaults(module='cache_sim')
+
+    p = sub.add_parser('runs', help='list, show and compare recorded benchmark runs')
+    p.add_argument('--root', default='results/runs')
+    runs = p.add_subparsers(dest='command', required=True)
+    r = runs.add_parser('list', help='list recorded runs')
+    r.add_argument('--harness', default=None)
+    r = runs.add_parser('show', help='show one run')
+    r.add_argument('run_id')
+    r = runs.add_parser('compare', help='compare runs against the first one')
+    r.add_argument('run_ids', nargs='+')
+    r.add_argument('--alpha', type=float, default=0.05)
+    p.set_defaults(module='run_registry')
+
+    p = sub.add_parser('answers', help='query the domain -> answer store')
+    p.add_argument('--db', default='results/answers.db')
+    answers = p.add_subparsers(dest='command', required=True)
+    a = answers.add_parser('lookup', help='show stored answers for a domain')
+    a.add_argument('domain')
+    a.add_argument('--run-id', default=None)
+    a.add_argument('--host', default=None)
+    a = answers.add_parser('export', help='write one host of one run in a legacy text format')
+    a.add_argument('run_id')
+    a.add_argument('host')
+    a.add_argument('--format', choices=['part_b', 'part_d'], default='part_d')
+    a.add_argument('--output', default=None, help='file to write (default: stdout)')
+    p.set_defaults(module='answer_store')
+
+    p = sub.add_parser('columns', help='convert a JSONL query log into a columnar store')
+    p.add_argument('log_file', nargs='?', default='results/part_d_detailed_log.jsonl')
+    p.add_argument('store_dir', nargs='?', default='results/part_d_columns')
+    p.set_defaults(module='columnar_store')
+
+    p = sub.add_parser('replay-client', help='open-loop query sender (started inside hosts by pcap replay)')
+    p.add_argument('schedule')
+    p.add_argument('output')
+    p.add_argument('--server', default='10.0.0.5')
+    p.add_argument('--speed', type=_speed, default=1.0)
+    p.add_argument('--timeout', type=float, default=2.0)
+    p.set_defaults(module='replay')
+
+    p = sub.add_parser('tcp-client', help='pooled, pipelined DNS over TCP client (started inside hosts by part t)')
+    p.add_argument('names', help='file with one domain per line')
+    p.add_argument('output')
+    p.add_argument('--server', default='10.0.0.5')
+    p.add_argument('--connections', type=int, default=4)
+    p.add_argument('--pipeline', type=int, default=16)
+    p.add_argument('--timeout', type=float, default=2.0)
+    p.add_argument('--no-reuse', action='store_true', help='new connection per query')
+    p.set_defaults(module='dns_tcp')
+
+    p = sub.add_parser('netstats', help='queue and port counters sampled during a bench run, lined up with slow queries')
+    p.add_argument('log', nargs='?', default='results/netstats.jsonl')
+    p.add_argument('--store', default='results/part_d_columns', help='columnar query store to line up with')
+    p.add_argument('--slowest', type=int, default=10, help='slowest queries to show queue state for (0: none)')
+    p.add_argument('--window', type=float, default=1.0, help='seconds around each query to look at')
+    p.set_defaults(module='netstats')
+
+    p = sub.add_parser('capture', help='list the segments of a capture ring, or extract a time window from them')
+    p.add_argument('directory', nargs='?', default='results/capture_part_d')
+    p.add_argument('--start', default=None, help='window start: epoch seconds, ISO date-time or HH:MM:SS[.fff] today')
+    p.add_argument('--end', default=None, help='window end (same formats)')
+    p.add_argument('--extract', default=None, metavar='PCAP',
+                   help='write the packets in the window to this pcap, reading only the segments that cover it')
+    p.set_defaults(module='capture_ring')
+
+    p = sub.add_parser('resolver', help='caching forwarder with SO_REUSEPORT worker processes (runs on the dns host)')
+    p.add_argument('--workers', type=int, default=1)
+    p.add_argument('--listen', default='10.0.0.5')
+    p.add_argument('--port', type=int, default=53)
+    p.add_argument('--upstream', default='8.8.8.8,8.8.4.4', help='comma-separated upstream resolvers (IP or IP#port)')
+    p.add_argument('--cache', choices=('shared', 'partitioned', 'none'), default='shared')
+    p.add_argument('--cache-slots', type=int, default=4096, help='total cache entries (1 KiB each)')
+    p.add_argument('--stats', default=None, help='per-worker counters as JSON, written on SIGUSR1 and exit')
+    p.set_defaults(module='resolver_pool')
+
+    p = sub.add_parser('resolver-bench', help='memory, CPU/query, QPS and latency of resolver backends vs cache size, hit ratio and load')
+    p.add_argument('--backends', default='cn_a2,dnsmasq', help='comma-separated subset of cn_a2,dnsmasq')
+    p.add_argument('--workers', default='1', help='comma-separated worker counts for the cn_a2 backend')
+    p.add_argument('--sizes', default='1000,10000,100000', help='comma-separated cache sizes (entries), each warmed full')
+    p.add_argument('--hit-ratios', default='0.5,0.9,0.99', help='comma-separated shares of queries for cached names')
+    p.add_argument('--loads', default='2000,5000,0', help='comma-separated offered q/s (0 = as fast as possible)')
+    p.add_argument('--queries', type=int, default=20000, help='measured queries per configuration')
+    p.add_argument('--upstream-ms', type=float, default=1.0, help='latency of the local upstream stand-in')
+    p.add_argument('--listen', default='127.0.0.1', help='address to run on (e.g. 10.0.0.5 inside the dns host)')
+    p.add_argument('--timeout', type=float, default=1.0)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--output', default='results/resolver_bench', help='report path without extension (.json, .txt)')
+    p.set_defaults(module='resolver_bench')
+
+    p = sub.add_parser('workload', help='generate a deterministic synthetic Zipf query stream')
+    p.add_argument('output', help='workload directory (records.bin + meta.json)')
+    p.add_argument('--queries', type=int, default=1000000)
+    p.add_argument('--names', type=int, default=100000, help='distinct names')
+    p.add_argument('--alpha', type=float, default=1.0, help='Zipf popularity skew (0 = uniform)')
+    p.add_argument('--qps', type=float, default=1000.0, help='Poisson arrival rate over all hosts (0 = untimed)')
+    p.add_argument('--hosts', type=int, default=4)
+    p.add_argument('--locality', type=float, default=0.0,
+                   help='share of each host\'s queries drawn from its own popularity ranking')
+    p.add_argument('--nxdomain', type=float, default=0.0, help='share of names that do not exist')
+    p.add_argument('--ttls', default='30:0.1,60:0.2,300:0.4,3600:0.2,86400:0.1', help='TTL:weight,... per name')
+    p.add_argument('--qtypes', default='A:0.6,AAAA:0.3,HTTPS:0.1', help='QTYPE:weight,... per query')
+    p.add_argument('--profile', default=None, metavar='PATH',
+                   help='take qtypes, TTLs and NXDOMAIN share from a cn_a2 extract profile (domains/profile_*.json)')
+    p.add_argument('--zone', default='cn-a2.test', help='parent zone of the existing names')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--fixture', default=None, metavar='PATH',
+                   help='also write an upstream fixture answering every name, for bench --upstream replay')
+    p.add_argument('--upstream-ms', type=float, default=20.0, help='upstream latency recorded in --fixture')
+    p.set_defaults(module='workload')
+
+    p = sub.add_parser('shards', help='load balance and cache disruption of hashing QNAMEs over K resolver shards')
+    p.add_argument('--domains', default='domains/domains_PCAP_*_H*.txt', help='comma-separated globs of domain files')
+    p.add_argument('--workload', default=None, metavar='DIR', help='weight names by a cn_a2 workload instead')
+    p.add_argument('--shards', type=int, default=4)
+    p.add_argument('--epsilon', type=float, default=0.25, help='bounded-load slack over the mean shard load')
+    p.add_argument('--vnodes', type=int, default=64, help='ring points per shard')
+    p.set_defaults(module='sharding')
+
+    p = sub.add_parser('upstream', help='record upstream DNS exchanges to a fixture, or replay them (runs on the dns host)')
+    p.add_argument('action', choices=('record', 'replay', 'show'))
+    p.add_argument('--fixture', default='fixtures/upstream.fix')
+    p.add_argument('--listen', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=5353)
+    p.add_argument('--upstream', default='8.8.8.8,8.8.4.4', help='comma-separated upstream resolvers (record)')
+    p.add_argument('--append', action='store_true', help='add to an existing fixture instead of starting a new one')
+    p.add_argument('--scale', type=float, default=1.0, help='multiply recorded latencies by this (replay)')
+    p.set_defaults(module='upstream_fixture')
+
+    p = sub.add_parser('startup', help='measure cold start time of every subcommand')
+    p.add_argument('--runs', type=int, default=5, help='fresh interpreters per command')
+    p.add_argument('--output', default=None, help='optional CSV of the timings')
+    p.set_defaults(module='startup')
+
+    parser.commands = list(sub.choices)
+    return parser
+
+
+def subcommands():
+    """Names of all subcommands, in help order"""
+    return _build_parser().commands
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    module = importlib.import_module(f'cn_a2.{args.module}')
+    return module.run(args)
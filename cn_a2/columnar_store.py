@@ -0,0 +1,219 @@
+"""
+Columnar Result Store for DNS Query Logs
+Query records are stored as one fixed-width NumPy structured array on disk
+(memory-mapped on load), with domains dictionary-encoded and host / phase /
+status stored as small categorical codes
+
+Run outside Mininet: python3 -m cn_a2 columns results/part_d_detailed_log.jsonl
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from .jsonl_log import iter_logs, log_mtime
+
+RECORD_DTYPE = np.dtype([
+    ('host', 'u1'),          # code into meta['hosts']
+    ('phase', 'u1'),         # 1 = initial query, 2 = re-query
+    ('status', 'u1'),        # code into meta['statuses']
+    ('cache_hit', 'u1'),     # 1 if the record was classified as a cache hit
+    ('servers', 'i1'),       # traced servers visited, -1 if not traced
+    ('domain', 'u4'),        # line number in domains.txt
+    ('query_num', 'i4'),     # position in the host's domain list, -1 for re-queries
+    ('ts_ns', 'i8'),         # query timestamp, ns since the epoch
+    ('rtt_ms', 'f4'),
+    ('total_ms', 'f4'),
+])
+
+DATA_FILE = 'records.bin'
+DOMAINS_FILE = 'domains.txt'
+META_FILE = 'meta.json'
+CHUNK = 100000
+
+
+class _Categories:
+    """Dictionary encoder: value -> small integer code, in first-seen order"""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {v: i for i, v in enumerate(self.values)}
+
+    def code(self, value):
+        c = self.codes.get(value)
+        if c is None:
+            c = len(self.values)
+            self.codes[value] = c
+            self.values.append(value)
+        return c
+
+
+def _status(log):
+    if log['success']:
+        return 'NOERROR'
+    return log.get('status', 'FAILED')
+
+
+def _to_row(log, hosts, statuses, domains):
+    requery = log.get('query_num') == 'requery'
+    ts = log.get('timestamp')
+    return (
+        hosts.code(log['host']),
+        2 if requery else 1,
+        statuses.code(_status(log)),
+        1 if 'HIT' in log.get('cache_status', '') else 0,
+        log.get('servers_visited_count', -1),
+        domains.code(log['domain']),
+        -1 if requery else int(log.get('query_num', 0)),
+        int(datetime.fromisoformat(ts).timestamp() * 1e9) if ts else 0,
+        log.get('rtt_ms', 0),
+        log.get('total_time_ms', 0),
+    )
+
+
+def build_store(records, store_dir, source_mtime=None):
+    """Write an iterable of query-log dicts as a columnar store; returns row count"""
+    os.makedirs(store_dir, exist_ok=True)
+    hosts, statuses, domains = _Categories(), _Categories(), _Categories()
+    count = 0
+    chunk = []
+    with open(os.path.join(store_dir, DATA_FILE), 'wb') as f:
+        for log in records:
+            chunk.append(_to_row(log, hosts, statuses, domains))
+            if len(chunk) >= CHUNK:
+                np.array(chunk, dtype=RECORD_DTYPE).tofile(f)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            np.array(chunk, dtype=RECORD_DTYPE).tofile(f)
+            count += len(chunk)
+
+    with open(os.path.join(store_dir, DOMAINS_FILE), 'w') as f:
+        for domain in domains.values:
+            f.write(domain + '\n')
+    with open(os.path.join(store_dir, META_FILE), 'w') as f:
+        json.dump({
+            'rows': count,
+            'dtype': RECORD_DTYPE.descr,
+            'hosts': hosts.values,
+            'statuses': statuses.values,
+            'source_mtime': source_mtime,
+        }, f, indent=2)
+    return count
+
+
+def build_from_log(log_file, store_dir):
+    """Convert a (possibly rotated) JSONL query log into a columnar store"""
+    return build_store(iter_logs(log_file), store_dir, log_mtime(log_file))
+
+
+def is_stale(log_file, store_dir):
+    """True if the store is missing or older than the log it was built from"""
+    meta_path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return True
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    return meta.get('source_mtime') != log_mtime(log_file)
+
+
+class ColumnStore:
+    """Memory-mapped view of a columnar store"""
+
+    def __init__(self, store_dir):
+        with open(os.path.join(store_dir, META_FILE), 'r') as f:
+            self.meta = json.load(f)
+        self.store_dir = store_dir
+        self.hosts = self.meta['hosts']
+        self.statuses = self.meta['statuses']
+        rows = self.meta['rows']
+        if rows:
+            self.data = np.memmap(os.path.join(store_dir, DATA_FILE),
+                                  dtype=RECORD_DTYPE, mode='r', shape=(rows,))
+        else:
+            self.data = np.zeros(0, dtype=RECORD_DTYPE)
+        self._domains = None
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def domains(self):
+        """Domain dictionary, loaded on first use"""
+        if self._domains is None:
+            with open(os.path.join(self.store_dir, DOMAINS_FILE), 'r') as f:
+                self._domains = [line.rstrip('\n') for line in f]
+        return self._domains
+
+    def host_code(self, host):
+        return self.hosts.index(host) if host in self.hosts else -1
+
+    def success_mask(self):
+        ok = self.statuses.index('NOERROR') if 'NOERROR' in self.statuses else -1
+        return self.data['status'] == ok
+
+
+def load_store(store_dir):
+    return ColumnStore(store_dir)
+
+
+def phase_join(store, host=None):
+    """
+    Match each successful phase-2 re-query with the successful phase-1 query
+    for the same (host, domain). Returns (phase1_rows, phase2_rows): index
+    arrays into store.data, in phase-2 record order.
+    """
+    data = store.data
+    ok = store.success_mask()
+    if host is not None:
+        ok &= data['host'] == store.host_code(host)
+    keys = (data['host'].astype(np.uint64) << np.uint64(32)) | data['domain'].astype(np.uint64)
+
+    p1 = np.flatnonzero(ok & (data['phase'] == 1))
+    p2 = np.flatnonzero(ok & (data['phase'] == 2))
+    if not len(p1) or not len(p2):
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+
+    p1 = p1[np.argsort(keys[p1], kind='stable')]
+    p1_keys = keys[p1]
+    pos = np.minimum(np.searchsorted(p1_keys, keys[p2]), len(p1) - 1)
+    found = p1_keys[pos] == keys[p2]
+    return p1[pos[found]], p2[found]
+
+
+def percentiles(values, qs=(50, 90, 95, 99)):
+    """Dict of percentile -> value (empty input gives zeros)"""
+    if len(values) == 0:
+        return {q: 0.0 for q in qs}
+    return dict(zip(qs, np.percentile(values, qs)))
+
+
+def per_host_stats(store):
+    """Per-host query counts, success rate and phase-1 latency percentiles"""
+    data = store.data
+    ok = store.success_mask()
+    stats = {}
+    for code, host in enumerate(store.hosts):
+        mask = data['host'] == code
+        phase1 = mask & (data['phase'] == 1)
+        phase2 = mask & (data['phase'] == 2)
+        rtt = np.asarray(data['rtt_ms'][phase1 & ok], dtype=np.float64)
+        stats[host] = {
+            'queries': int(mask.sum()),
+            'phase1': int(phase1.sum()),
+            'phase2': int(phase2.sum()),
+            'successful': int((phase1 & ok).sum()),
+            'failed': int((phase1 & ~ok).sum()),
+            'cache_hits': int((phase2 & (data['cache_hit'] == 1)).sum()),
+            'mean_ms': float(rtt.mean()) if len(rtt) else 0.0,
+            'percentiles_ms': percentiles(rtt),
+        }
+    return stats
+
+
+def run(args):
+    """`cn_a2 columns` entry point"""
+    rows = build_from_log(args.log_file, args.store_dir)
+    print(f"[OK] Wrote {rows} records to {args.store_dir}/")
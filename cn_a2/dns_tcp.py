@@ -0,0 +1,368 @@
+"""
+DNS over TCP with Connection Pooling
+Resolves a list of names over a small pool of persistent TCP connections to
+the resolver, pipelining many length-prefixed queries (RFC 7766) on each one
+and matching answers by query ID, so answers may come back in any order.
+Connection setup (the TCP handshake) is timed separately from per-query
+latency; the one-connection-per-query mode shows what reuse saves.
+
+Each host runs the client (`python3 -m cn_a2 tcp-client`); compare with:
+  px from cn_a2.dns_tcp import tcp_bench
+  py tcp_bench(net)                     # pooled + pipelined vs. connection per query
+or start to finish with: sudo python3 -m cn_a2 bench --parts c,t
+"""
+
+import json
+import os
+import random
+import selectors
+import socket
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+
+from .dns_wire import build_query, parse_header, rcode
+from .run_registry import percentile
+
+RESOLVER_IP = '10.0.0.5'
+QUERY_TIMEOUT = 2.0        # seconds before an unanswered query counts as a timeout
+CONNECTIONS = 4            # pool size per host
+PIPELINE = 16              # outstanding queries per connection
+LENGTH = struct.Struct('!H')
+
+
+class _Connection:
+    """One pooled TCP connection and the queries outstanding on it"""
+
+    def __init__(self, sock, opened_ns):
+        self.sock = sock
+        self.opened_ns = opened_ns
+        self.connect_ms = None         # set once the handshake completes
+        self.outstanding = {}          # query ID -> query index
+        self.wbuf = bytearray()
+        self.rbuf = bytearray()
+        self.sent = 0
+        self.next_id = random.randrange(65536)
+
+    def new_id(self):
+        while self.next_id in self.outstanding:
+            self.next_id = (self.next_id + 1) & 0xFFFF
+        qid = self.next_id
+        self.next_id = (self.next_id + 1) & 0xFFFF
+        return qid
+
+
+def resolve_tcp(qnames, qtypes=None, server=RESOLVER_IP, port=53, connections=CONNECTIONS,
+                pipeline=PIPELINE, timeout=QUERY_TIMEOUT, reuse=True):
+    """
+    Resolve every name over TCP. reuse=True keeps `connections` persistent
+    connections with up to `pipeline` queries in flight on each; reuse=False
+    opens a fresh connection per query (at most `connections` at once).
+    A query whose connection is closed by the server is retried once on
+    another connection. Returns a dict with per-query 'latency_ms' (None on
+    timeout or failure, measured from the send on an established connection),
+    'rcode' (-1 without an answer) and 'size' (answer bytes), per-connection
+    'connect_ms' and 'queries', plus 'connect_failures', 'requeued' and
+    'elapsed_s'.
+    """
+    n = len(qnames)
+    qtypes = qtypes or [1] * n
+    latency = [None] * n
+    rcodes = [-1] * n
+    sizes = [0] * n
+    sent_ns = array('q', bytes(8 * n))
+    pending = deque(range(n))
+    retried = set()
+    limit = pipeline if reuse else 1
+    timeout_ns = int(timeout * 1e9)
+
+    sel = selectors.DefaultSelector()
+    live = []
+    done = []                  # closed connections, for reporting
+    connect_failures = 0
+
+    def open_connection():
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setblocking(False)
+        conn = _Connection(sock, time.perf_counter_ns())
+        try:
+            sock.connect((server, port))
+        except BlockingIOError:
+            pass
+        sel.register(sock, selectors.EVENT_WRITE, conn)
+        live.append(conn)
+
+    def close(conn, requeue):
+        sel.unregister(conn.sock)
+        conn.sock.close()
+        live.remove(conn)
+        if conn.connect_ms is not None:
+            done.append(conn)
+        for idx in conn.outstanding.values():
+            if requeue and idx not in retried:
+                retried.add(idx)
+                pending.appendleft(idx)
+        conn.outstanding.clear()
+
+    def watch(conn):
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if conn.wbuf else 0)
+        sel.modify(conn.sock, events, conn)
+
+    start = time.perf_counter_ns()
+    while pending or any(c.outstanding for c in live):
+        now = time.perf_counter_ns()
+
+        # Keep the pool full while there is work; without reuse a connection carries one query,
+        # so one that has not sent yet already has a query coming and needs no companion
+        idle = sum(1 for c in live if c.connect_ms is None or
+                   (len(c.outstanding) < limit if reuse else not c.sent))
+        while len(live) < connections and len(pending) > idle:
+            open_connection()
+            idle += 1
+
+        # Queue queries on established connections with room in their pipeline
+        for conn in live:
+            if conn.connect_ms is None or (not reuse and conn.sent):
+                continue
+            while pending and len(conn.outstanding) < limit:
+                idx = pending.popleft()
+                qid = conn.new_id()
+                query = build_query(qid, qnames[idx], qtypes[idx])
+                conn.wbuf += LENGTH.pack(len(query)) + query
+                conn.outstanding[qid] = idx
+                conn.sent += 1
+                sent_ns[idx] = now
+            if conn.wbuf:
+                watch(conn)
+
+        # Expire stalled queries and handshakes
+        for conn in list(live):
+            if conn.connect_ms is None:
+                if now - conn.opened_ns > timeout_ns:
+                    connect_failures += 1
+                    close(conn, requeue=False)
+                continue
+            for qid, idx in list(conn.outstanding.items()):
+                if now - sent_ns[idx] > timeout_ns:
+                    del conn.outstanding[qid]
+            if not reuse and conn.sent and not conn.outstanding:
+                close(conn, requeue=False)
+
+        # Give up once the resolver stops accepting connections altogether
+        if connect_failures >= connections and not any(c.connect_ms is not None for c in live):
+            break
+
+        for key, events in sel.select(timeout=0.05):
+            conn = key.data
+            if conn not in live:
+                continue
+            if conn.connect_ms is None:
+                err = conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err:
+                    connect_failures += 1
+                    close(conn, requeue=False)
+                    continue
+                conn.connect_ms = (time.perf_counter_ns() - conn.opened_ns) / 1e6
+                connect_failures = 0
+                sel.modify(conn.sock, selectors.EVENT_READ, conn)
+                continue
+            if events & selectors.EVENT_WRITE and conn.wbuf:
+                try:
+                    del conn.wbuf[:conn.sock.send(conn.wbuf)]
+                except (BlockingIOError, InterruptedError):
+                    pass
+                except OSError:
+                    close(conn, requeue=True)
+                    continue
+                watch(conn)
+            if events & selectors.EVENT_READ:
+                try:
+                    data = conn.sock.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    data = b''
+                if not data:
+                    close(conn, requeue=True)   # server closed; retry what was in flight
+                    continue
+                conn.rbuf += data
+                received = time.perf_counter_ns()
+                # Length-prefixed frames, matched by ID in whatever order they arrive
+                while len(conn.rbuf) >= 2:
+                    size = LENGTH.unpack_from(conn.rbuf)[0]
+                    if len(conn.rbuf) < 2 + size:
+                        break
+                    header = parse_header(bytes(conn.rbuf[2:2 + size]))
+                    del conn.rbuf[:2 + size]
+                    idx = conn.outstanding.pop(header[0], None) if header else None
+                    if idx is not None:
+                        latency[idx] = (received - sent_ns[idx]) / 1e6
+                        rcodes[idx] = rcode(header[1])
+                        sizes[idx] = size
+
+    for conn in list(live):
+        close(conn, requeue=False)
+    sel.close()
+    return {
+        'latency_ms': latency,
+        'rcode': rcodes,
+        'size': sizes,
+        'connect_ms': [c.connect_ms for c in done],
+        'queries': [c.sent for c in done],
+        'connect_failures': connect_failures,
+        'requeued': len(retried),
+        'elapsed_s': (time.perf_counter_ns() - start) / 1e9,
+    }
+
+
+def run(args):
+    """`cn_a2 tcp-client` entry point: resolve a names file over TCP and dump the raw results"""
+    with open(args.names, 'r') as f:
+        qnames = [line.strip() for line in f if line.strip()]
+    result = resolve_tcp(qnames, server=args.server, connections=args.connections,
+                         pipeline=args.pipeline, timeout=args.timeout, reuse=not args.no_reuse)
+    with open(args.output, 'w') as f:
+        json.dump(result, f)
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def summarize(result):
+    """Setup cost, per-query latency and reuse for one host's run"""
+    n = len(result['latency_ms'])
+    answered = sorted(x for x in result['latency_ms'] if x is not None)
+    connect = sorted(result['connect_ms'])
+    sizes = [s for s in result['size'] if s]
+    elapsed = result['elapsed_s']
+    return {
+        'queries': n,
+        'answered': len(answered),
+        'noerror': sum(1 for r in result['rcode'] if r == 0),
+        'timeouts': n - len(answered),
+        'connections': len(connect),
+        'connect_failures': result['connect_failures'],
+        'requeued': result['requeued'],
+        'queries_per_connection': round(sum(result['queries']) / len(connect), 1) if connect else 0.0,
+        'connect_p50_ms': round(percentile(connect, 50), 3),
+        'connect_p99_ms': round(percentile(connect, 99), 3),
+        'setup_ms_per_query': round(sum(connect) / n, 3) if n else 0.0,
+        'p50_ms': round(percentile(answered, 50), 3),
+        'p99_ms': round(percentile(answered, 99), 3),
+        'max_answer_bytes': max(sizes) if sizes else 0,
+        'answers_over_512': sum(1 for s in sizes if s > 512),
+        'qps': round(n / elapsed, 2) if elapsed > 0 else 0.0,
+        'elapsed_s': round(elapsed, 3),
+    }
+
+
+def tcp_bench(net, domains=None, connections=CONNECTIONS, pipeline=PIPELINE, server=RESOLVER_IP,
+              timeout=QUERY_TIMEOUT, compare=True):
+    """
+    Resolve every host's domains over TCP from all hosts at once: first with a
+    pool of `connections` persistent connections and `pipeline` queries in
+    flight on each, then (compare=True) with one connection per query. The
+    resolver cache is flushed before each pass so both start cold.
+    """
+    from .run_registry import record_run, topology_config
+    from .work_queue import DEFAULT_DOMAINS, HOSTS, assign_domains, load_domain_files
+
+    print("\n" + "="*80)
+    print(f"DNS over TCP against {server}")
+    print("="*80)
+
+    cwd = os.getcwd()
+    files = load_domain_files(domains or DEFAULT_DOMAINS, cwd)
+    if not files:
+        print(f"[FAIL] No domain files match {domains or DEFAULT_DOMAINS}")
+        return
+    assignment, _ = assign_domains(files, HOSTS, dedup=False)
+    names_files = {}
+    for host_name, names in assignment.items():
+        if names:
+            names_files[host_name] = f'/tmp/tcp_{host_name}.names'
+            with open(names_files[host_name], 'w') as f:
+                f.write('\n'.join(names) + '\n')
+
+    modes = [('pooled', f'{connections} connections x {pipeline} pipelined', '')]
+    if compare:
+        modes.append(('per-query', 'new connection per query', ' --no-reuse'))
+
+    dns_host = net.get('dns')
+    summaries = {}
+    run_ids = {}
+    for mode, label, flag in modes:
+        print(f"\n[*] {mode}: {label}")
+        dns_host.cmd('killall -HUP dnsmasq')  # cold cache for every pass
+        time.sleep(1)
+        outputs = {h: f'/tmp/tcp_{h}_{mode}.json' for h in names_files}
+        for host_name, names in names_files.items():
+            if os.path.exists(outputs[host_name]):
+                os.remove(outputs[host_name])
+            net.get(host_name).sendCmd(
+                f'cd {cwd} && {sys.executable} -m cn_a2 tcp-client {names} {outputs[host_name]} '
+                f'--server {server} --connections {connections} --pipeline {pipeline} '
+                f'--timeout {timeout}{flag}')
+        for host_name in names_files:
+            out = net.get(host_name).waitOutput()
+            if out.strip():
+                print(f"  [{host_name}] {out.strip()}")
+
+        summaries[mode], samples = {}, {}
+        for host_name, output in outputs.items():
+            if not os.path.exists(output):
+                print(f"[FAIL] {host_name}: TCP client produced no results")
+                continue
+            with open(output, 'r') as f:
+                result = json.load(f)
+            s = summaries[mode][host_name] = summarize(result)
+            samples[host_name] = {
+                'latencies_ms': [x for x in result['latency_ms'] if x is not None],
+                'durations_s': [(x if x is not None else timeout * 1000) / 1000 for x in result['latency_ms']],
+                'successful': s['noerror'],
+                'failed': s['queries'] - s['noerror'],
+                'elapsed_s': s['elapsed_s'],
+            }
+        run_ids[mode] = record_run('tcp', {
+            'resolver_ip': server,
+            'transport': 'tcp',
+            'mode': mode,
+            'connections': connections,
+            'pipeline': pipeline if mode == 'pooled' else 1,
+            'timeout_s': timeout,
+            'domains': domains or DEFAULT_DOMAINS,
+            'topology': topology_config(net),
+        }, samples, root=f'{cwd}/results/runs')
+
+    lines = [
+        f"{'Mode':<10} {'Host':<5} {'Queries':>8} {'Conns':>6} {'Q/conn':>7} {'Connect':>9} {'Setup/q':>8} "
+        f"{'p50':>8} {'p99':>8} {'Timeouts':>9} {'>512B':>6} {'QPS':>8}",
+        f"{'':10} {'':5} {'':8} {'':6} {'':7} {'p50 (ms)':>9} {'(ms)':>8} {'(ms)':>8} {'(ms)':>8} "
+        f"{'':9} {'':6} {'':8}",
+        "-"*104,
+    ]
+    for mode, per_host in summaries.items():
+        for host_name, s in per_host.items():
+            lines.append(f"{mode:<10} {host_name.upper():<5} {s['queries']:>8} {s['connections']:>6} "
+                         f"{s['queries_per_connection']:>7.1f} {s['connect_p50_ms']:>9.2f} "
+                         f"{s['setup_ms_per_query']:>8.3f} {s['p50_ms']:>8.1f} {s['p99_ms']:>8.1f} "
+                         f"{s['timeouts']:>9} {s['answers_over_512']:>6} {s['qps']:>8.1f}")
+    print("\n" + '\n'.join(lines))
+    print("\nConnect = TCP handshake; Setup/q = total handshake time / queries; "
+          "p50/p99 = query latency on an established connection")
+
+    os.makedirs(f'{cwd}/results', exist_ok=True)
+    with open(f'{cwd}/results/tcp_summary.txt', 'w') as f:
+        f.write("="*104 + "\n")
+        f.write(f"DNS over TCP against {server}; runs: "
+                + ', '.join(f"{m} {r}" for m, r in run_ids.items()) + "\n")
+        f.write("="*104 + "\n\n")
+        f.write('\n'.join(lines) + "\n")
+    print(f"\n[OK] Summary saved to results/tcp_summary.txt")
+    for mode, run_id in run_ids.items():
+        print(f"[OK] Run recorded ({mode}): results/runs/{run_id}/")
+    return summaries
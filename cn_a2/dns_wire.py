@@ -0,0 +1,92 @@
+"""
+Minimal DNS Wire Format (RFC 1035)
+Just enough to build queries and read response headers without dig or
+third-party DNS libraries, so load generators can keep thousands of
+queries in flight from one process
+"""
+
+import struct
+
+QTYPES = {'A': 1, 'NS': 2, 'CNAME': 5, 'SOA': 6, 'PTR': 12, 'MX': 15, 'TXT': 16,
+          'AAAA': 28, 'SRV': 33, 'SVCB': 64, 'HTTPS': 65, 'ANY': 255}
+QTYPE_NAMES = {v: k for k, v in QTYPES.items()}
+
+HEADER = struct.Struct('!HHHHHH')
+FLAG_QR = 0x8000
+FLAG_RD = 0x0100
+
+
+def encode_name(name):
+    """Domain name as length-prefixed labels"""
+    out = bytearray()
+    for label in name.rstrip('.').split('.'):
+        if label:
+            raw = label.encode('idna') if not label.isascii() else label.encode()
+            out.append(len(raw))
+            out += raw
+    out.append(0)
+    return bytes(out)
+
+
+def build_query(qid, qname, qtype=1, rd=True):
+    """Single-question query packet"""
+    return (HEADER.pack(qid, FLAG_RD if rd else 0, 1, 0, 0, 0)
+            + encode_name(qname) + struct.pack('!HH', qtype, 1))
+
+
+def parse_header(data):
+    """(id, flags, qdcount, ancount, nscount, arcount), None if truncated"""
+    if len(data) < HEADER.size:
+        return None
+    return HEADER.unpack_from(data)
+
+
+def rcode(flags):
+    return flags & 0x000F
+
+
+def skip_name(data, off):
+    """Offset just past the (possibly compressed) name starting at off"""
+    while True:
+        n = data[off]
+        if n == 0:
+            return off + 1
+        if n & 0xC0 == 0xC0:
+            return off + 2
+        off += n + 1
+
+
+def question_key(data):
+    """Question (name, type, class) bytes of a packet with the name lower-cased, None if malformed"""
+    try:
+        end = skip_name(data, HEADER.size) + 4
+    except IndexError:
+        return None
+    if end > len(data):
+        return None
+    return bytes(data[HEADER.size:end - 4]).lower() + bytes(data[end - 4:end])   # type/class bytes keep their value
+
+
+RR = struct.Struct('!HHIH')
+TYPE_OPT = 41
+
+
+def ttl_offsets(data):
+    """Offsets of the TTL field of every resource record except OPT, None if malformed"""
+    header = parse_header(data)
+    if header is None:
+        return None
+    try:
+        off = HEADER.size
+        for _ in range(header[2]):
+            off = skip_name(data, off) + 4
+        offsets = []
+        for _ in range(header[3] + header[4] + header[5]):
+            off = skip_name(data, off)
+            rtype, _, _, rdlength = RR.unpack_from(data, off)
+            if rtype != TYPE_OPT:
+                offsets.append(off + 4)
+            off += RR.size + rdlength
+    except (IndexError, struct.error):
+        return None
+    return offsets if off <= len(data) else None
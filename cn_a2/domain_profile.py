@@ -0,0 +1,183 @@
+"""
+Per-Domain Query and Response Profiles
+What the extraction pass records beyond the query names, so workloads can
+reproduce a capture's real qtype mix and TTL behaviour instead of sending
+only A queries with a fixed TTL:
+  - queries (qr == 0): qtype counts per name
+  - responses (qr == 1): rcode counts, the minimum answer TTL, the negative
+    TTL (authority SOA) of answerless responses, and the DNS payload size
+
+`cn_a2 extract` writes one profile per capture next to its domain list:
+domains/profile_<capture>.json
+
+    profile = load_profile('domains/profile_PCAP_1_H1.json')
+    qtypes, weights = qtype_mix(profile)              # capture-wide mix
+    qtypes, weights = qtype_mix(profile, 'example.com')
+    python3 -m cn_a2 workload workloads/capture --profile domains/profile_PCAP_1_H1.json
+
+Per-domain TTLs and sizes are kept as running [min, mean, max] aggregates, so
+a profile's memory grows with the number of names, not of packets.
+"""
+
+import json
+import os
+
+from .answer_store import RCODE_NAMES
+from .dns_wire import QTYPE_NAMES, QTYPES
+
+MIX_TTLS = 16   # distinct TTLs kept in a workload TTL mix
+
+
+def qtype_name(qtype):
+    return QTYPE_NAMES.get(qtype, f'TYPE{qtype}')
+
+
+class _Spread:
+    """Running min, max and mean of a stream of values"""
+    __slots__ = ('n', 'total', 'lo', 'hi')
+
+    def __init__(self, value):
+        self.n, self.total, self.lo, self.hi = 1, value, value, value
+
+    def add(self, value):
+        self.n += 1
+        self.total += value
+        if value < self.lo:
+            self.lo = value
+        elif value > self.hi:
+            self.hi = value
+
+    def to_list(self):
+        """[min, mean, max]"""
+        return [self.lo, round(self.total / self.n, 1), self.hi]
+
+
+def _add(spread, value):
+    """Add value to spread (None = empty); returns the spread"""
+    if spread is None:
+        return _Spread(value)
+    spread.add(value)
+    return spread
+
+
+class _Domain:
+    __slots__ = ('qtypes', 'rcodes', 'ttls', 'neg_ttls', 'sizes')
+
+    def __init__(self):
+        self.qtypes = {}
+        self.rcodes = {}
+        self.ttls = None
+        self.neg_ttls = None
+        self.sizes = None
+
+
+class DomainProfile:
+    """Query and response statistics of one capture, keyed by lower-cased name"""
+
+    def __init__(self, name):
+        self.name = name
+        self.domains = {}
+        self.queries = 0
+        self.responses = 0
+
+    def _entry(self, domain):
+        entry = self.domains.get(domain)
+        if entry is None:
+            entry = self.domains[domain] = _Domain()
+        return entry
+
+    def add_query(self, domain, qtype):
+        counts = self._entry(domain.lower()).qtypes
+        counts[qtype] = counts.get(qtype, 0) + 1
+        self.queries += 1
+
+    def add_response(self, domain, rcode, size, ttl=None, neg_ttl=None):
+        entry = self._entry(domain.lower())
+        entry.rcodes[rcode] = entry.rcodes.get(rcode, 0) + 1
+        entry.sizes = _add(entry.sizes, size)
+        if ttl is not None:
+            entry.ttls = _add(entry.ttls, ttl)
+        if neg_ttl is not None:
+            entry.neg_ttls = _add(entry.neg_ttls, neg_ttl)
+        self.responses += 1
+
+    def to_dict(self):
+        qtypes, rcodes = {}, {}
+        domains = {}
+        for domain, e in sorted(self.domains.items()):
+            for q, n in e.qtypes.items():
+                qtypes[qtype_name(q)] = qtypes.get(qtype_name(q), 0) + n
+            for r, n in e.rcodes.items():
+                name = RCODE_NAMES.get(r, str(r))
+                rcodes[name] = rcodes.get(name, 0) + n
+            d = {'qtypes': {qtype_name(q): n for q, n in sorted(e.qtypes.items())}}
+            if e.rcodes:
+                d['rcodes'] = {RCODE_NAMES.get(r, str(r)): n for r, n in sorted(e.rcodes.items())}
+                d['resp_bytes'] = e.sizes.to_list()
+            if e.ttls:
+                d['ttl'] = e.ttls.to_list()
+            if e.neg_ttls:
+                d['neg_ttl'] = e.neg_ttls.to_list()
+            domains[domain] = d
+        return {
+            'capture': self.name,
+            'queries': self.queries,
+            'responses': self.responses,
+            'qtypes': dict(sorted(qtypes.items(), key=lambda kv: -kv[1])),
+            'rcodes': dict(sorted(rcodes.items(), key=lambda kv: -kv[1])),
+            'domains': domains,
+        }
+
+    def save(self, path):
+        """Write the profile as JSON; returns the saved dict"""
+        data = self.to_dict()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        return data
+
+
+def load_profile(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def qtype_mix(profile, domain=None):
+    """(qtype names, relative weights) for one domain, or for the whole capture"""
+    counts = profile['qtypes']
+    if domain is not None:
+        entry = profile['domains'].get(domain.lower())
+        if entry and entry['qtypes']:
+            counts = entry['qtypes']
+    total = sum(counts.values()) or 1
+    return list(counts), [n / total for n in counts.values()]
+
+
+def _weights_spec(weights):
+    """{key: weight} -> 'key:w,key:w' as taken by ZipfWorkload"""
+    total = sum(weights.values()) or 1
+    return ','.join(f'{k}:{w / total:.4g}' for k, w in weights.items())
+
+
+def workload_mix(profile):
+    """ZipfWorkload qtypes / ttls / nxdomain matching a capture profile
+
+    qtypes: the capture-wide mix (qtypes a workload cannot send are dropped)
+    ttls: each answered domain's mean TTL, weighted by its queries; the
+          MIX_TTLS heaviest values are kept
+    nxdomain: NXDOMAIN share of all responses
+    A key is None when the profile has nothing to derive it from.
+    """
+    qtypes = {q: n for q, n in profile['qtypes'].items() if q in QTYPES}
+    ttls = {}
+    for entry in profile['domains'].values():
+        if 'ttl' in entry:
+            ttl = max(1, int(entry['ttl'][1]))
+            ttls[ttl] = ttls.get(ttl, 0) + (sum(entry['qtypes'].values()) or 1)
+    ttls = dict(sorted(ttls.items(), key=lambda kv: -kv[1])[:MIX_TTLS])
+    responses = sum(profile['rcodes'].values())
+    return {
+        'qtypes': _weights_spec(qtypes) if qtypes else None,
+        'ttls': _weights_spec(dict(sorted(ttls.items()))) if ttls else None,
+        'nxdomain': profile['rcodes'].get('NXDOMAIN', 0) / responses if responses else None,
+    }
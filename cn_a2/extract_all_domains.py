@@ -0,0 +1,189 @@
+"""
+Batch DNS Domain Extractor for CS331 Assignment 2
+Uses PcapReader approach from CN_A1 for memory-efficient processing
+
+Run outside Mininet: python3 -m cn_a2 extract [--pcap-dir as2pcaps] [--output-dir domains]
+Also writes a MinHash + HyperLogLog sketch per capture for `cn_a2 overlap`
+and a per-domain qtype / TTL / rcode / response size profile (domain_profile.py)
+"""
+import os
+import glob
+
+from .domain_profile import DomainProfile
+from .sketches import CaptureSketch
+
+def is_valid_domain(domain):
+    """Filter out invalid/local domains (from CN_A1)"""
+    d = domain.lower()
+    
+    # Skip local/mDNS/service discovery
+    if d.endswith('.local'):
+        return False
+    if d.startswith('_'):
+        return False
+    
+    # Must have at least one dot (avoid single labels like "localhost")
+    if '.' not in d:
+        return False
+    
+    return True
+
+def _min_ttl(records, count):
+    """Smallest TTL among the first `count` records of an an/ns section, None if none"""
+    ttls = []
+    for i in range(count):
+        try:
+            ttls.append(records[i].ttl)
+        except (IndexError, AttributeError, TypeError):
+            break
+    return min(ttls) if ttls else None
+
+def extract_domains_from_pcap(pcap_file, sketch=None, profile=None):
+    """
+    Extract DNS queries using PcapReader (from CN_A1)
+    Memory-efficient streaming approach
+    sketch: optional sketches.CaptureSketch, fed every new domain in the same pass
+    profile: optional domain_profile.DomainProfile, fed the qtype of every query
+    and the rcode, TTLs and size of every response (qr == 1) in the same pass
+    """
+    # scapy.all takes seconds to import, so only pay for it when parsing pcaps
+    from scapy.all import PcapReader, DNS, DNSQR, UDP
+    
+    domains = set()
+    packet_count = 0
+    dns_count = 0
+    response_count = 0
+    
+    try:
+        with PcapReader(pcap_file) as pcap:
+            for pkt in pcap:
+                packet_count += 1
+                
+                # Show progress every 50000 packets
+                if packet_count % 50000 == 0:
+                    print(f"    Processed {packet_count} packets, found {len(domains)} domains...")
+                
+                # One layer lookup each; the DNS layer is already dissected by PcapReader
+                dns = pkt.getlayer(DNS)
+                if dns is None:
+                    continue
+                question = dns.getlayer(DNSQR)
+                if question is None:
+                    continue
+                
+                # Queries (qr == 0): the domain list, sketch and qtype mix
+                if dns.qr == 0:
+                    dns_count += 1
+                    try:
+                        domain = question.qname.decode().rstrip('.')
+                        if not is_valid_domain(domain):
+                            continue
+                        if profile is not None:
+                            profile.add_query(domain, question.qtype)
+                        if domain not in domains:
+                            domains.add(domain)
+                            if sketch is not None:
+                                sketch.add(domain)
+                    except:
+                        # Skip malformed domains
+                        pass
+                
+                # Responses (qr == 1): rcode, answer / negative TTL and payload size
+                elif profile is not None:
+                    response_count += 1
+                    try:
+                        domain = question.qname.decode().rstrip('.')
+                        if not is_valid_domain(domain):
+                            continue
+                        udp = pkt.getlayer(UDP)
+                        size = udp.len - 8 if udp is not None and udp.len else len(bytes(dns))
+                        ttl = _min_ttl(dns.an, dns.ancount) if dns.ancount else None
+                        neg_ttl = _min_ttl(dns.ns, dns.nscount) if not dns.ancount and dns.nscount else None
+                        profile.add_response(domain, dns.rcode, size, ttl, neg_ttl)
+                    except:
+                        pass
+        
+        print(f"    Total packets: {packet_count}, DNS queries: {dns_count}, responses: {response_count}")
+        return sorted(domains)
+        
+    except Exception as e:
+        print(f"    Error: {e}")
+        return []
+
+def process_all_pcaps(pcap_dir='as2pcaps', output_dir='domains'):
+    """Process all PCAP files in as2pcaps directory"""
+    
+    if not os.path.exists(pcap_dir):
+        print(f"Error: Directory '{pcap_dir}' not found")
+        return
+    
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    
+    pcap_files = glob.glob(os.path.join(pcap_dir, '*.pcap'))
+    
+    if not pcap_files:
+        print(f"No PCAP files found in {pcap_dir}")
+        return
+    
+    print("=" * 70)
+    print("DNS Domain Extraction Tool - CS331 Assignment 2")
+    print("Using PcapReader approach from CN_A1")
+    print("=" * 70)
+    print()
+    
+    results = []
+    
+    for pcap_file in sorted(pcap_files):
+        base_name = os.path.basename(pcap_file).replace('.pcap', '')
+        output_file = os.path.join(output_dir, f"domains_{base_name}.txt")
+        
+        print(f"Processing: {os.path.basename(pcap_file)}")
+        
+        sketch = CaptureSketch(base_name)
+        profile = DomainProfile(base_name)
+        domains = extract_domains_from_pcap(pcap_file, sketch, profile)
+        
+        if not domains:
+            print(f"  No domains found!")
+            print()
+            continue
+        
+        # Save to file
+        with open(output_file, 'w') as f:
+            for domain in domains:
+                f.write(domain + '\n')
+        
+        # Sketch for cross-capture overlap (names are case-folded there)
+        sketch.distinct = len({d.lower() for d in domains})
+        sketch_file = os.path.join(output_dir, 'sketches', f"{base_name}.json")
+        sketch.save(sketch_file)
+        
+        # Qtype mix, TTLs, rcodes and response sizes for workload generation
+        profile_file = os.path.join(output_dir, f"profile_{base_name}.json")
+        saved = profile.save(profile_file)
+        
+        print(f"  ✓ Found {len(domains)} unique valid domains")
+        print(f"  ✓ Saved to: {output_file}")
+        print(f"  ✓ Sketch saved to: {sketch_file}")
+        mix = ', '.join(f"{q} {n * 100 / profile.queries:.0f}%" for q, n in list(saved['qtypes'].items())[:4]) or 'none'
+        print(f"  ✓ Profile saved to: {profile_file} (qtypes: {mix}; {profile.responses} responses)")
+        print()
+        
+        results.append((base_name, len(domains), output_file))
+    
+    # Summary
+    print("=" * 70)
+    print("Extraction Complete!")
+    print("=" * 70)
+    print()
+    print("Summary:")
+    for name, count, file in results:
+        print(f"  {file:40s} : {count:5d} domains")
+    print()
+    print(f"Total: {len(results)} PCAP files processed successfully")
+    print(f"Overlap across captures: python3 -m cn_a2 overlap --sketch-dir {os.path.join(output_dir, 'sketches')}")
+
+def run(args):
+    """`cn_a2 extract` entry point"""
+    process_all_pcaps(args.pcap_dir, args.output_dir)
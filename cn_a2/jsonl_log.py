@@ -0,0 +1,148 @@
+"""
+Append-only JSON Lines logging for query records
+Batched writes, optional size-based rotation and gzip compression of rotated
+segments, and streaming readers for the analysis scripts
+"""
+
+import glob
+import gzip
+import json
+import os
+import re
+
+
+class JsonlWriter:
+    """
+    Append one JSON object per line to `path`.
+
+    Records are buffered and written every `batch_size` records, so a crash
+    loses at most one batch. With `max_bytes` set, the active file is rotated
+    to `<stem>.<NNNNN>.jsonl` (gzip-compressed if `compress`) once it grows
+    past that size; `max_files` caps how many rotated segments are kept.
+    """
+
+    def __init__(self, path, batch_size=100, max_bytes=None, compress=False, max_files=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.max_files = max_files
+        self.count = 0
+        self._buffer = []
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'a')
+        segments = _rotated_segments(path)
+        self._next_segment = _segment_number(segments[-1]) + 1 if segments else 1
+
+    def write(self, record):
+        self._buffer.append(json.dumps(record, separators=(',', ':')))
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write('\n'.join(self._buffer) + '\n')
+            self._buffer = []
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def close(self):
+        if self._file:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rotate(self):
+        self._file.close()
+        stem = self.path[:-len('.jsonl')] if self.path.endswith('.jsonl') else self.path
+        segment = f'{stem}.{self._next_segment:05d}.jsonl'
+        self._next_segment += 1
+        os.replace(self.path, segment)
+        if self.compress:
+            with open(segment, 'rb') as src, gzip.open(segment + '.gz', 'wb') as dst:
+                while True:
+                    chunk = src.read(1 << 20)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            os.remove(segment)
+        if self.max_files:
+            for old in _rotated_segments(self.path)[:-self.max_files]:
+                os.remove(old)
+        self._file = open(self.path, 'a')
+
+
+def _segment_number(segment):
+    return int(re.search(r'\.(\d{5})\.jsonl(?:\.gz)?$', segment).group(1))
+
+
+def _rotated_segments(path):
+    """Rotated segments of `path`, oldest first"""
+    stem = path[:-len('.jsonl')] if path.endswith('.jsonl') else path
+    found = glob.glob(glob.escape(stem) + '.[0-9][0-9][0-9][0-9][0-9].jsonl*')
+    found = [s for s in found if re.search(r'\.\d{5}\.jsonl(?:\.gz)?$', s)]
+    return sorted(found, key=_segment_number)
+
+
+def log_segments(path):
+    """All files making up a log, oldest first (rotated segments, then active file)"""
+    segments = _rotated_segments(path)
+    if os.path.exists(path):
+        segments.append(path)
+    return segments
+
+
+def remove_log(path):
+    """Delete a log and all its rotated segments (start of a fresh run)"""
+    for segment in log_segments(path):
+        os.remove(segment)
+
+
+def iter_jsonl(path):
+    """Stream records from a (possibly rotated and compressed) JSON Lines log"""
+    for segment in log_segments(path):
+        opener = gzip.open if segment.endswith('.gz') else open
+        with opener(segment, 'rt') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _legacy_path(path):
+    stem = path[:-len('.jsonl')] if path.endswith('.jsonl') else path
+    return stem + '.json'
+
+
+def logs_exist(path):
+    """True if a JSONL log or its legacy JSON counterpart is present"""
+    return bool(log_segments(path)) or os.path.exists(_legacy_path(path))
+
+
+def log_mtime(path):
+    """Modification time of the newest file in a log (None if there is no log)"""
+    files = log_segments(path) or [p for p in [_legacy_path(path)] if os.path.exists(p)]
+    return max(os.path.getmtime(f) for f in files) if files else None
+
+
+def iter_logs(path):
+    """
+    Stream query records from the JSON Lines log at `path`. Runs recorded
+    before JSONL logging only have a JSON array file (same stem, `.json`);
+    that file is loaded as a fallback.
+    """
+    if log_segments(path):
+        yield from iter_jsonl(path)
+        return
+    legacy = _legacy_path(path)
+    if os.path.exists(legacy):
+        with open(legacy, 'r') as f:
+            yield from json.load(f)
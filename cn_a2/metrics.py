@@ -0,0 +1,248 @@
+"""
+Live Run Metrics
+In-process counters, gauges and rolling-window histograms, updated from the
+query hot path (QueryLog.append) and exposed while a run is in progress:
+  - on http://127.0.0.1:<port>/metrics in Prometheus text format
+  - as a one-line console status every few seconds:
+      [live] 1520 queries | 24.1 q/s | 96.2% ok | p50 12.3 ms | p99 180.4 ms (last 10s)
+
+Usage:
+    with live_metrics(port=9100) as metrics:
+        log = QueryLog(run_id, metrics=metrics)
+        ...
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WINDOW = 10.0              # seconds covered by rolling rates and quantiles
+STATUS_INTERVAL = 5.0      # seconds between console status lines
+
+# Latency bucket bounds (ms): 10 per decade from 0.1 ms to 100 s
+BOUNDS_MS = [round(10 ** (e / 10), 4) for e in range(-10, 51)]
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{v}"' for n, v in zip(names, values)) + '}'
+
+
+class Counter:
+    """Monotonic count, optionally split by label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, n=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + n
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def total(self):
+        return sum(self._values.values())
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _labels(self.labels, k), v) for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def dec(self, *label_values, n=1):
+        self.inc(*label_values, n=-n)
+
+
+class RollingHistogram:
+    """
+    Latency histogram over the last `window` seconds: one bucket array per
+    second in a ring, merged on read. Cumulative _count / _sum are kept for
+    Prometheus; quantiles are interpolated within a bucket (about +-12%).
+    """
+
+    kind = 'summary'
+
+    def __init__(self, name, help, window=WINDOW, quantiles=(0.5, 0.9, 0.99)):
+        self.name, self.help = name, help
+        self.window = window
+        self.quantiles = quantiles
+        self._slots = int(window) + 1
+        self._second = [-1] * self._slots
+        self._counts = [[0] * (len(BOUNDS_MS) + 1) for _ in range(self._slots)]
+        self._ok = [0] * self._slots
+        self.count = 0
+        self.sum_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms, ok=True):
+        second = int(time.monotonic())
+        b = bisect.bisect_left(BOUNDS_MS, value_ms)
+        with self._lock:
+            slot = second % self._slots
+            if self._second[slot] != second:
+                self._second[slot] = second
+                self._counts[slot] = [0] * (len(BOUNDS_MS) + 1)
+                self._ok[slot] = 0
+            self._counts[slot][b] += 1
+            self._ok[slot] += ok
+            self.count += 1
+            self.sum_ms += value_ms
+
+    def window_stats(self):
+        """(observations, ok observations, merged bucket counts) in the window"""
+        now = int(time.monotonic())
+        merged = [0] * (len(BOUNDS_MS) + 1)
+        n = ok = 0
+        with self._lock:
+            for slot in range(self._slots):
+                if now - self._second[slot] < self.window:
+                    for b, c in enumerate(self._counts[slot]):
+                        merged[b] += c
+                    n += sum(self._counts[slot])
+                    ok += self._ok[slot]
+        return n, ok, merged
+
+    @staticmethod
+    def quantile(merged, q):
+        total = sum(merged)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for b, c in enumerate(merged):
+            if c and seen + c >= rank:
+                lo = BOUNDS_MS[b - 1] if b > 0 else 0.0
+                hi = BOUNDS_MS[b] if b < len(BOUNDS_MS) else BOUNDS_MS[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return BOUNDS_MS[-1]
+
+    def samples(self):
+        _, _, merged = self.window_stats()
+        out = [(self.name, f'{{quantile="{q}"}}', round(self.quantile(merged, q) / 1000, 6)) for q in self.quantiles]
+        out.append((f'{self.name}_sum', '', round(self.sum_ms / 1000, 6)))
+        out.append((f'{self.name}_count', '', self.count))
+        return out
+
+
+class Registry:
+    """Named metrics, rendered in Prometheus text exposition format"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def exposition(self):
+        lines = []
+        for m in self.metrics:
+            lines.append(f'# HELP {m.name} {m.help}')
+            lines.append(f'# TYPE {m.name} {m.kind}')
+            lines.extend(f'{name}{labels} {value!r}' for name, labels, value in m.samples())
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics from a daemon thread; returns the server (call shutdown() to stop)"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+
+class QueryMetrics:
+    """The metrics every harness reports, fed one query at a time by observe()"""
+
+    def __init__(self, window=WINDOW):
+        self.registry = Registry()
+        self.queries = self.registry.add(Counter(
+            'dns_queries_total', 'Queries completed, by host and outcome', ('host', 'status')))
+        self.latency = self.registry.add(RollingHistogram(
+            'dns_query_duration_seconds', f'Query wall time over the last {window:g}s', window))
+        self.last_query = self.registry.add(Gauge(
+            'dns_last_query_timestamp_seconds', 'Unix time of the most recent completed query'))
+        self.started = time.monotonic()
+
+    def observe(self, host, status, latency_ms):
+        self.queries.inc(host, status)
+        self.latency.observe(latency_ms, status == 'NOERROR')
+        self.last_query.set(time.time())
+
+    def status_line(self):
+        n, ok, merged = self.latency.window_stats()
+        span = min(self.latency.window, max(time.monotonic() - self.started, 1e-9))
+        return (f"[live] {self.latency.count} queries | {n / span:.1f} q/s | "
+                f"{ok * 100 / n if n else 0:.1f}% ok | "
+                f"p50 {RollingHistogram.quantile(merged, 0.5):.1f} ms | "
+                f"p99 {RollingHistogram.quantile(merged, 0.99):.1f} ms "
+                f"(last {self.latency.window:g}s)")
+
+
+@contextmanager
+def live_metrics(port=None, console=True, interval=STATUS_INTERVAL, window=WINDOW):
+    """
+    QueryMetrics for the duration of a run; with `port`, /metrics is served on
+    127.0.0.1:<port>; with `console`, a status line is printed every `interval` s.
+    Yields None when both are off, so the hot path skips the updates entirely
+    """
+    if not port and not console:
+        yield None
+        return
+    metrics = QueryMetrics(window)
+    server = None
+    if port:
+        server = metrics.registry.serve(port)
+        print(f"[*] Live metrics: http://127.0.0.1:{port}/metrics")
+    stop = threading.Event()
+    printer = None
+    if console:
+        def report():
+            while not stop.wait(interval):
+                if metrics.latency.count:
+                    print(metrics.status_line(), flush=True)
+        printer = threading.Thread(target=report, name='metrics-console', daemon=True)
+        printer.start()
+    try:
+        yield metrics
+    finally:
+        stop.set()
+        if printer:
+            printer.join()
+        if server:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,249 @@
+"""
+Queue and Port Counter Sampling
+Polls `tc -s qdisc` on every host and switch interface and the OVS port
+statistics at a fixed interval while harnesses run, and appends the raw
+(cumulative) counters to results/netstats.jsonl. Samples carry `ts_ns`
+(ns since the epoch, time.time_ns()), the same time base as the query
+records, so slow queries can be lined up with queue build-up and drops on
+the shaped links (TCLink: htb for bandwidth, netem for delay/loss).
+
+Record a run: sudo python3 -m cn_a2 bench --parts c,d --netstats 0.5
+Line up:      python3 -m cn_a2 netstats [results/netstats.jsonl] [--slowest 10]
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+
+from .jsonl_log import JsonlWriter, iter_jsonl, remove_log
+
+NETSTATS_LOG = 'results/netstats.jsonl'
+INTERVAL = 1.0             # seconds between samples
+TC_FIELDS = ('bytes', 'packets', 'drops', 'overlimits', 'requeues', 'backlog', 'qlen')
+OVS_FIELDS = ('rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets', 'rx_dropped', 'tx_dropped')
+
+
+def _run(argv):
+    try:
+        return subprocess.run(argv, capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return ''
+
+
+def parse_tc(text, devices=None):
+    """Rows of `tc -s -j qdisc show` output, optionally only for `devices`"""
+    try:
+        qdiscs = json.loads(text) if text.strip() else []
+    except ValueError:
+        return []
+    rows = []
+    for q in qdiscs:
+        if devices is not None and q.get('dev') not in devices:
+            continue
+        row = {'dev': q.get('dev'), 'qdisc': q.get('kind'), 'handle': q.get('handle')}
+        row.update({f: q.get(f, 0) for f in TC_FIELDS})
+        rows.append(row)
+    return rows
+
+
+def parse_ovs(text, ports):
+    """Rows of `ovs-vsctl --format=json list Interface` statistics for `ports`"""
+    try:
+        table = json.loads(text) if text.strip() else {'headings': [], 'data': []}
+    except ValueError:
+        return []
+    col = {h: i for i, h in enumerate(table['headings'])}
+    rows = []
+    for entry in table['data']:
+        name = entry[col['name']]
+        if name not in ports:
+            continue
+        stats = dict(entry[col['statistics']][1])
+        rows.append({'dev': name, **{f: stats.get(f, 0) for f in OVS_FIELDS}})
+    return rows
+
+
+class NetSampler:
+    """
+    Background sampler over a running Mininet network. Namespaced nodes are
+    polled with `mnexec -a <pid>` instead of node.cmd(), which is not safe to
+    call while a harness is using the same node's shell.
+    """
+
+    def __init__(self, net, interval=INTERVAL, path=NETSTATS_LOG):
+        self.interval = interval
+        self.path = path
+        self.samples = 0
+        self.sample_ms = 0.0
+        self.namespaced = []       # (node name, pid, interfaces)
+        self.root_devices = {}     # interface in the root namespace -> node name
+        self.switch_ports = {}     # OVS port -> switch name
+        for node in net.hosts:
+            intfs = {i.name for i in node.intfList() if i.name != 'lo'}
+            if getattr(node, 'inNamespace', True):
+                self.namespaced.append((node.name, node.pid, intfs))
+            else:
+                self.root_devices.update({i: node.name for i in intfs})   # e.g. the NAT node
+        for switch in net.switches:
+            for intf in switch.intfList():
+                if intf.name != 'lo':
+                    self.switch_ports[intf.name] = switch.name
+        self.root_devices.update(self.switch_ports)
+        self._stop = threading.Event()
+        self._thread = None
+        self._writer = None
+
+    def sample(self):
+        """Take one sample of every interface; returns the rows written"""
+        ts_ns = time.time_ns()
+        start = time.perf_counter()
+        rows = []
+        for name, pid, intfs in self.namespaced:
+            for row in parse_tc(_run(['mnexec', '-a', str(pid), 'tc', '-s', '-j', 'qdisc', 'show']), intfs):
+                rows.append({'ts_ns': ts_ns, 'node': name, 'source': 'tc', **row})
+        for row in parse_tc(_run(['tc', '-s', '-j', 'qdisc', 'show']), self.root_devices):
+            rows.append({'ts_ns': ts_ns, 'node': self.root_devices[row['dev']], 'source': 'tc', **row})
+        ovs = _run(['ovs-vsctl', '--format=json', '--columns=name,statistics', 'list', 'Interface'])
+        for row in parse_ovs(ovs, self.switch_ports):
+            rows.append({'ts_ns': ts_ns, 'node': self.switch_ports[row['dev']], 'source': 'ovs', **row})
+        for row in rows:
+            self._writer.write(row)
+        self.samples += 1
+        self.sample_ms += (time.perf_counter() - start) * 1000
+        return rows
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        remove_log(self.path)
+        self._writer = JsonlWriter(self.path, batch_size=500)
+        self._thread = threading.Thread(target=self._loop, name='netstats', daemon=True)
+        self._thread.start()
+        print(f"[*] Sampling tc qdiscs and OVS ports every {self.interval:g}s -> {self.path}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()              # closing sample, so counter deltas cover the whole run
+        self._writer.close()
+        avg = self.sample_ms / self.samples if self.samples else 0.0
+        print(f"[OK] {self.samples} netstats samples ({avg:.0f} ms each) saved to {self.path}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============================================================================
+# Analysis
+# ============================================================================
+
+def load_samples(path=NETSTATS_LOG):
+    """{(node, dev, source, qdisc handle): [row, ...]} in time order"""
+    series = {}
+    for row in iter_jsonl(path):
+        key = (row['node'], row['dev'], row['source'], row.get('handle'))
+        series.setdefault(key, []).append(row)
+    for rows in series.values():
+        rows.sort(key=lambda r: r['ts_ns'])
+    return series
+
+
+def _label(key, rows):
+    node, dev, source, handle = key
+    return f"{dev} {rows[0]['qdisc']} {handle}" if source == 'tc' else f"{dev} ovs"
+
+
+def summarize_series(series):
+    """Per interface/qdisc: peak backlog and queue length, counter deltas over the run"""
+    out = []
+    for key, rows in series.items():
+        first, last = rows[0], rows[-1]
+        span = (last['ts_ns'] - first['ts_ns']) / 1e9
+        if key[2] == 'tc':
+            sent = last['bytes'] - first['bytes']
+            out.append({'node': key[0], 'what': _label(key, rows), 'samples': len(rows),
+                        'peak_backlog': max(r['backlog'] for r in rows), 'peak_qlen': max(r['qlen'] for r in rows),
+                        'drops': last['drops'] - first['drops'],
+                        'overlimits': last['overlimits'] - first['overlimits'],
+                        'mbps': sent * 8 / span / 1e6 if span else 0.0})
+        else:
+            sent = last['tx_bytes'] - first['tx_bytes']
+            out.append({'node': key[0], 'what': _label(key, rows), 'samples': len(rows),
+                        'peak_backlog': 0, 'peak_qlen': 0,
+                        'drops': (last['rx_dropped'] - first['rx_dropped']) + (last['tx_dropped'] - first['tx_dropped']),
+                        'overlimits': 0,
+                        'mbps': sent * 8 / span / 1e6 if span else 0.0})
+    return sorted(out, key=lambda r: (r['node'], r['what']))
+
+
+def queues_during(series, start_ns, end_ns, top=3):
+    """Interfaces with the largest backlog (and any drops) between start_ns and end_ns"""
+    busy = []
+    for key, rows in series.items():
+        if key[2] != 'tc':
+            continue
+        inside = [r for r in rows if start_ns <= r['ts_ns'] <= end_ns]
+        before = [r for r in rows if r['ts_ns'] < start_ns]
+        if not inside:
+            continue
+        ref = before[-1] if before else inside[0]
+        backlog = max(r['qlen'] for r in inside)
+        drops = inside[-1]['drops'] - ref['drops']
+        if backlog or drops:
+            busy.append((backlog, drops, _label(key, rows)))
+    busy.sort(reverse=True)
+    return busy[:top]
+
+
+def run(args):
+    """`cn_a2 netstats` entry point"""
+    from datetime import datetime
+
+    if not os.path.exists(args.log):
+        print(f"[FAIL] No samples at {args.log}; record some with bench --netstats INTERVAL")
+        return 1
+    series = load_samples(args.log)
+    summary = summarize_series(series)
+
+    print("="*100)
+    print(f"QUEUE AND PORT COUNTERS ({args.log})")
+    print("="*100)
+    print(f"{'Node':<6} {'Interface / qdisc':<28} {'Samples':>8} {'Peak backlog':>13} {'Peak qlen':>10} "
+          f"{'Drops':>7} {'Overlimits':>11} {'Mbps':>8}")
+    print("-"*100)
+    for r in summary:
+        print(f"{r['node']:<6} {r['what']:<28} {r['samples']:>8} {r['peak_backlog']:>12}B {r['peak_qlen']:>10} "
+              f"{r['drops']:>7} {r['overlimits']:>11} {r['mbps']:>8.2f}")
+
+    if not args.slowest or not os.path.isdir(args.store):
+        return 0
+    from .columnar_store import load_store
+    import numpy as np
+
+    store = load_store(args.store)
+    data = store.data
+    if not len(data):
+        return 0
+    window_ns = int(args.window * 1e9)
+    print(f"\nSlowest {args.slowest} queries in {args.store} and the queues around them (+-{args.window:g}s)")
+    print("-"*100)
+    for i in np.argsort(data['total_ms'])[::-1][:args.slowest]:
+        rec = data[i]
+        start = int(rec['ts_ns'])
+        end = start + int(rec['total_ms'] * 1e6)
+        busy = queues_during(series, start - window_ns, end + window_ns)
+        when = datetime.fromtimestamp(start / 1e9).strftime('%H:%M:%S.%f')[:-3]
+        queues = '; '.join(f"{label}: qlen {qlen}" + (f", {drops} drops" if drops else '')
+                           for qlen, drops, label in busy) or 'no queue build-up'
+        print(f"{store.hosts[rec['host']]:<4} {store.domains[rec['domain']][:30]:<30} "
+              f"{rec['total_ms']:>8.1f} ms @ {when}  {queues}")
+    return 0
@@ -0,0 +1,231 @@
+"""
+Part B for Mininet - Simple version using dig command
+Run from Mininet CLI:
+  px from cn_a2.part_b_mininet import test_part_b
+  py test_part_b(net)
+or start to finish with: sudo python3 -m cn_a2 bench --parts b
+"""
+
+from .work_queue import DEFAULT_DOMAINS
+
+
+def test_part_b(net, profile=False, domains=DEFAULT_DOMAINS, shared_queue=False, policy=None, metrics=None):
+    """
+    Run Part B DNS tests in Mininet (profile=True prints a per-stage timing breakdown)
+    domains: comma-separated globs of domain files; a `_H<n>.txt` suffix picks the host
+    shared_queue=True drops names repeated across files and lets hosts that run out
+    of work steal from busy ones (hosts query concurrently; profiling is sequential-only)
+    policy: QueryPolicy for timeouts, retries and hedging (adaptive defaults if None)
+    metrics: metrics.QueryMetrics updated with every query (live status / endpoint)
+    """
+    import os
+    import re
+    import time
+    
+    print("\n" + "="*80)
+    print("PART B: DNS Resolution Testing in Mininet")
+    print("="*80)
+    
+    cwd = os.getcwd()
+    from .answer_store import AnswerStore, dig_min_ttl
+    from .run_registry import new_run_id, record_run, topology_config
+    from .profiling import StageProfiler, dig_query_time
+    from .path_model import PathModel, service_report
+    from .query_policy import QueryPolicy, format_failures
+    from .query_records import QueryLog, Status
+    from .work_queue import HOSTS, WorkStealingQueue, assign_domains, load_domain_files, run_shared
+    
+    if profile and shared_queue:
+        print("[NOTE] Profiling is disabled with shared_queue (hosts run concurrently)")
+    prof = StageProfiler(enabled=profile and not shared_queue)
+    policy = policy or QueryPolicy()
+    
+    files = load_domain_files(domains, cwd)
+    if not files:
+        print(f"[FAIL] No domain files match {domains}")
+        return
+    run_id = new_run_id('part_b', f'{cwd}/results/runs')
+    log = QueryLog(run_id, metrics=metrics)
+    assignment, dropped = assign_domains(files, HOSTS, dedup=shared_queue)
+    print(f"[*] {sum(len(d) for _, d in files)} names in {len(files)} domain files"
+          + (f", {dropped} duplicates dropped" if shared_queue else ""))
+    
+    def resolve(host_name, domain):
+        """One dig query from `host_name`, recorded in `log`"""
+        host = net.get(host_name)
+        # Use dig WITHOUT specifying DNS server - uses system default
+        # This will use the host's DNS resolver through Mininet
+        ts_ns = time.time_ns()
+        query_start = time.perf_counter()
+        with prof.stage('dig'):
+            outcome, result, rtt = policy.dig(host.popen, [domain])
+            if prof.enabled:   # parse dig's output only when profiling
+                prof.record('dns', dig_query_time(result))
+        query_time = rtt * 1000  # last attempt, in ms
+        total_ms = (time.perf_counter() - query_start) * 1000
+        
+        # Check if we got a valid response (not NXDOMAIN, not SERVFAIL, not timed out)
+        if outcome == 'NOERROR':
+            with prof.stage('parse'):
+                # Extract the actual query time from dig output
+                time_match = re.search(r'Query time: (\d+) msec', result)
+                if time_match:
+                    actual_query_time = float(time_match.group(1))
+                else:
+                    actual_query_time = query_time
+                
+                # Extract IP addresses from the ANSWER SECTION (only A records)
+                # Format: domain.com.  300  IN  A  1.2.3.4
+                answer_section = result.split('ANSWER SECTION:')[1].split('\n\n')[0] if 'ANSWER SECTION:' in result else ''
+                # Match only lines with A records (not AAAA, not query/server info)
+                ip_matches = re.findall(r'\s+IN\s+A\s+((?:\d{1,3}\.){3}\d{1,3})', answer_section)
+                # Remove duplicates while preserving order
+                ip_matches = list(dict.fromkeys(ip_matches))
+            log.append(host_name, domain, Status.NOERROR, ts_ns, total_ms, rtt_ms=actual_query_time,
+                       ips=ip_matches, ttl=dig_min_ttl(answer_section))
+        else:
+            log.append(host_name, domain, Status.from_outcome(outcome), ts_ns, total_ms)
+    
+    # Per-host wall time (s); everything else is derived from the query log
+    host_time = {host_name: 0.0 for host_name in HOSTS}
+    
+    if shared_queue:
+        queue = WorkStealingQueue(assignment)
+        print(f"[*] Shared queue: {len(queue)} domains across {len(HOSTS)} hosts (work stealing)")
+        start_time = time.time()
+        busy = run_shared(HOSTS, queue,
+                          lambda host_name, domain, owner: resolve(host_name, domain))
+        wall_time = time.time() - start_time
+        for host_name in HOSTS:
+            host_time[host_name] = busy[host_name]
+        print(f"[OK] Queue drained in {wall_time:.2f} sec; stolen per host: "
+              + ', '.join(f"{h.upper()}={queue.stolen[h]}" for h in HOSTS))
+    else:
+        for host_name in HOSTS:
+            print(f"\n{'='*80}")
+            print(f"Testing {host_name.upper()}")
+            print(f"{'='*80}")
+            
+            host_domains = assignment[host_name]
+            print(f"Testing {len(host_domains)} domains...")
+            
+            start_time = time.time()
+            
+            with prof.stage('queries'):
+                for idx, domain in enumerate(host_domains, 1):
+                    with prof.stage('query'):
+                        resolve(host_name, domain)
+                    
+                    if idx % 20 == 0:
+                        successful, failed = log.counts[host_name]
+                        print(f"  Progress: {idx}/{len(host_domains)} - Success: {successful}, Failed: {failed}")
+            
+            host_time[host_name] = time.time() - start_time
+    
+    all_results = {}
+    
+    for host_name in HOSTS:
+        stats = log.host_summary(host_name)
+        successful = stats['successful']
+        failed = stats['failed']
+        latencies = stats['latencies']
+        total_time = host_time[host_name]
+        
+        # Calculate stats
+        total = successful + failed
+        if not total:
+            continue
+        if latencies:
+            avg_latency = sum(latencies) / len(latencies)
+            min_latency = min(latencies)
+            max_latency = max(latencies)
+        else:
+            avg_latency = min_latency = max_latency = 0
+        
+        throughput = successful / total_time if total_time > 0 else 0
+        
+        # Store results
+        all_results[host_name] = {
+            'total': total,
+            'successful': successful,
+            'failed': failed,
+            'avg_latency': avg_latency,
+            'min_latency': min_latency,
+            'max_latency': max_latency,
+            'throughput': throughput,
+            'total_time': total_time,
+            'latencies': latencies,
+            'durations': stats['durations'],
+            'outcomes': stats['outcomes']
+        }
+        
+        # Save domain -> answer mappings
+        with prof.stage('save'), AnswerStore(f'{cwd}/results/answers.db') as store:
+            store.upsert_many(log.answer_rows(host_name))
+        print(f"  Answers saved to: results/answers.db (run {run_id})")
+        
+        # Print results
+        print(f"\nResults for {host_name.upper()}:")
+        print(f"  Total queries:     {total}")
+        print(f"  Successful:        {successful} ({successful*100/total:.1f}%)")
+        print(f"  Failed:            {failed} ({failed*100/total:.1f}%) [{format_failures(stats['outcomes'])}]")
+        print(f"  Avg Latency:       {avg_latency:.2f} ms")
+        print(f"  Min Latency:       {min_latency:.2f} ms")
+        print(f"  Max Latency:       {max_latency:.2f} ms")
+        print(f"  Throughput:        {throughput:.2f} queries/sec")
+        print(f"  Total time:        {total_time:.2f} sec")
+    
+    # Summary table with all metrics
+    print("\n" + "="*120)
+    print("PART B SUMMARY - ALL METRICS")
+    print("="*120)
+    print(f"{'Host':<6} {'Total':<7} {'Success':<12} {'Failed':<8} {'Avg Lat':<10} {'Min Lat':<10} {'Max Lat':<10} {'Throughput':<13} {'Time (s)':<10}")
+    print(f"{'':6} {'':7} {'':12} {'':8} {'(ms)':<10} {'(ms)':<10} {'(ms)':<10} {'(q/s)':<13} {'':10}")
+    print("-"*120)
+    
+    for host_name, r in all_results.items():
+        success_pct = f"{r['successful']} ({r['successful']*100/r['total']:.0f}%)"
+        failed_pct = f"{r['failed']} ({r['failed']*100/r['total']:.0f}%)"
+        print(f"{host_name.upper():<6} {r['total']:<7} {success_pct:<12} {failed_pct:<8} "
+              f"{r['avg_latency']:<10.2f} {r['min_latency']:<10.2f} {r['max_latency']:<10.2f} "
+              f"{r['throughput']:<13.2f} {r['total_time']:<10.2f}")
+    print(f"\n{policy.summary()}")
+    
+    # Latency beyond the topology: observed minus the modelled host <-> NAT path RTT
+    nat = next((h.name for h in net.hosts if h.name.startswith('nat')), None)
+    service_lines, service_rows = [], {}
+    if nat:
+        service_lines, service_rows = service_report(
+            PathModel.from_net(net), nat, {h: r['latencies'] for h, r in all_results.items()})
+        print(f"\nResolver time beyond {nat} (observed - modelled path RTT):")
+        print('\n'.join(service_lines))
+    
+    record_run('part_b', {
+        'resolver_backend': 'default resolver (8.8.8.8 via NAT)',
+        **policy.config(),
+        'domains': domains,
+        'shared_queue': shared_queue,
+        'topology': topology_config(net),
+        'path_model': service_rows,
+    }, {host_name: {
+        'latencies_ms': r['latencies'],
+        'durations_s': r['durations'],
+        'successful': r['successful'],
+        'failed': r['failed'],
+        'outcomes': r['outcomes'],
+        # Shared-queue hosts resolve concurrently, so qps needs their wall time
+        'elapsed_s': host_time[host_name] if shared_queue else None,
+    } for host_name, r in all_results.items()}, root=f'{cwd}/results/runs', run_id=run_id)
+    print(f"\n[OK] Run recorded: results/runs/{run_id}/")
+    
+    if prof.enabled:
+        print("\n" + "="*120)
+        print("HARNESS PROFILE (all hosts)")
+        print("="*120)
+        print('\n'.join(prof.report_lines()))
+        prof.write_collapsed(f'{cwd}/results/part_b_profile.folded')
+        print(f"\n[OK] Saved collapsed stacks to results/part_b_profile.folded")
+    
+    print("\n" + "="*120)
+    print("Part B Complete!")
+    print("="*120)
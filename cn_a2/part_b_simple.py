@@ -0,0 +1,214 @@
+"""
+Simple Part B Test - Just runs on YOUR HOST machine (not in Mininet)
+This is the simplest approach for Part B
+
+Run outside Mininet: python3 -m cn_a2 resolve
+"""
+
+import socket
+import time
+import statistics
+
+from .answer_store import AnswerStore
+from .query_policy import TIMEOUT, QueryPolicy, format_failures
+from .query_records import QueryLog, Status
+from .run_registry import new_run_id, record_run
+from .work_queue import (DEFAULT_DOMAINS, HOSTS, WorkStealingQueue, assign_domains,
+                         load_domain_files, run_shared)
+
+def resolver_timeout(path='/etc/resolv.conf'):
+    """Per-try timeout glibc uses (options timeout:N, default 5 s)"""
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                if line.startswith('options'):
+                    for opt in line.split()[1:]:
+                        if opt.startswith('timeout:'):
+                            return float(opt.split(':', 1)[1])
+    except (OSError, ValueError):
+        pass
+    return 5.0
+
+RESOLVER_TIMEOUT = resolver_timeout()
+
+def classify_lookup(result, exc, rtt_s):
+    """
+    Outcome category of a getaddrinfo call. glibc reports both SERVFAIL and
+    an unanswered query as EAI_AGAIN; only the latter takes a full resolver
+    timeout, so a slow EAI_AGAIN counts as TIMEOUT
+    """
+    if exc is None:
+        return 'NOERROR'
+    if isinstance(exc, socket.gaierror):
+        if exc.errno == socket.EAI_NONAME:
+            return 'NXDOMAIN'
+        if exc.errno == socket.EAI_AGAIN and rtt_s >= RESOLVER_TIMEOUT:
+            return TIMEOUT
+        return 'SERVFAIL'
+    return 'ERROR'
+
+def resolve_domain(domain, host_name, log, policy):
+    """Resolve one domain with getaddrinfo through `policy`, recorded in `log`"""
+    ts_ns = time.time_ns()
+    start = time.perf_counter()
+    outcome, result, rtt = policy.call(lambda: socket.getaddrinfo(domain, None, socket.AF_INET),
+                                       classify_lookup)
+    total_ms = (time.perf_counter() - start) * 1000
+    if outcome == 'NOERROR':
+        # Extract IP addresses and remove duplicates (getaddrinfo returns multiple socket types)
+        ips = list(dict.fromkeys([addr[4][0] for addr in result]))
+        # getaddrinfo exposes no TTL
+        log.append(host_name.lower(), domain, Status.NOERROR, ts_ns, total_ms, rtt_ms=rtt * 1000, ips=ips)
+    else:
+        log.append(host_name.lower(), domain, Status.from_outcome(outcome), ts_ns, total_ms)
+
+def test_dns_resolution(domains, host_name, log, policy):
+    """Test DNS resolution for a list of domains"""
+    
+    print(f"\nTesting {host_name}: {len(domains)} domains...")
+    
+    for idx, domain in enumerate(domains, 1):
+        resolve_domain(domain, host_name, log, policy)
+        
+        if idx % 20 == 0:
+            print(f"  Progress: {idx}/{len(domains)}")
+    
+    return summarize_host(host_name, log)
+
+def summarize_host(host_name, log):
+    """Print one host's results, save its answers and return its summary"""
+    stats = log.host_summary(host_name.lower())
+    successful = stats['successful']
+    failed = stats['failed']
+    latencies = stats['latencies']
+    durations = stats['durations']
+    
+    # Calculate stats
+    total = successful + failed
+    if latencies:
+        avg_latency = statistics.mean(latencies)
+        min_latency = min(latencies)
+        max_latency = max(latencies)
+        total_time = sum(latencies) / 1000
+        throughput = successful / total_time if total_time > 0 else 0
+    else:
+        avg_latency = min_latency = max_latency = throughput = 0
+        total_time = 0
+    
+    # Print results
+    print(f"\nResults for {host_name}:")
+    print(f"  Total queries:     {total}")
+    print(f"  Successful:        {successful} ({successful*100/total:.1f}%)")
+    print(f"  Failed:            {failed} ({failed*100/total:.1f}%) [{format_failures(stats['outcomes'])}]")
+    print(f"  Avg Latency:       {avg_latency:.2f} ms")
+    print(f"  Min Latency:       {min_latency:.2f} ms")
+    print(f"  Max Latency:       {max_latency:.2f} ms")
+    print(f"  Throughput:        {throughput:.2f} queries/sec")
+    
+    # Save domain -> answer mappings
+    with AnswerStore() as store:
+        store.upsert_many(log.answer_rows(host_name.lower()))
+    print(f"  Answers saved to: results/answers.db (run {log.run_id})")
+    
+    return {
+        'host': host_name,
+        'total': total,
+        'successful': successful,
+        'failed': failed,
+        'avg_latency': avg_latency,
+        'min_latency': min_latency,
+        'max_latency': max_latency,
+        'throughput': throughput,
+        'total_time': total_time,
+        'latencies': latencies,
+        'durations': durations,
+        'outcomes': stats['outcomes']
+    }
+
+def main(domains=DEFAULT_DOMAINS, shared_queue=False, hedge=False, metrics=None):
+    """
+    domains: comma-separated globs of domain files; a `_H<n>.txt` suffix picks the host
+    shared_queue=True drops names repeated across files and resolves them from a
+    shared queue, one thread per host, with idle hosts stealing from busy ones
+    hedge=True sends a duplicate lookup when the first is slower than p95
+    metrics: metrics.QueryMetrics updated with every lookup (live status / endpoint)
+    """
+    print("="*80)
+    print("CS331 Assignment 2 - PART B: DNS Resolution Testing")
+    print("="*80)
+    
+    files = load_domain_files(domains)
+    if not files:
+        print(f"[FAIL] No domain files match {domains}")
+        return
+    assignment, dropped = assign_domains(files, HOSTS, dedup=shared_queue)
+    print(f"[*] {sum(len(d) for _, d in files)} names in {len(files)} domain files"
+          + (f", {dropped} duplicates dropped" if shared_queue else ""))
+    
+    results = []
+    run_id = new_run_id('part_b_simple')
+    policy = QueryPolicy(hedge=hedge)
+    log = QueryLog(run_id, metrics=metrics)
+    busy = {}
+    
+    if shared_queue:
+        queue = WorkStealingQueue(assignment)
+        print(f"[*] Shared queue: {len(queue)} domains across {len(HOSTS)} hosts (work stealing)")
+        start = time.time()
+        busy = run_shared(HOSTS, queue,
+                          lambda h, domain, owner: resolve_domain(domain, h.upper(), log, policy))
+        print(f"[OK] Queue drained in {time.time() - start:.2f} sec; stolen per host: "
+              + ', '.join(f"{h.upper()}={queue.stolen[h]}" for h in HOSTS))
+        for h in HOSTS:
+            if h in log.counts:
+                print("\n" + "="*80)
+                results.append(summarize_host(h.upper(), log))
+    else:
+        # Test all hosts
+        for h in HOSTS:
+            if not assignment[h]:
+                continue
+            print("\n" + "="*80)
+            result = test_dns_resolution(assignment[h], h.upper(), log, policy)
+            results.append(result)
+    
+    # Summary table with all metrics
+    print("\n" + "="*120)
+    print("PART B SUMMARY - ALL METRICS")
+    print("="*120)
+    print(f"{'Host':<6} {'Total':<7} {'Success':<12} {'Failed':<8} {'Avg Lat':<10} {'Min Lat':<10} {'Max Lat':<10} {'Throughput':<13} {'Time (s)':<10}")
+    print(f"{'':6} {'':7} {'':12} {'':8} {'(ms)':<10} {'(ms)':<10} {'(ms)':<10} {'(q/s)':<13} {'':10}")
+    print("-"*120)
+    
+    for r in results:
+        success_pct = f"{r['successful']} ({r['successful']*100/r['total']:.0f}%)"
+        failed_pct = f"{r['failed']} ({r['failed']*100/r['total']:.0f}%)"
+        print(f"{r['host']:<6} {r['total']:<7} {success_pct:<12} {failed_pct:<8} "
+              f"{r['avg_latency']:<10.2f} {r['min_latency']:<10.2f} {r['max_latency']:<10.2f} "
+              f"{r['throughput']:<13.2f} {r['total_time']:<10.2f}")
+    print(f"\n{policy.summary()}")
+    
+    record_run('part_b_simple', {
+        'resolver_backend': 'system resolver (getaddrinfo)',
+        **policy.config(),
+        'domains': domains,
+        'shared_queue': shared_queue,
+    }, {r['host'].lower(): {
+        'latencies_ms': r['latencies'],
+        'durations_s': r['durations'],
+        'successful': r['successful'],
+        'failed': r['failed'],
+        'outcomes': r['outcomes'],
+        'elapsed_s': busy.get(r['host'].lower()),   # shared queue: hosts ran concurrently
+    } for r in results}, run_id=run_id)
+    print(f"\n[OK] Run recorded: results/runs/{run_id}/")
+    
+    print("\n" + "="*120)
+    print("Part B Complete!")
+    print("="*120)
+
+def run(args):
+    """`cn_a2 resolve` entry point"""
+    from .metrics import live_metrics
+    with live_metrics(args.metrics_port, args.live) as metrics:
+        main(args.domains, args.shared_queue, args.hedge, metrics)
@@ -2,13 +2,24 @@
 Part C: Custom DNS Resolver
 Setup, verify, and prove custom DNS resolver configuration
 
-Run from Mininet CLI: py exec(open('part_c.py').read()); part_c(net)
+Run from Mininet CLI:
+  px from cn_a2.part_c import part_c
+  py part_c(net)
 """
 
-def part_c(net):
-    """Setup custom DNS resolver with clean, report-friendly output"""
+from .upstream_fixture import FIXTURE
+
+
+def part_c(net, upstream='live', fixture=FIXTURE, latency_scale=1.0):
+    """
+    Setup custom DNS resolver with clean, report-friendly output
+    upstream: 'live' forwards to 8.8.8.8/8.8.4.4; 'record' does the same through
+    a proxy that saves every exchange to `fixture`; 'replay' answers from
+    `fixture` with its recorded latencies times `latency_scale` (offline)
+    """
     import time
     import os
+    from .upstream_fixture import start_on_host, stop_on_host
     
     print("\n" + "="*80)
     print("PART C: CUSTOM DNS RESOLVER SETUP")
@@ -26,10 +37,17 @@ def part_c(net):
         print("[*] Installing dnsmasq (this may take a moment)...")
         dns_host.cmd('apt-get update -qq && apt-get install -y dnsmasq -qq')
     
-    dnsmasq_config = """interface=dns-eth0
+    if upstream == 'live':
+        stop_on_host(dns_host)
+        servers = "server=8.8.8.8\nserver=8.8.4.4"
+        upstream_desc = '8.8.8.8, 8.8.4.4'
+    else:
+        servers = start_on_host(dns_host, upstream, fixture, latency_scale, cwd)
+        upstream_desc = (f'8.8.8.8, 8.8.4.4 recorded to {fixture}' if upstream == 'record'
+                         else f'replayed from {fixture} (latency x{latency_scale:g})')
+    dnsmasq_config = f"""interface=dns-eth0
 bind-interfaces
-server=8.8.8.8
-server=8.8.4.4
+{servers}
 no-resolv
 log-queries
 log-facility=/var/log/dnsmasq.log
@@ -94,7 +112,7 @@ no-hosts
     
     summary_data = {
         'Custom DNS IP': '10.0.0.5',
-        'Upstream Servers': '8.8.8.8, 8.8.4.4',
+        'Upstream Servers': upstream_desc,
         'Cache Size': '1000 entries',
         'Configured Hosts': 'h1, h2, h3, h4',
         'Status': 'OPERATIONAL' if all_ok else 'FAILED'
@@ -153,7 +171,7 @@ no-hosts
     report.append("")
     report.append("CONFIGURATION:")
     report.append("  - Custom DNS Resolver: 10.0.0.5 (dns host)")
-    report.append("  - Upstream DNS: 8.8.8.8, 8.8.4.4")
+    report.append(f"  - Upstream DNS: {upstream_desc}")
     report.append("  - Cache Size: 1000 entries")
     report.append("  - Configured Hosts: h1, h2, h3, h4")
     report.append("")
@@ -193,11 +211,5 @@ no-hosts
     print("PART C COMPLETE - Custom DNS Resolver Ready")
     print("="*80)
     print("\nNext Step: Run Part D to test DNS resolution with detailed logging")
-    print("Command: py exec(open('part_d.py').read()); part_d(net)")
+    print("Command: px from cn_a2.part_d import part_d  then  py part_d(net)")
     print("="*80 + "\n")
-
-# Make function available globally
-import sys
-if __name__ != '__main__':
-    frame = sys._getframe(1)
-    frame.f_globals['part_c'] = part_c
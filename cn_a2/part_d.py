@@ -0,0 +1,462 @@
+"""
+Part D: DNS Resolution with Custom Resolver
+Resolve all 400 domains using custom resolver with automatic caching
+
+Run from Mininet CLI:
+  px from cn_a2.part_d import part_d
+  py part_d(net)
+or start to finish with: sudo python3 -m cn_a2 bench --parts c,d
+"""
+
+from .work_queue import DEFAULT_DOMAINS
+
+
+def part_d(net, profile=False, domains=DEFAULT_DOMAINS, policy=None, metrics=None, capture_limits=None):
+    """
+    DNS resolution testing through custom resolver (10.0.0.5) with caching
+    profile=True times each harness stage (trace, dig, parse, log, ...) and
+    writes a breakdown table plus a collapsed-stack file for flame graphs
+    domains: comma-separated globs of domain files; a `_H<n>.txt` suffix picks
+    the host. Names repeated across hosts are kept: a later host hitting the
+    shared resolver cache is part of what Part D measures
+    policy: QueryPolicy for timeouts, retries and hedging (adaptive defaults if None)
+    metrics: metrics.QueryMetrics updated with every query (live status / endpoint)
+    capture_limits: CaptureRing segment_mb / segment_seconds / max_files for
+    the dns-eth0 capture in results/capture_part_d/
+    """
+    import os
+    import time
+    import re
+    
+    def trace_dns_resolution(host, domain):
+        """
+        Trace full DNS resolution path using dig +trace
+        Returns: (server_count, resolution_path_list, servers_list)
+        """
+        result = host.cmd(f'dig +trace +tries=1 +time=3 {domain} 2>/dev/null')
+        
+        servers_visited = []
+        resolution_steps = []
+        
+        # Parse dig +trace output to find all servers contacted
+        lines = result.split('\n')
+        current_step = None
+        
+        for line in lines:
+            # Root servers (.)
+            if 'IN\tNS' in line and not current_step:
+                current_step = 'Root'
+            # TLD servers (.com, .org, etc)
+            elif 'IN\tNS' in line and current_step == 'Root':
+                current_step = 'TLD'
+            # Authoritative answer
+            elif 'IN\tA\t' in line and current_step:
+                current_step = 'Authoritative'
+                
+            # Extract server IPs from trace
+            if ';; Received' in line:
+                # Format: ;; Received 525 bytes from 192.5.5.241#53(f.root-servers.net) in 45 ms
+                match = re.search(r'from\s+([\d.]+)#\d+\(([\w.-]+)\)', line)
+                if match:
+                    server_ip = match.group(1)
+                    server_name = match.group(2)
+                    if server_ip not in [s[0] for s in servers_visited]:
+                        servers_visited.append((server_ip, server_name, current_step or 'Unknown'))
+                        resolution_steps.append(f"{current_step or 'Unknown'}: {server_name} ({server_ip})")
+        
+        return len(servers_visited), resolution_steps, servers_visited
+    
+    print("\n" + "="*80)
+    print("PART D: DNS Resolution with Custom Resolver")
+    print("="*80)
+    
+    cwd = os.getcwd()
+    dns_host = net.get('dns')
+    
+    from .jsonl_log import JsonlWriter, log_mtime, remove_log
+    from .answer_store import AnswerStore, dig_min_ttl
+    from .run_registry import new_run_id, record_run, topology_config
+    from .capture_ring import CaptureRing
+    from .path_model import PathModel, service_report
+    from .profiling import StageProfiler, dig_query_time
+    from .work_queue import HOSTS, assign_domains, load_domain_files
+    from .query_policy import QueryPolicy, format_failures
+    from .query_records import QueryLog, Status
+    
+    prof = StageProfiler(enabled=profile)
+    policy = policy or QueryPolicy()
+    
+    # Verify custom resolver
+    print("\n[*] Verifying custom DNS resolver...")
+    pid = dns_host.cmd('pgrep dnsmasq').strip()
+    if not pid:
+        print("[FAIL] dnsmasq not running. Please run Part C first.")
+        return
+    print(f"[OK] dnsmasq running (PID: {pid}) with cache-size=1000")
+    
+    files = load_domain_files(domains, cwd)
+    if not files:
+        print(f"[FAIL] No domain files match {domains}")
+        return
+    assignment, _ = assign_domains(files, HOSTS, dedup=False)
+    domain_globs = domains
+    
+    run_id = new_run_id('part_d', f'{cwd}/results/runs')
+    print(f"[OK] Run ID: {run_id}")
+    
+    # Clear cache and logs for fresh start
+    print("[*] Clearing cache and starting fresh...")
+    dns_host.cmd('killall -HUP dnsmasq')  # Clear cache
+    dns_host.cmd('echo "" > /var/log/dnsmasq.log 2>/dev/null')
+    time.sleep(1)
+    
+    # Start packet capture
+    print("[*] Starting packet capture on dns-eth0...")
+    capture = CaptureRing(dns_host, 'dns-eth0', f'{cwd}/results/capture_part_d', **(capture_limits or {})).start()
+    time.sleep(1)
+    print("[OK] Ready\n")
+    
+    all_results = {}
+    
+    # Every query is one compact record, streamed to the JSONL log as it is appended
+    log = QueryLog(run_id, metrics=metrics)
+    log_file = f'{cwd}/results/part_d_detailed_log.jsonl'
+    remove_log(log_file)
+    detailed_logs = JsonlWriter(log_file, batch_size=50,
+                                max_bytes=64 * 1024 * 1024, compress=True)
+    
+    def log_entry(i):
+        """Part D's JSONL record layout for query record `i`"""
+        r = log[i]
+        requery = r.phase == 2
+        entry = {
+            'timestamp': r.timestamp,
+            'host': r.host,
+            'domain': r.domain,
+            'query_num': 'requery' if requery else r.query_num,
+            'resolution_mode': 'Recursive (cache test)' if requery else 'Recursive',  # dnsmasq does recursive resolution
+            'dns_server': '10.0.0.5',
+        }
+        if not r.success:
+            entry.update({
+                'resolution_step': 'Failed',
+                'response': r.status.name,
+                'status': r.status.name,
+                'rtt_ms': 0,
+                'total_time_ms': round(r.total_ms, 2),
+                'cache_status': 'N/A',
+                'success': False
+            })
+        elif requery:
+            entry.update({
+                'resolution_step': 'dnsmasq cache' if r.cache_hit else 'dnsmasq -> upstream',
+                'response': ', '.join(r.ips),
+                'rtt_ms': round(r.rtt_ms, 2),
+                'total_time_ms': round(r.total_ms, 2),
+                'cache_status': "HIT (from cache)" if r.cache_hit else "MISS",
+                'first_rtt_ms': round(r.ref_ms, 2),  # For comparison
+                'speedup': f"{r.ref_ms/r.rtt_ms:.1f}x" if r.rtt_ms > 0 else "N/A",
+                'success': True
+            })
+        else:
+            entry.update({
+                'resolution_step': 'dnsmasq cache' if r.cache_hit else 'dnsmasq -> upstream (8.8.8.8/8.8.4.4)',
+                'response': ', '.join(r.ips) if r.ips else 'No IP',
+                'rtt_ms': round(r.rtt_ms, 2),
+                'total_time_ms': round(r.total_ms, 2),
+                'cache_status': "HIT (cached)" if r.cache_hit else "MISS (upstream)",
+                'success': True
+            })
+        # Add trace information if available
+        if r.servers is not None:
+            entry['servers_visited_count'] = r.servers
+            entry.update(r.extra or {})
+        return entry
+    
+    log.on_append = lambda i: detailed_logs.write(log_entry(i))
+    
+    def parse_answer(result, attempt_rtt):
+        """(rtt_ms, ips, answer section) of a successful dig"""
+        # Extract query time
+        time_match = re.search(r'Query time: (\d+) msec', result)
+        rtt = float(time_match.group(1)) if time_match else attempt_rtt * 1000
+        
+        # Extract IPs
+        answer = result.split('ANSWER SECTION:')[1].split('\n\n')[0] if 'ANSWER SECTION:' in result else ''
+        ips = re.findall(r'\s+IN\s+A\s+((?:\d{1,3}\.){3}\d{1,3})', answer)
+        return rtt, list(dict.fromkeys(ips)), answer
+    
+    for host_name, domains in assignment.items():
+        if not domains:
+            continue
+        
+        print(f"\n{'='*80}")
+        print(f"Testing {host_name.upper()} - Custom Resolver (10.0.0.5)")
+        print(f"{'='*80}")
+        
+        host = net.get(host_name)
+        
+        # Verify DNS configuration
+        resolv = host.cmd('cat /etc/resolv.conf | grep nameserver').strip()
+        if '10.0.0.5' not in resolv:
+            print(f"[FAIL] {host_name} not configured to use 10.0.0.5")
+            print(f"Current: {resolv}")
+            continue
+        print(f"[OK] DNS: {resolv}")
+        
+        print(f"[*] Phase 1: Resolving {len(domains)} unique domains...")
+        
+        resolved = []  # Phase 1 record index of every successful domain, for the cache test
+        
+        start_time = time.time()
+        
+        with prof.stage('phase1'):
+            for idx, domain in enumerate(domains, 1):
+                with prof.stage('query'):
+                    ts_ns = time.time_ns()
+                    query_start = time.time()
+            
+                    # For first 10 domains, trace full DNS resolution path
+                    if idx <= 10:
+                        print(f"  [Tracing] {domain}...")
+                        with prof.stage('trace'):
+                            server_count, resolution_path, servers_list = trace_dns_resolution(host, domain)
+                        trace = {
+                            'full_resolution_path': resolution_path,
+                            'dns_servers_list': [{'ip': s[0], 'name': s[1], 'type': s[2]} for s in servers_list]
+                        }
+                    else:
+                        server_count = trace = None
+            
+                    with prof.stage('dig'):
+                        outcome, result, attempt_rtt = policy.dig(host.popen, ['@10.0.0.5', domain])
+                        if prof.enabled:
+                            prof.record('dns', dig_query_time(result))
+                    total_time = (time.time() - query_start) * 1000
+            
+                    if outcome == 'NOERROR':
+                        with prof.stage('parse'):
+                            rtt, ips, answer = parse_answer(result, attempt_rtt)
+                
+                        # Detect if served from cache (very fast response)
+                        resolved.append(log.append(
+                            host_name, domain, Status.NOERROR, ts_ns, total_time, rtt_ms=rtt, ips=ips,
+                            ttl=dig_min_ttl(answer), query_num=idx, cache_hit=rtt < 5,
+                            servers=server_count, extra=trace))
+                    else:
+                        log.append(host_name, domain, Status.from_outcome(outcome), ts_ns, total_time,
+                                   query_num=idx, servers=server_count, extra=trace)
+                
+                if idx % 25 == 0:
+                    successful, failed = log.counts[host_name]
+                    print(f"  Progress: {idx}/{len(domains)} - Success: {successful}, Failed: {failed}")
+        
+        stats = log.host_summary(host_name, phase=1)
+        
+        print(f"\n[Phase 1 Complete] {stats['successful']} domains resolved and cached")
+        
+        # ========================================================================
+        # PHASE 2: Re-query subset to demonstrate caching
+        # ========================================================================
+        requery_count = min(20, len(resolved))
+        cache_hits = 0
+        cache_hit_rate = 0
+        
+        if requery_count > 0:
+            print(f"[*] Phase 2: Re-querying first {requery_count} domains to test cache...")
+            
+            time.sleep(0.5)  # Brief pause
+            
+            with prof.stage('phase2'):
+                for first in resolved[:requery_count]:
+                    domain = log[first].domain
+                    with prof.stage('query'):
+                        ts_ns = time.time_ns()
+                        query_start = time.time()
+                        with prof.stage('dig'):
+                            outcome, result, attempt_rtt = policy.dig(host.popen, ['@10.0.0.5', domain])
+                            if prof.enabled:
+                                prof.record('dns', dig_query_time(result))
+                        total_time = (time.time() - query_start) * 1000
+                
+                        if outcome == 'NOERROR':
+                            with prof.stage('parse'):
+                                rtt, ips, answer = parse_answer(result, attempt_rtt)
+                    
+                            # Cache detection: Compare to Phase 1 RTT
+                            # Cached responses should be significantly faster (at least 50% faster)
+                            first_rtt = log.rtt_ms[first]
+                            is_cached = (rtt < first_rtt * 0.5)  # 50% or faster = cached
+                    
+                            if is_cached:
+                                cache_hits += 1
+                    
+                            log.append(host_name, domain, Status.NOERROR, ts_ns, total_time, rtt_ms=rtt,
+                                       ips=ips, ttl=dig_min_ttl(answer), phase=2, cache_hit=is_cached,
+                                       ref_ms=first_rtt)
+                        else:
+                            log.append(host_name, domain, Status.from_outcome(outcome), ts_ns, total_time,
+                                       phase=2, ref_ms=log.rtt_ms[first])
+                    
+                    with prof.stage('sleep'):
+                        time.sleep(0.05)  # Small delay
+            
+            cache_hit_rate = (cache_hits / requery_count * 100) if requery_count > 0 else 0
+            print(f"[Phase 2 Complete] Cache hits: {cache_hits}/{requery_count} ({cache_hit_rate:.1f}%)\n")
+        
+        # Calculate stats
+        end_time = time.time()
+        total_time = end_time - start_time
+        total_queries = stats['successful'] + stats['failed'] + requery_count
+        avg_latency = sum(stats['latencies']) / len(stats['latencies']) if stats['latencies'] else 0
+        throughput = (stats['successful'] + stats['failed']) / total_time if total_time > 0 else 0
+        
+        # Save results
+        all_results[host_name] = {
+            'total_queries': total_queries,
+            'phase1_queries': stats['successful'] + stats['failed'],
+            'phase2_queries': requery_count,
+            'successful': stats['successful'],
+            'failed': stats['failed'],
+            'avg_latency_ms': round(avg_latency, 2),
+            'throughput_qps': round(throughput, 2),
+            'total_time_s': round(total_time, 2),
+            'cache_hits': cache_hits,
+            'cache_hit_rate_percent': round(cache_hit_rate, 1),
+            'latencies': stats['latencies'],
+            'durations': stats['durations'],
+            'outcomes': stats['outcomes']
+        }
+        
+        # Save domain -> answer mappings
+        with prof.stage('save'), AnswerStore(f'{cwd}/results/answers.db') as store:
+            store.upsert_many(log.answer_rows(host_name, phase=1))
+        print(f"\n[OK] Saved {stats['successful']} resolved domains to results/answers.db (run {run_id})")
+        
+        print(f"\n{'='*80}")
+        print(f"{host_name.upper()} Summary")
+        print(f"{'='*80}")
+        print(f"Phase 1: {stats['successful'] + stats['failed']} queries ({stats['successful']} successful; "
+              f"failures: {format_failures(stats['outcomes'])})")
+        print(f"Phase 2: {requery_count} re-queries ({cache_hits} cache hits)")
+        print(f"Total queries: {total_queries}")
+        print(f"Avg latency (Phase 1): {avg_latency:.2f}ms")
+        print(f"Throughput: {throughput:.2f} queries/sec")
+        print(f"Cache hit rate: {cache_hits}/{requery_count} ({cache_hit_rate:.1f}%)")
+    
+    # Resolver service time: observed latency minus the modelled host <-> dns path RTT
+    model = PathModel.from_net(net)
+    service_p1, service_rows = service_report(
+        model, 'dns', {h: r['latencies'] for h, r in all_results.items()}, "Phase 1 (upstream resolution):")
+    service_p2, service_rows_p2 = service_report(
+        model, 'dns', {h: log.host_summary(h, phase=2)['latencies'] for h in all_results}, "Phase 2 (re-queries):")
+    for host_name, r in service_rows.items():
+        all_results[host_name]['path_rtt_ms'] = r['path_rtt_ms']
+        all_results[host_name]['avg_service_ms'] = r['service_avg_ms']
+    print(f"\n{'='*80}")
+    print("Resolver Service Time (observed - modelled path RTT)")
+    print(f"{'='*80}")
+    print('\n'.join(service_p1 + [''] + service_p2))
+    
+    # Stop packet capture
+    print(f"\n{'='*80}")
+    print("Finalizing...")
+    print(f"{'='*80}")
+    time.sleep(1)
+    capture.stop()
+    
+    # Flush remaining buffered log records
+    detailed_logs.close()
+    print(f"[OK] Saved {detailed_logs.count} log records to results/part_d_detailed_log.jsonl")
+    
+    # Columnar copy for the analysis, straight from the records (no JSONL re-parse)
+    try:
+        rows = log.to_columnar(f'{cwd}/results/part_d_columns', log_mtime(log_file))
+        print(f"[OK] Saved {rows} records to results/part_d_columns/")
+    except ImportError:
+        print("[NOTE] numpy not available; `cn_a2 analyze` builds results/part_d_columns from the log")
+    
+    # Save summary to results
+    summary_file = f'{cwd}/results/part_d_summary.txt'
+    with open(summary_file, 'w') as f:
+        f.write("="*80 + "\n")
+        f.write("PART D: DNS Resolution Summary (Custom Resolver)\n")
+        f.write("="*80 + "\n\n")
+        
+        f.write("Configuration:\n")
+        f.write("  DNS Resolver: 10.0.0.5 (dnsmasq)\n")
+        f.write("  Cache Size: 1000 entries\n")
+        f.write("  Upstream: 8.8.8.8, 8.8.4.4\n\n")
+        
+        for host_name, result in all_results.items():
+            f.write(f"{host_name.upper()}:\n")
+            f.write(f"  Phase 1: {result['phase1_queries']} queries ({result['successful']} successful, {result['failed']} failed: {format_failures(result['outcomes'])})\n")
+            f.write(f"  Phase 2: {result['phase2_queries']} re-queries ({result['cache_hits']} cache hits)\n")
+            f.write(f"  Total queries: {result['total_queries']}\n")
+            f.write(f"  Avg latency: {result['avg_latency_ms']:.2f}ms\n")
+            f.write(f"  Throughput: {result['throughput_qps']:.2f} queries/sec\n")
+            f.write(f"  Cache hit rate: {result['cache_hits']}/{result['phase2_queries']} ({result['cache_hit_rate_percent']:.1f}%)\n\n")
+        
+        # Overall totals
+        total_all = sum(r['total_queries'] for r in all_results.values())
+        success_all = sum(r['successful'] for r in all_results.values())
+        failed_all = sum(r['failed'] for r in all_results.values())
+        cache_hits_all = sum(r['cache_hits'] for r in all_results.values())
+        
+        f.write(f"{'='*80}\n")
+        f.write("OVERALL TOTALS:\n")
+        f.write(f"  Total queries: {total_all}\n")
+        f.write(f"  Successful: {success_all}\n")
+        f.write(f"  Failed: {failed_all}\n")
+        f.write(f"  Cache hits: {cache_hits_all} ({cache_hits_all/total_all*100:.1f}%)\n")
+        f.write(f"  {policy.summary()}\n\n")
+        
+        f.write(f"{'='*80}\n")
+        f.write("RESOLVER SERVICE TIME (observed - modelled path RTT):\n")
+        f.write('\n'.join(service_p1 + [''] + service_p2) + "\n")
+    
+    print(f"[OK] Saved summary to results/part_d_summary.txt")
+    print(policy.summary())
+    
+    # Register the run so later runs can be compared against it
+    record_run('part_d', {
+        'resolver_backend': 'dnsmasq',
+        'resolver_ip': '10.0.0.5',
+        'cache_size': 1000,
+        'upstream': ['8.8.8.8', '8.8.4.4'],
+        **policy.config(),
+        'domains': domain_globs,
+        'topology': topology_config(net),
+        'path_model': {'phase1': service_rows, 'phase2': service_rows_p2},
+    }, {host_name: {
+        'latencies_ms': r['latencies'],
+        'durations_s': r['durations'],
+        'successful': r['successful'],
+        'failed': r['failed'],
+        'outcomes': r['outcomes'],
+    } for host_name, r in all_results.items()}, root=f'{cwd}/results/runs', run_id=run_id)
+    print(f"[OK] Run recorded: results/runs/{run_id}/")
+    
+    if profile:
+        print(f"\n{'='*80}")
+        print("Harness Profile (all hosts)")
+        print(f"{'='*80}")
+        print('\n'.join(prof.report_lines()))
+        prof.write_collapsed(f'{cwd}/results/part_d_profile.folded')
+        print(f"\n[OK] Saved collapsed stacks to results/part_d_profile.folded")
+    
+    print(f"\n{'='*80}")
+    print("PART D COMPLETE")
+    print(f"{'='*80}")
+    print("\nFiles created in results/ directory:")
+    print("  - part_d_summary.txt (overview)")
+    print("  - part_d_detailed_log.jsonl (all queries, one JSON object per line)")
+    print("  - answers.db (resolved IPs, TTLs and rcodes for every domain)")
+    print("  - capture_part_d/ (packet capture segments + index.json)")
+    print("\nCaching demonstration:")
+    print("  - Phase 1: Queries all unique domains (populates cache)")
+    print("  - Phase 2: Re-queries 20 domains (demonstrates cache hits)")
+    print("  - Expected: ~100% cache hit rate in Phase 2 (responses <5ms)")
+    print("  - Note: No overlap between PCAP files, so cache only works within each host")
+    print("\nVerify caching:")
+    print("  dns cat /var/log/dnsmasq.log | grep cached | head -20")
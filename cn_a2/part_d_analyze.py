@@ -0,0 +1,479 @@
+"""
+Part D: Analysis and Visualization
+Compare Part D with Part B and create plots for first 10 URLs, or analyze
+every host and every query with --all-hosts
+
+Run outside Mininet: python3 -m cn_a2 analyze [--all-hosts] [--no-plots]
+"""
+
+import numpy as np
+
+from .jsonl_log import iter_logs, logs_exist
+from .run_registry import list_runs, print_comparison
+from .columnar_store import build_from_log, is_stale, load_store, phase_join, per_host_stats, percentiles
+
+LOG_FILE = 'results/part_d_detailed_log.jsonl'
+STORE_DIR = 'results/part_d_columns'
+MAX_PLOT_POINTS = 2000   # per series; larger series are downsampled for rendering
+
+
+def _pyplot():
+    """Import matplotlib on first use so text-only runs skip its start-up cost"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _open_store(log_file=LOG_FILE, store_dir=STORE_DIR):
+    """Columnar copy of the log, rebuilt only when the log has changed"""
+    if is_stale(log_file, store_dir):
+        rows = build_from_log(log_file, store_dir)
+        print(f"\n[*] Built columnar store from log ({rows} records): {store_dir}/")
+    store = load_store(store_dir)
+    print(f"\n[*] Loaded {len(store)} log entries from Part D (memory-mapped)")
+    return store
+
+
+def downsample_cdf(values, max_points=MAX_PLOT_POINTS):
+    """
+    (x, y) points of the empirical CDF of `values`, at most max_points long.
+    Points are taken at evenly spaced ranks, so the curve keeps its shape
+    (including both tails) however many samples there are.
+    """
+    x = np.sort(np.asarray(values, dtype=np.float64))
+    n = len(x)
+    if n == 0:
+        return x, x
+    if n > max_points:
+        ranks = np.unique(np.linspace(0, n - 1, max_points).astype(np.int64))
+    else:
+        ranks = np.arange(n)
+    return x[ranks], (ranks + 1) / n
+
+
+def downsample_series(x, y, max_points=MAX_PLOT_POINTS):
+    """
+    Min/max decimation of a time series: split into max_points/2 buckets and
+    keep each bucket's lowest and highest point, so spikes stay visible.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if n <= max_points:
+        return x, y
+    buckets = max_points // 2
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    idx = []
+    for b in range(buckets):
+        seg = y[edges[b]:edges[b + 1]]
+        i_lo = edges[b] + int(np.argmin(seg))
+        i_hi = edges[b] + int(np.argmax(seg))
+        idx.extend(sorted((i_lo, i_hi)))
+    idx = np.asarray(idx)
+    return x[idx], y[idx]
+
+
+def plot_h1_comparison(comparison_data, output_plot):
+    """Per-domain bar charts for the first H1 re-queried domains"""
+    # Extract data for plotting
+    domains = [d['domain'][:25] for d in comparison_data]  # Truncate long domains
+    phase1_latencies = [d['phase1_rtt'] for d in comparison_data]
+    phase2_latencies = [d['phase2_rtt'] for d in comparison_data]
+    phase1_servers = [d['phase1_servers'] for d in comparison_data]
+    cache_hits = [d['phase2_cache'] for d in comparison_data]
+    speedups = [d['speedup'] for d in comparison_data]
+    
+    # Create plots
+    plt = _pyplot()
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+    
+    # Plot 1: Latency Comparison (Phase 1 vs Phase 2)
+    x = np.arange(len(domains))
+    width = 0.35
+    
+    bars1_p1 = ax1.bar(x - width/2, phase1_latencies, width, label='Phase 1 (Cache MISS)', 
+                       color='#e74c3c', alpha=0.8)
+    bars1_p2 = ax1.bar(x + width/2, phase2_latencies, width, label='Phase 2 (Cache HIT)', 
+                       color='#27ae60', alpha=0.8)
+    
+    ax1.set_xlabel('Domain', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Latency (ms)', fontsize=12, fontweight='bold')
+    ax1.set_title('DNS Query Latency: Phase 1 (Initial) vs Phase 2 (Cached) - First 10 H1 Re-queried Domains', 
+                  fontsize=13, fontweight='bold')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(domains, rotation=45, ha='right')
+    ax1.legend(fontsize=10)
+    ax1.grid(axis='y', alpha=0.3)
+    
+    # Add speedup labels
+    for i, (p1, p2, speedup) in enumerate(zip(phase1_latencies, phase2_latencies, speedups)):
+        ax1.text(i, max(p1, p2) + 5, f'{speedup:.1f}x', ha='center', va='bottom', 
+                fontsize=8, fontweight='bold', color='#2c3e50')
+    
+    # Plot 2: DNS Servers Visited (Phase 1 vs Phase 2)
+    bars2_p1 = ax2.bar(x - width/2, phase1_servers, width, label='Phase 1 (Full Recursive)', 
+                       color='#e74c3c', alpha=0.8)
+    phase2_servers = [1 if hit else 4 for hit in cache_hits]  # 1 for cache, 4 for miss
+    bars2_p2 = ax2.bar(x + width/2, phase2_servers, width, label='Phase 2 (From Cache)', 
+                       color='#27ae60', alpha=0.8)
+    
+    ax2.set_xlabel('Domain', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Number of DNS Servers', fontsize=12, fontweight='bold')
+    ax2.set_title('DNS Servers Contacted: Phase 1 vs Phase 2 - Cache Efficiency', 
+                  fontsize=13, fontweight='bold')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(domains, rotation=45, ha='right')
+    ax2.legend(fontsize=10)
+    ax2.set_yticks(range(0, 6))
+    ax2.grid(axis='y', alpha=0.3)
+    
+    # Add server count labels
+    for i, (p1, p2) in enumerate(zip(phase1_servers, phase2_servers)):
+        ax2.text(i - width/2, p1 + 0.1, str(p1), ha='center', va='bottom', fontsize=9)
+        ax2.text(i + width/2, p2 + 0.1, str(p2), ha='center', va='bottom', fontsize=9)
+    
+    plt.tight_layout()
+    plt.savefig(output_plot, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+def analyze_part_d(plots=True):
+    """Analyze Part D results and create visualizations"""
+    
+    print("\n" + "="*80)
+    print("PART D: Analysis and Visualization")
+    print("="*80)
+    
+    # Stream Part D logs from results directory
+    log_file = LOG_FILE
+    if not logs_exist(log_file):
+        print(f"[FAIL] {log_file} not found")
+        print("Please run Part D testing first in Mininet")
+        return
+    
+    store = _open_store(log_file)
+    data = store.data
+    
+    # Phase 1 (initial queries) and Phase 2 (re-queries) for H1
+    h1_ok = store.success_mask() & (data['host'] == store.host_code('h1'))
+    h1_phase1_count = int((h1_ok & (data['phase'] == 1)).sum())
+    h1_phase2_count = int((h1_ok & (data['phase'] == 2)).sum())
+    print(f"[*] Found {h1_phase1_count} Phase 1 queries and {h1_phase2_count} Phase 2 re-queries")
+    
+    # Join re-queried domains with their Phase 1 entries (limit to first 10 for visualization)
+    rows1, rows2 = phase_join(store, 'h1')
+    rows1, rows2 = rows1[:10], rows2[:10]
+    comparison_data = []
+    for r1, r2 in zip(rows1, rows2):
+        p1, p2 = data[r1], data[r2]
+        phase1_rtt, phase2_rtt = float(p1['rtt_ms']), float(p2['rtt_ms'])
+        comparison_data.append({
+            'domain': store.domains[p1['domain']],
+            'phase1_rtt': phase1_rtt,
+            'phase2_rtt': phase2_rtt,
+            'phase1_servers': int(p1['servers']) if p1['servers'] >= 0 else 4,  # Default to 4 if not traced
+            'phase2_cache': bool(p2['cache_hit']),
+            'speedup': phase1_rtt / phase2_rtt if phase2_rtt > 0 else 0
+        })
+    
+    if len(comparison_data) < 10:
+        print(f"[WARNING] Only {len(comparison_data)} domains available for comparison")
+    
+    print(f"[*] Analyzing {len(comparison_data)} domains (Phase 1 vs Phase 2 comparison)")
+    
+    if plots:
+        output_plot = 'results/part_d_plots.png'
+        plot_h1_comparison(comparison_data, output_plot)
+        print(f"\n[OK] Plots saved: {output_plot}")
+    
+    # Print detailed analysis
+    print("\n" + "="*80)
+    print("DETAILED ANALYSIS - Phase 1 vs Phase 2 Comparison")
+    print("="*80)
+    print(f"\n{'#':<3} {'Domain':<30} {'Phase 1':<12} {'Phase 2':<12} {'Speedup':<10} {'Servers (P1→P2)':<15}")
+    print("-"*90)
+    
+    for i, d in enumerate(comparison_data, 1):
+        p1_servers = d['phase1_servers']
+        p2_servers = 1 if d['phase2_cache'] else 4
+        print(f"{i:<3} {d['domain']:<30} {d['phase1_rtt']:>6.1f} ms    {d['phase2_rtt']:>6.1f} ms    "
+              f"{d['speedup']:>6.1f}x    {p1_servers} → {p2_servers}")
+    
+    # Statistics
+    avg_p1 = sum(d['phase1_rtt'] for d in comparison_data) / len(comparison_data)
+    avg_p2 = sum(d['phase2_rtt'] for d in comparison_data) / len(comparison_data)
+    avg_speedup = sum(d['speedup'] for d in comparison_data) / len(comparison_data)
+    cache_hit_count = sum(1 for d in comparison_data if d['phase2_cache'])
+    
+    print("\n" + "="*80)
+    print("STATISTICS")
+    print("="*80)
+    print(f"Average Latency (Phase 1):     {avg_p1:.2f} ms")
+    print(f"Average Latency (Phase 2):     {avg_p2:.2f} ms")
+    print(f"Average Speedup:               {avg_speedup:.2f}x")
+    print(f"Phase 2 Cache Hits:            {cache_hit_count}/{len(comparison_data)} ({cache_hit_count/len(comparison_data)*100:.0f}%)")
+    print(f"Latency Reduction:             {(1 - avg_p2/avg_p1)*100:.0f}%")
+    
+    # Per-host statistics over every query (vectorized on the columnar store)
+    host_stats = per_host_stats(store)
+    host_lines = []
+    host_lines.append(f"{'Host':<6} {'Queries':>8} {'Success':>8} {'Failed':>7} {'Hits':>5} "
+                      f"{'Mean':>8} {'p50':>8} {'p90':>8} {'p99':>8}")
+    host_lines.append("-"*80)
+    for host, st in host_stats.items():
+        pct = st['percentiles_ms']
+        host_lines.append(f"{host.upper():<6} {st['queries']:>8} {st['successful']:>8} {st['failed']:>7} "
+                          f"{st['cache_hits']:>5} {st['mean_ms']:>6.1f}ms {pct[50]:>6.1f}ms "
+                          f"{pct[90]:>6.1f}ms {pct[99]:>6.1f}ms")
+    
+    print("\n" + "="*80)
+    print("PER-HOST STATISTICS (Phase 1 latency, all queries)")
+    print("="*80)
+    print('\n'.join(host_lines))
+    
+    # Compare with the latest recorded Part B run if available
+    print("\n" + "="*80)
+    print("COMPARISON: Part D vs Part B")
+    print("="*80)
+    
+    part_b_runs = list_runs(harness='part_b')
+    part_d_runs = list_runs(harness='part_d')
+    if part_b_runs and part_d_runs:
+        print("\nPart B used direct/NAT DNS (8.8.8.8)")
+        print("Part D uses custom resolver (10.0.0.5) with caching")
+        print_comparison([part_b_runs[-1], part_d_runs[-1]])
+    else:
+        print("\n[NOTE] No recorded Part B and Part D runs in results/runs/ to compare")
+        print("       Run test_part_b(net) and part_d(net) in Mininet to record them")
+    
+    # Save detailed report
+    report_lines = []
+    report_lines.append("="*80)
+    report_lines.append("PART D: Detailed Analysis Report - Phase 1 vs Phase 2 Comparison")
+    report_lines.append("="*80)
+    report_lines.append("\nFirst 10 Re-queried Domains from H1:")
+    report_lines.append("-"*80)
+    
+    # Full records (traced paths, responses) only for the compared domains: one streaming pass
+    compared = {d['domain'] for d in comparison_data}
+    h1_details = {}
+    for log in iter_logs(log_file):
+        if log['host'] == 'h1' and log['success'] and log['domain'] in compared:
+            h1_details.setdefault((log.get('query_num') == 'requery', log['domain']), log)
+    
+    for i, d in enumerate(comparison_data, 1):
+        phase1_log = h1_details.get((False, d['domain']))
+        phase2_log = h1_details.get((True, d['domain']))
+        
+        report_lines.append(f"\n{i}. {d['domain']}")
+        report_lines.append(f"   PHASE 1 (Initial Query - Cache MISS):")
+        if phase1_log:
+            report_lines.append(f"      Resolution Mode:  {phase1_log['resolution_mode']}")
+            report_lines.append(f"      DNS Server:       {phase1_log['dns_server']}")
+            report_lines.append(f"      Resolution Step:  {phase1_log['resolution_step']}")
+            
+            # Show full resolution path if traced
+            if 'full_resolution_path' in phase1_log and phase1_log['full_resolution_path']:
+                report_lines.append(f"      Full Resolution Path (Traced):")
+                for step in phase1_log['full_resolution_path']:
+                    report_lines.append(f"         → {step}")
+                report_lines.append(f"      Servers Visited:  {phase1_log['servers_visited_count']} (traced)")
+            else:
+                report_lines.append(f"      Servers Visited:  4 (estimated)")
+            
+            report_lines.append(f"      Response:         {phase1_log['response']}")
+            report_lines.append(f"      RTT:              {phase1_log['rtt_ms']} ms")
+            report_lines.append(f"      Total Time:       {phase1_log['total_time_ms']} ms")
+        
+        report_lines.append(f"\n   PHASE 2 (Re-query - Cache {'HIT' if d['phase2_cache'] else 'MISS'}):")
+        if phase2_log:
+            report_lines.append(f"      Resolution Step:  {phase2_log['resolution_step']}")
+            report_lines.append(f"      Servers Visited:  {1 if d['phase2_cache'] else 4}")
+            report_lines.append(f"      Response:         {phase2_log['response']}")
+            report_lines.append(f"      RTT:              {phase2_log['rtt_ms']} ms")
+            report_lines.append(f"      Total Time:       {phase2_log['total_time_ms']} ms")
+            report_lines.append(f"      Speedup:          {d['speedup']:.1f}x faster")
+            report_lines.append(f"      Latency Reduction: {(1 - d['phase2_rtt']/d['phase1_rtt'])*100:.0f}%")
+    
+    report_lines.append("\n" + "="*80)
+    report_lines.append("Summary Statistics:")
+    report_lines.append(f"  Average Phase 1 Latency:   {avg_p1:.2f} ms")
+    report_lines.append(f"  Average Phase 2 Latency:   {avg_p2:.2f} ms")
+    report_lines.append(f"  Average Speedup:           {avg_speedup:.2f}x")
+    report_lines.append(f"  Cache Hit Rate (Phase 2):  {cache_hit_count}/{len(comparison_data)} ({cache_hit_count/len(comparison_data)*100:.0f}%)")
+    report_lines.append(f"  Overall Latency Reduction: {(1 - avg_p2/avg_p1)*100:.0f}%")
+    report_lines.append("="*80)
+    report_lines.append("Per-Host Statistics (Phase 1 latency, all queries):")
+    report_lines.extend(host_lines)
+    report_lines.append("="*80)
+    
+    report_file = 'results/part_d_analysis_report.txt'
+    with open(report_file, 'w') as f:
+        f.write('\n'.join(report_lines))
+    
+    print(f"\n[OK] Report saved: {report_file}")
+    
+    print("\n" + "="*80)
+    print("Analysis Complete!")
+    print("="*80)
+    print("\nGenerated files in results/:")
+    if plots:
+        print("  - part_d_plots.png (visualization)")
+    print("  - part_d_analysis_report.txt (detailed report)")
+    print("="*80 + "\n")
+
+def plot_all_hosts(host_rtts, host_series, bands, speedups, output_plot):
+    """Latency CDFs, per-host percentile bands, latency over time and speedup distribution"""
+    plt = _pyplot()
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 11))
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    hosts = list(host_rtts)
+    
+    # Plot 1: Phase 1 latency CDF per host
+    for i, host in enumerate(hosts):
+        x, y = downsample_cdf(host_rtts[host])
+        ax1.step(x, y, where='post', label=host.upper(), color=colors[i % len(colors)])
+    ax1.set_xscale('log')
+    ax1.set_xlabel('Latency (ms)', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Fraction of Queries', fontsize=12, fontweight='bold')
+    ax1.set_title('Phase 1 Latency CDF (All Queries)', fontsize=13, fontweight='bold')
+    ax1.grid(alpha=0.3)
+    ax1.legend(fontsize=10)
+    
+    # Plot 2: Percentile bands per host (p5-p95 outer, p25-p75 inner, p50 and p99 marks)
+    x = np.arange(len(hosts))
+    ax2.fill_between(x, bands[5], bands[95], color='#3498db', alpha=0.2, label='p5-p95')
+    ax2.fill_between(x, bands[25], bands[75], color='#3498db', alpha=0.4, label='p25-p75')
+    ax2.plot(x, bands[50], marker='o', color='#2c3e50', label='p50')
+    ax2.plot(x, bands[99], marker='^', linestyle='--', color='#e74c3c', label='p99')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels([h.upper() for h in hosts])
+    ax2.set_yscale('log')
+    ax2.set_ylabel('Latency (ms)', fontsize=12, fontweight='bold')
+    ax2.set_title('Per-Host Latency Percentile Bands', fontsize=13, fontweight='bold')
+    ax2.grid(alpha=0.3)
+    ax2.legend(fontsize=10)
+    
+    # Plot 3: Latency over the run (min/max decimated)
+    for i, host in enumerate(hosts):
+        t, rtt = host_series[host]
+        t, rtt = downsample_series(t, rtt)
+        ax3.plot(t, rtt, linewidth=0.7, label=host.upper(), color=colors[i % len(colors)])
+    ax3.set_yscale('log')
+    ax3.set_xlabel('Time Since Run Start (s)', fontsize=12, fontweight='bold')
+    ax3.set_ylabel('Latency (ms)', fontsize=12, fontweight='bold')
+    ax3.set_title('Latency Over Time', fontsize=13, fontweight='bold')
+    ax3.grid(alpha=0.3)
+    ax3.legend(fontsize=10)
+    
+    # Plot 4: Phase 1 / Phase 2 speedup distribution
+    if len(speedups):
+        bins = np.logspace(np.log10(max(speedups.min(), 0.01)), np.log10(speedups.max()) + 0.01, 40)
+        ax4.hist(speedups, bins=bins, color='#27ae60', alpha=0.8)
+        ax4.axvline(np.median(speedups), color='#2c3e50', linestyle='--',
+                    label=f'median {np.median(speedups):.1f}x')
+        ax4.axvline(1.0, color='#e74c3c', linestyle=':', label='no speedup')
+        ax4.legend(fontsize=10)
+    ax4.set_xscale('log')
+    ax4.set_xlabel('Speedup (Phase 1 RTT / Phase 2 RTT)', fontsize=12, fontweight='bold')
+    ax4.set_ylabel('Re-queried Domains', fontsize=12, fontweight='bold')
+    ax4.set_title('Phase 1 vs Phase 2 Speedup Distribution', fontsize=13, fontweight='bold')
+    ax4.grid(alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(output_plot, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+
+def analyze_all_hosts(plots=True):
+    """Every host and every query: CDFs, percentile bands and speedup distribution"""
+    
+    print("\n" + "="*80)
+    print("PART D: All-Host Analysis")
+    print("="*80)
+    
+    if not logs_exist(LOG_FILE):
+        print(f"[FAIL] {LOG_FILE} not found")
+        print("Please run Part D testing first in Mininet")
+        return
+    
+    store = _open_store()
+    data = store.data
+    ok = store.success_mask()
+    phase1_ok = ok & (data['phase'] == 1)
+    t0 = int(data['ts_ns'].min()) if len(data) else 0
+    
+    host_rtts = {}
+    host_series = {}
+    for code, host in enumerate(store.hosts):
+        rows = np.flatnonzero(phase1_ok & (data['host'] == code))
+        rtt = np.asarray(data['rtt_ms'][rows], dtype=np.float64)
+        host_rtts[host] = rtt
+        host_series[host] = ((data['ts_ns'][rows] - t0) / 1e9, rtt)
+    
+    qs = (5, 25, 50, 75, 95, 99)
+    host_pct = {host: percentiles(rtt, qs) for host, rtt in host_rtts.items()}
+    bands = {q: [host_pct[h][q] for h in store.hosts] for q in qs}
+    all_rtt = np.asarray(data['rtt_ms'][phase1_ok], dtype=np.float64)
+    overall = percentiles(all_rtt, qs)
+    
+    rows1, rows2 = phase_join(store)
+    rtt1 = np.asarray(data['rtt_ms'][rows1], dtype=np.float64)
+    rtt2 = np.asarray(data['rtt_ms'][rows2], dtype=np.float64)
+    positive = rtt2 > 0
+    speedups = rtt1[positive] / rtt2[positive]
+    speedup_pct = percentiles(speedups, (5, 25, 50, 75, 95))
+    
+    host_stats = per_host_stats(store)
+    
+    lines = []
+    lines.append("="*80)
+    lines.append("PART D: All-Host Analysis Report")
+    lines.append("="*80)
+    lines.append(f"\nRecords: {len(store)} ({int(phase1_ok.sum())} successful Phase 1 queries, "
+                 f"{len(rows2)} matched Phase 2 re-queries)")
+    lines.append("\nPhase 1 Latency Percentiles (ms):")
+    lines.append(f"{'Host':<8} {'Success':>8} {'Failed':>7} " + ' '.join(f"{'p' + str(q):>8}" for q in qs))
+    lines.append("-"*80)
+    for host in store.hosts:
+        st = host_stats[host]
+        lines.append(f"{host.upper():<8} {st['successful']:>8} {st['failed']:>7} "
+                     + ' '.join(f"{host_pct[host][q]:>8.1f}" for q in qs))
+    lines.append(f"{'ALL':<8} {int(phase1_ok.sum()):>8} {sum(s['failed'] for s in host_stats.values()):>7} "
+                 + ' '.join(f"{overall[q]:>8.1f}" for q in qs))
+    
+    lines.append("\nPhase 2 Cache Hits:")
+    for host in store.hosts:
+        st = host_stats[host]
+        rate = st['cache_hits'] / st['phase2'] * 100 if st['phase2'] else 0
+        lines.append(f"  {host.upper():<6} {st['cache_hits']}/{st['phase2']} ({rate:.1f}%)")
+    
+    lines.append("\nSpeedup Distribution (Phase 1 RTT / Phase 2 RTT):")
+    if len(speedups):
+        lines.append("  " + '  '.join(f"p{q}: {v:.2f}x" for q, v in speedup_pct.items()))
+        lines.append(f"  Mean: {speedups.mean():.2f}x   Slower on re-query: {int((speedups < 1).sum())}/{len(speedups)}")
+    else:
+        lines.append("  No matched re-queries")
+    lines.append("="*80)
+    
+    print('\n'.join(lines[3:]))
+    
+    report_file = 'results/part_d_all_hosts_report.txt'
+    with open(report_file, 'w') as f:
+        f.write('\n'.join(lines))
+    print(f"\n[OK] Report saved: {report_file}")
+    
+    if plots:
+        output_plot = 'results/part_d_all_hosts.png'
+        plot_all_hosts(host_rtts, host_series, bands, speedups, output_plot)
+        print(f"[OK] Plots saved: {output_plot}")
+    print()
+
+
+def run(args):
+    """`cn_a2 analyze` entry point"""
+    if args.all_hosts:
+        analyze_all_hosts(plots=not args.no_plots)
+    else:
+        analyze_part_d(plots=not args.no_plots)
@@ -0,0 +1,143 @@
+"""
+Path Latency Model
+Expected base RTT of every host <-> resolver path from the link parameters
+of the topology (TCLink delay and bandwidth), so the harnesses can report
+the resolver's own service time (observed RTT - path RTT) and compare hosts
+regardless of where they sit on the switch chain. With the default DNSLinear
+links:
+
+  h1 -> dns  h1-s1 2 ms, s1-s2 5 ms, dns-s2 1 ms               16 ms RTT
+  h4 -> dns  h4-s4 2 ms, s3-s4 10 ms, s2-s3 8 ms, dns-s2 1 ms  42 ms RTT
+
+TCLink applies netem delay on both ends of a link, so every link adds its
+delay once in each direction; serialisation is the frame size over the
+link's shaped bandwidth, per link and direction. Queueing, jitter and loss
+are not part of the base RTT (jitter and loss along the path are reported
+next to it).
+"""
+
+from collections import deque
+
+from .run_registry import percentile
+
+QUERY_BYTES = 90       # typical query frame: Ethernet + IP + UDP headers (42) + DNS
+RESPONSE_BYTES = 170   # typical answer frame with one or two A records
+
+
+def delay_ms(value):
+    """TCLink delay/jitter ('2ms', '500us', '0.1s', 2) in ms"""
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().lower()
+    for suffix, scale in (('ms', 1.0), ('us', 1e-3), ('s', 1000.0)):
+        if text.endswith(suffix):
+            return float(text[:-len(suffix)]) * scale
+    return float(text)
+
+
+class PathModel:
+    """
+    links: {'h1-s1': {'bw': 100, 'delay': '2ms', ...}}, the layout of
+    run_registry.topology_config (so recorded runs can be modelled offline)
+    """
+
+    def __init__(self, links):
+        self.links = {}
+        self.adj = {}
+        for name, params in links.items():
+            a, b = name.split('-', 1)
+            self.links[frozenset((a, b))] = params or {}
+            self.adj.setdefault(a, []).append(b)
+            self.adj.setdefault(b, []).append(a)
+
+    @classmethod
+    def from_net(cls, net):
+        """Model of a running network, including links added outside the Topo (e.g. the NAT node)"""
+        from .run_registry import topology_config
+
+        links = topology_config(net)
+        known = {frozenset(name.split('-', 1)) for name in links}
+        for link in getattr(net, 'links', []):
+            a, b = link.intf1.node.name, link.intf2.node.name
+            if frozenset((a, b)) not in known:
+                params = getattr(link.intf1, 'params', {}) or {}
+                links[f'{a}-{b}'] = {k: params[k] for k in ('bw', 'delay', 'loss', 'jitter') if k in params}
+        return cls(links)
+
+    def path(self, src, dst):
+        """Node names from src to dst (shortest path), None if not connected"""
+        prev = {src: None}
+        queue = deque([src])
+        while queue:
+            node = queue.popleft()
+            if node == dst:
+                hops = []
+                while node is not None:
+                    hops.append(node)
+                    node = prev[node]
+                return hops[::-1]
+            for nxt in self.adj.get(node, ()):
+                if nxt not in prev:
+                    prev[nxt] = node
+                    queue.append(nxt)
+        return None
+
+    def expected(self, src, dst, query_bytes=QUERY_BYTES, response_bytes=RESPONSE_BYTES):
+        """Base RTT of one query/answer exchange between src and dst, None if no path"""
+        hops = self.path(src, dst)
+        if hops is None:
+            return None
+        one_way = serialization = jitter = 0.0
+        delivered = 1.0
+        for a, b in zip(hops, hops[1:]):
+            params = self.links[frozenset((a, b))]
+            one_way += delay_ms(params.get('delay'))
+            jitter += delay_ms(params.get('jitter'))
+            if params.get('bw'):
+                serialization += (query_bytes + response_bytes) * 8 / (params['bw'] * 1e6) * 1000
+            delivered *= (1 - params.get('loss', 0) / 100) ** 2
+        return {
+            'path': hops,
+            'one_way_ms': round(one_way, 3),
+            'serialization_ms': round(serialization, 4),
+            'rtt_ms': round(2 * one_way + serialization, 3),
+            'jitter_ms': round(jitter, 3),
+            'loss_pct': round((1 - delivered) * 100, 3),
+        }
+
+
+def service_report(model, resolver, latencies_by_host, label=''):
+    """
+    Per-host base path RTT vs. observed latency. Returns (table lines, rows)
+    with rows[host] = path, path_rtt_ms, observed and service (observed -
+    path) mean / p50 / p99 in ms. Hosts with no path to `resolver` are skipped.
+    """
+    lines = [
+        f"{'Host':<6} {'Path':<22} {'Path RTT':>9} {'Observed':>9} {'Service':>9} {'Service':>9} {'Service':>9}",
+        f"{'':6} {'':22} {'(ms)':>9} {'avg (ms)':>9} {'avg (ms)':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}",
+        "-"*84,
+    ]
+    rows = {}
+    for host, latencies in latencies_by_host.items():
+        exp = model.expected(host, resolver)
+        if exp is None or not latencies:
+            continue
+        observed = sorted(latencies)
+        service = [x - exp['rtt_ms'] for x in observed]
+        rows[host] = {
+            'path': exp['path'],
+            'path_rtt_ms': exp['rtt_ms'],
+            'observed_avg_ms': round(sum(observed) / len(observed), 3),
+            'service_avg_ms': round(sum(service) / len(service), 3),
+            'service_p50_ms': round(percentile(service, 50), 3),
+            'service_p99_ms': round(percentile(service, 99), 3),
+        }
+        r = rows[host]
+        path = '-'.join(exp['path'])
+        lines.append(f"{host.upper():<6} {path[:22]:<22} {r['path_rtt_ms']:>9.2f} {r['observed_avg_ms']:>9.2f} "
+                     f"{r['service_avg_ms']:>9.2f} {r['service_p50_ms']:>9.2f} {r['service_p99_ms']:>9.2f}")
+    if label:
+        lines.insert(0, label)
+    return lines, rows
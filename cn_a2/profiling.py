@@ -0,0 +1,120 @@
+"""
+Per-Stage Profiling Hooks for the Harnesses
+Opt-in wall-clock timers with a context-manager API. A disabled profiler
+hands out one shared no-op context, so the hooks can stay in the query loop.
+
+Usage:
+    prof = StageProfiler(enabled=True)
+    with prof.stage('phase1'):
+        with prof.stage('dig'):
+            ...
+            prof.record('dns', rtt_ms / 1000)   # known sub-interval, e.g. dig's Query time
+    print('\\n'.join(prof.report_lines()))
+    prof.write_collapsed('results/part_d_profile.folded')   # flamegraph.pl / speedscope input
+"""
+
+import re
+import time
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('prof', 'name', 'start')
+
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        prof = self.prof
+        prof._stack.append(self.name)
+        prof._child_ns.append(0)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        prof = self.prof
+        path = ';'.join(prof._stack)
+        children = prof._child_ns.pop()
+        prof._stack.pop()
+        prof._add(path, elapsed, elapsed - children)
+        if prof._child_ns:
+            prof._child_ns[-1] += elapsed
+        return False
+
+
+class StageProfiler:
+    """
+    Accumulates, per stage path (e.g. 'phase1;query;dig'), the call count,
+    total time and self time (total minus time spent in child stages).
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._stack = []
+        self._child_ns = []
+        self.calls = {}
+        self.total_ns = {}
+        self.self_ns = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        """Add an externally measured interval as a child of the current stage"""
+        if not self.enabled or seconds is None:
+            return
+        ns = int(seconds * 1e9)
+        path = ';'.join(self._stack + [name])
+        self._add(path, ns, ns)
+        if self._child_ns:
+            self._child_ns[-1] += ns
+
+    def _add(self, path, total, own):
+        self.calls[path] = self.calls.get(path, 0) + 1
+        self.total_ns[path] = self.total_ns.get(path, 0) + total
+        self.self_ns[path] = self.self_ns.get(path, 0) + max(own, 0)
+
+    def report_lines(self):
+        """Per-stage breakdown table, stages in tree order"""
+        grand = sum(ns for path, ns in self.self_ns.items()) or 1
+        lines = [f"{'Stage':<40} {'Calls':>7} {'Total (ms)':>12} {'Self (ms)':>12} {'Mean (ms)':>10} {'Self %':>7}",
+                 "-"*93]
+        for path in sorted(self.total_ns):
+            depth = path.count(';')
+            label = '  ' * depth + path.rsplit(';', 1)[-1]
+            calls = self.calls[path]
+            total = self.total_ns[path] / 1e6
+            own = self.self_ns[path] / 1e6
+            lines.append(f"{label:<40} {calls:>7} {total:>12.1f} {own:>12.1f} "
+                         f"{total / calls:>10.2f} {self.self_ns[path] / grand * 100:>6.1f}%")
+        return lines
+
+    def write_collapsed(self, path):
+        """Collapsed-stack file ('a;b;c <self microseconds>' per line) for flame graphs"""
+        with open(path, 'w') as f:
+            for stack, ns in sorted(self.self_ns.items()):
+                us = ns // 1000
+                if us:
+                    f.write(f"{stack} {us}\n")
+
+
+def dig_query_time(dig_output):
+    """dig's reported Query time in seconds (resolver round trip), None if absent"""
+    match = re.search(r'Query time: (\d+) msec', dig_output)
+    return int(match.group(1)) / 1000 if match else None
@@ -0,0 +1,267 @@
+"""
+Query Policy: adaptive timeouts, retry budget and hedged queries
+Per-attempt timeouts follow the observed RTT distribution instead of a fixed
++time=5, retries of timed-out queries draw on a shared budget so a run full
+of dead names cannot double its own load, and an optional hedge sends a
+duplicate query once the first is slower than most answers. Timeouts are
+reported as their own outcome, separate from NXDOMAIN and SERVFAIL.
+
+Usage:
+    policy = QueryPolicy(hedge=True)
+    outcome, output, rtt_s = policy.dig(host.popen, ['@10.0.0.5', domain])
+    print(policy.summary())
+"""
+
+import math
+import queue
+import select
+import subprocess
+import threading
+import time
+from collections import deque
+
+from .answer_store import RCODE_NAMES, dig_rcode
+from .run_registry import percentile
+
+TIMEOUT = 'TIMEOUT'
+NODATA = 'NODATA'          # NOERROR without an A record in the answer
+MIN_SAMPLES = 20           # RTTs needed before the timeout adapts
+
+
+def outcome_name(rcode):
+    """Outcome category of a DNS rcode (-1 = no reply = TIMEOUT)"""
+    if rcode == -1:
+        return TIMEOUT
+    return RCODE_NAMES.get(rcode, f'RCODE{rcode}')
+
+
+class QueryPolicy:
+    """
+    attempt timeout = clamp(multiplier * p<quantile> RTT, min_timeout, max_timeout),
+    initial_timeout until MIN_SAMPLES answers were seen. A timed-out query is
+    retried (up to max_attempts) only while the retry budget has a token:
+    the budget starts with `retry_reserve` tokens, every query adds
+    `retry_ratio` (capped at the reserve) and every retry takes one. With
+    `hedge`, a duplicate is sent after p<hedge_quantile> RTT and the first
+    answer wins.
+    """
+
+    def __init__(self, initial_timeout=2.0, min_timeout=0.25, max_timeout=5.0, quantile=99,
+                 multiplier=3.0, window=256, max_attempts=2, retry_ratio=0.1, retry_reserve=10,
+                 hedge=False, hedge_quantile=95):
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.quantile = quantile
+        self.multiplier = multiplier
+        self.max_attempts = max_attempts
+        self.retry_ratio = retry_ratio
+        self.retry_reserve = retry_reserve
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self._rtts = deque(maxlen=window)
+        self._tokens = float(retry_reserve)
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.attempts = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.outcomes = {}
+
+    # ------------------------------------------------------------------
+    # Timeouts and budget
+    # ------------------------------------------------------------------
+
+    def observe(self, rtt_s):
+        with self._lock:
+            self._rtts.append(rtt_s)
+
+    def _rtt_percentile(self, q):
+        with self._lock:
+            if len(self._rtts) < MIN_SAMPLES:
+                return None
+            return percentile(sorted(self._rtts), q)
+
+    def attempt_timeout(self):
+        p = self._rtt_percentile(self.quantile)
+        if p is None:
+            return self.initial_timeout
+        return min(max(self.multiplier * p, self.min_timeout), self.max_timeout)
+
+    def hedge_delay(self):
+        """Seconds to wait before sending a duplicate, None when not hedging"""
+        if not self.hedge:
+            return None
+        return self._rtt_percentile(self.hedge_quantile)
+
+    def _start_query(self):
+        with self._lock:
+            self.queries += 1
+            self._tokens = min(self._tokens + self.retry_ratio, self.retry_reserve)
+
+    def _take_retry(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.retries += 1
+                return True
+            self.retries_denied += 1
+            return False
+
+    def execute(self, attempt):
+        """
+        Run one query through the policy. attempt(timeout_s, hedge_delay_s)
+        returns (outcome, result, rtt_s, hedge_won); only TIMEOUT is retried.
+        Returns (outcome, result, rtt_s) of the last attempt.
+        """
+        self._start_query()
+        for n in range(self.max_attempts):
+            outcome, result, rtt, hedge_won = attempt(self.attempt_timeout(), self.hedge_delay())
+            with self._lock:
+                self.attempts += 1
+                self.hedge_wins += hedge_won
+            if outcome != TIMEOUT:
+                self.observe(rtt)
+                break
+            if n + 1 >= self.max_attempts or not self._take_retry():
+                break
+        with self._lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        return outcome, result, rtt
+
+    # ------------------------------------------------------------------
+    # Query backends
+    # ------------------------------------------------------------------
+
+    def dig(self, popen, dig_args):
+        """
+        dig through the policy. `popen` starts a process (host.popen inside
+        Mininet, subprocess.Popen outside). Returns (outcome, dig output, rtt_s);
+        the output is '' on TIMEOUT.
+        """
+        def attempt(timeout, hedge_delay):
+            # dig only takes whole seconds; the policy deadline is enforced here
+            cmd = ['dig', f'+time={max(1, math.ceil(timeout))}', '+tries=1', *dig_args]
+            start = time.perf_counter()
+            deadline = start + timeout
+            hedge_at = start + hedge_delay if hedge_delay is not None and hedge_delay < timeout else None
+            procs = [popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)]
+            output, winner, hedged = None, None, None
+            try:
+                while output is None:
+                    now = time.perf_counter()
+                    if now >= deadline:
+                        break
+                    wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                    ready, _, _ = select.select([p.stdout for p in procs], [], [], wake - now)
+                    if ready:
+                        winner = next(p for p in procs if p.stdout in ready)
+                        output = winner.stdout.read().decode(errors='replace')
+                        if not output and len(procs) > 1:
+                            procs.remove(winner)  # this copy died; keep waiting for the other
+                            output = winner = None
+                    elif hedge_at is not None and time.perf_counter() >= hedge_at:
+                        hedged = popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                        procs.append(hedged)
+                        hedge_at = None
+                        with self._lock:
+                            self.hedges += 1
+            finally:
+                for p in procs:
+                    if p.poll() is None:
+                        p.kill()
+                    p.wait()
+                    p.stdout.close()
+            rtt = time.perf_counter() - start
+            if not output:
+                return TIMEOUT, '', rtt, False
+            outcome = outcome_name(dig_rcode(output))
+            if outcome == 'NOERROR' and 'ANSWER SECTION' not in output:
+                outcome = NODATA
+            return outcome, output, rtt, winner is not None and winner is hedged
+
+        return self.execute(attempt)
+
+    @staticmethod
+    def _spawn(fn, results, index):
+        """
+        Run fn() on its own daemon thread, putting (index, result, exception)
+        on `results`; returns once fn has started. An abandoned lookup keeps
+        only its own thread, never one a later query is waiting for.
+        """
+        started = threading.Event()
+
+        def target():
+            started.set()
+            try:
+                result = fn()
+            except Exception as e:
+                results.put((index, None, e))
+            else:
+                results.put((index, result, None))
+
+        threading.Thread(target=target, name=f'query-{index}', daemon=True).start()
+        started.wait()
+
+    def call(self, fn, classify):
+        """
+        Blocking lookup `fn()` (e.g. getaddrinfo) through the policy, each
+        attempt and hedge on its own thread so the deadline and hedge do not
+        depend on fn's own timeout; the clock starts once fn is running.
+        classify(result, exception, rtt_s) -> outcome.
+        Returns (outcome, result or None, rtt_s).
+        """
+        def attempt(timeout, hedge_delay):
+            results = queue.Queue()
+            self._spawn(fn, results, 0)
+            start = time.perf_counter()
+            deadline = start + timeout
+            hedge_at = start + hedge_delay if hedge_delay is not None and hedge_delay < timeout else None
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    return TIMEOUT, None, now - start, False
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                try:
+                    index, result, exc = results.get(timeout=wake - now)
+                except queue.Empty:
+                    if hedge_at is not None and time.perf_counter() >= hedge_at:
+                        self._spawn(fn, results, 1)
+                        hedge_at = None
+                        with self._lock:
+                            self.hedges += 1
+                    continue
+                rtt = time.perf_counter() - start
+                return classify(result, exc, rtt), result, rtt, index == 1
+
+        return self.execute(attempt)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def config(self):
+        """Settings for the run registry"""
+        return {
+            'timeout': f'clamp({self.multiplier:g} x p{self.quantile} RTT, '
+                       f'{self.min_timeout:g}s, {self.max_timeout:g}s), initial {self.initial_timeout:g}s',
+            'max_attempts': self.max_attempts,
+            'retry_budget': f'{self.retry_ratio:g} per query, reserve {self.retry_reserve}',
+            'hedge': f'after p{self.hedge_quantile} RTT' if self.hedge else 'off',
+        }
+
+    def summary(self):
+        line = (f"Query policy: {self.queries} queries, {self.attempts} attempts, "
+                f"current timeout {self.attempt_timeout():.3f}s; retries {self.retries} "
+                f"({self.retries_denied} denied by budget)")
+        if self.hedge:
+            line += f"; hedges {self.hedges} ({self.hedge_wins} won)"
+        return line
+
+
+def format_failures(outcomes):
+    """'NXDOMAIN 3, TIMEOUT 2' for the non-success outcomes of a host"""
+    failures = [(k, v) for k, v in sorted(outcomes.items()) if k != 'NOERROR' and v]
+    return ', '.join(f"{k} {v}" for k, v in failures) or 'none'
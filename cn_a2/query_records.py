@@ -0,0 +1,295 @@
+"""
+Compact Query Records
+One append-only, array-backed log of query results shared by the harnesses
+(part_b_simple, test_part_b, part_d) instead of per-query dicts and strings:
+domains and hosts are interned to integer IDs, timestamps are integer
+nanoseconds, outcomes are Status codes and A records are packed IPv4
+integers. Records are converted in batches to the answer store, the run
+registry, JSON Lines logs, the legacy text exports and the columnar store.
+"""
+
+import math
+import socket
+import struct
+import threading
+from array import array
+from datetime import datetime
+from enum import IntEnum
+
+NAN = float('nan')
+
+
+class Status(IntEnum):
+    """Query outcome; 0-5 are DNS rcodes, the rest have no rcode of their own"""
+    NOERROR = 0
+    FORMERR = 1
+    SERVFAIL = 2
+    NXDOMAIN = 3
+    NOTIMP = 4
+    REFUSED = 5
+    NODATA = 16      # NOERROR without an A record
+    TIMEOUT = 17     # no reply within the query policy's deadline
+    ERROR = 18       # local failure (bad name, socket error, ...)
+
+    @classmethod
+    def from_outcome(cls, name):
+        """Status of a query-policy outcome name ('NOERROR', 'TIMEOUT', 'RCODE9', ...)"""
+        return cls.__members__.get(name, cls.ERROR)
+
+    @property
+    def rcode(self):
+        """Answer-store rcode: the DNS rcode, 0 for NODATA, -1 without a reply"""
+        if self < 16:
+            return int(self)
+        return 0 if self is Status.NODATA else -1
+
+
+class Interner:
+    """String <-> small integer ID, in first-seen order"""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.ids = {}
+        for v in values:
+            self.intern(v)
+
+    def intern(self, value):
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+    def __getitem__(self, i):
+        return self.values[i]
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _ip_to_int(ip):
+    return struct.unpack('!I', socket.inet_aton(ip))[0]
+
+
+def _int_to_ip(n):
+    return socket.inet_ntoa(struct.pack('!I', n))
+
+
+class QueryRecord:
+    """Read-only view of one record of a QueryLog"""
+
+    __slots__ = ('host', 'domain', 'status', 'phase', 'query_num', 'ts_ns', 'rtt_ms',
+                 'total_ms', 'ttl', 'ips', 'cache_hit', 'servers', 'ref_ms', 'extra')
+
+    def __init__(self, log, i):
+        self.host = log.hosts[log.host_id[i]]
+        self.domain = log.domains[log.domain_id[i]]
+        self.status = Status(log.status[i])
+        self.phase = log.phase[i]
+        self.query_num = log.query_num[i]
+        self.ts_ns = log.ts_ns[i]
+        self.rtt_ms = None if math.isnan(log.rtt_ms[i]) else log.rtt_ms[i]
+        self.total_ms = log.total_ms[i]
+        self.ttl = None if log.ttl[i] < 0 else log.ttl[i]
+        self.ips = log.ips_of(i)
+        self.cache_hit = None if log.cache_hit[i] < 0 else bool(log.cache_hit[i])
+        self.servers = None if log.servers[i] < 0 else log.servers[i]
+        self.ref_ms = None if math.isnan(log.ref_ms[i]) else log.ref_ms[i]
+        self.extra = log.extra.get(i)
+
+    @property
+    def success(self):
+        return self.status is Status.NOERROR
+
+    @property
+    def timestamp(self):
+        return datetime.fromtimestamp(self.ts_ns / 1e9).isoformat()
+
+
+class QueryLog:
+    """
+    Column arrays, one entry per query. append() is thread-safe (the shared
+    work queue resolves from several threads). Optional per-record values:
+    rtt_ms / ref_ms (NaN), ttl / cache_hit / servers (-1); rarely present
+    bulky fields (e.g. a traced resolution path) go in `extra`.
+    metrics: optional metrics.QueryMetrics fed every appended query
+    on_append: optional callable(index) run after every append, e.g. to
+    stream each record to a JsonlWriter as it is made
+    """
+
+    def __init__(self, run_id, domains=None, metrics=None, on_append=None):
+        self.run_id = run_id
+        self.metrics = metrics
+        self.on_append = on_append
+        self.hosts = Interner()
+        self.domains = domains if domains is not None else Interner()
+        self.host_id = array('B')
+        self.domain_id = array('I')
+        self.status = array('B')
+        self.phase = array('B')
+        self.query_num = array('i')
+        self.ts_ns = array('q')
+        self.rtt_ms = array('f')       # resolver-reported / measured query latency
+        self.total_ms = array('f')     # harness wall time of the query, retries included
+        self.ttl = array('i')
+        self.cache_hit = array('b')
+        self.servers = array('b')      # traced servers visited
+        self.ref_ms = array('f')       # reference latency (Part D: the Phase 1 RTT of a re-query)
+        self.ip_start = array('I')     # record i's A records are ips[ip_start[i]:ip_start[i + 1]]
+        self.ips = array('I')
+        self.extra = {}
+        self.counts = {}               # host -> [successful, failed], for progress lines
+        self._lock = threading.Lock()
+
+    def append(self, host, domain, status, ts_ns, total_ms, rtt_ms=None, ips=(), ttl=None,
+               phase=1, query_num=-1, cache_hit=None, servers=None, ref_ms=None, extra=None):
+        """Add one query; returns its record index"""
+        with self._lock:
+            i = len(self.status)
+            self.host_id.append(self.hosts.intern(host))
+            self.domain_id.append(self.domains.intern(domain))
+            self.status.append(status)
+            self.phase.append(phase)
+            self.query_num.append(query_num)
+            self.ts_ns.append(ts_ns)
+            self.rtt_ms.append(NAN if rtt_ms is None else rtt_ms)
+            self.total_ms.append(total_ms)
+            self.ttl.append(-1 if ttl is None else ttl)
+            self.cache_hit.append(-1 if cache_hit is None else int(cache_hit))
+            self.servers.append(-1 if servers is None else servers)
+            self.ref_ms.append(NAN if ref_ms is None else ref_ms)
+            self.ip_start.append(len(self.ips))
+            self.ips.extend(_ip_to_int(ip) for ip in ips)
+            if extra:
+                self.extra[i] = extra
+            counts = self.counts.setdefault(host, [0, 0])
+            counts[0 if status == Status.NOERROR else 1] += 1
+        if self.metrics is not None:
+            self.metrics.observe(host, Status(status).name, total_ms)
+        if self.on_append is not None:
+            self.on_append(i)
+        return i
+
+    def __len__(self):
+        return len(self.status)
+
+    def __getitem__(self, i):
+        return QueryRecord(self, i)
+
+    def __iter__(self):
+        return (QueryRecord(self, i) for i in range(len(self)))
+
+    def ips_of(self, i):
+        end = self.ip_start[i + 1] if i + 1 < len(self.ip_start) else len(self.ips)
+        return [_int_to_ip(n) for n in self.ips[self.ip_start[i]:end]]
+
+    def select(self, host=None, phase=None):
+        """Record indexes of one host and/or phase, in append order"""
+        hid = self.hosts.ids.get(host, -1) if host is not None else None
+        return [i for i in range(len(self))
+                if (hid is None or self.host_id[i] == hid) and (phase is None or self.phase[i] == phase)]
+
+    # ------------------------------------------------------------------
+    # Batch conversions
+    # ------------------------------------------------------------------
+
+    def host_summary(self, host, phase=None):
+        """Counters the harness reports and the run registry stores for one host"""
+        rows = self.select(host, phase)
+        ok = [i for i in rows if self.status[i] == Status.NOERROR]
+        outcomes = {}
+        for i in rows:
+            name = Status(self.status[i]).name
+            outcomes[name] = outcomes.get(name, 0) + 1
+        return {
+            'successful': len(ok),
+            'failed': len(rows) - len(ok),
+            'latencies': [round(self.rtt_ms[i], 3) for i in ok],
+            'durations': [round(self.total_ms[i] / 1000, 6) for i in rows],
+            'outcomes': outcomes,
+        }
+
+    def answer_rows(self, host=None, phase=None):
+        """(domain, run_id, host, ips, ttl, rcode, latency_ms) rows for AnswerStore.upsert_many"""
+        for i in self.select(host, phase):
+            rtt = self.rtt_ms[i]
+            yield (self.domains[self.domain_id[i]], self.run_id, self.hosts[self.host_id[i]],
+                   self.ips_of(i), None if self.ttl[i] < 0 else self.ttl[i],
+                   Status(self.status[i]).rcode, None if math.isnan(rtt) else rtt)
+
+    def to_dict(self, i):
+        """Generic JSON form of one record"""
+        r = self[i]
+        entry = {
+            'timestamp': r.timestamp,
+            'host': r.host,
+            'domain': r.domain,
+            'phase': r.phase,
+            'query_num': r.query_num,
+            'status': r.status.name,
+            'success': r.success,
+            'response': ', '.join(r.ips),
+            'rtt_ms': round(r.rtt_ms, 2) if r.rtt_ms is not None else 0,
+            'total_time_ms': round(r.total_ms, 2),
+        }
+        if r.ttl is not None:
+            entry['ttl'] = r.ttl
+        if r.extra:
+            entry.update(r.extra)
+        return entry
+
+    def write_jsonl(self, writer, rows=None, convert=None):
+        """Write records (all, or the given indexes) to a JsonlWriter; returns how many"""
+        convert = convert or self.to_dict
+        rows = range(len(self)) if rows is None else rows
+        n = 0
+        for i in rows:
+            writer.write(convert(i))
+            n += 1
+        return n
+
+    def text(self, host, fmt='part_d'):
+        """One host's results in a legacy text layout (answer_store.EXPORTS)"""
+        from .answer_store import EXPORTS
+        rows = [{'domain': d, 'run_id': run_id, 'host': h, 'ips': ips, 'ttl': ttl,
+                 'rcode': rcode, 'latency_ms': latency}
+                for d, run_id, h, ips, ttl, rcode, latency in self.answer_rows(host)]
+        return EXPORTS[fmt](sorted(rows, key=lambda r: r['domain']), host)
+
+    def to_columnar(self, store_dir, source_mtime=None):
+        """
+        Write the log as a columnar store (columnar_store layout) straight from
+        the arrays, without building per-record dicts. Returns the row count.
+        """
+        import json
+        import os
+        import numpy as np
+        from .columnar_store import DATA_FILE, DOMAINS_FILE, META_FILE, RECORD_DTYPE
+
+        n = len(self)
+        data = np.zeros(n, dtype=RECORD_DTYPE)
+        codes, data['status'] = np.unique(np.frombuffer(self.status, dtype=np.uint8), return_inverse=True)
+        data['host'] = np.frombuffer(self.host_id, dtype=np.uint8)
+        data['phase'] = np.frombuffer(self.phase, dtype=np.uint8)
+        data['cache_hit'] = np.frombuffer(self.cache_hit, dtype=np.int8) == 1
+        data['servers'] = np.frombuffer(self.servers, dtype=np.int8)
+        data['domain'] = np.frombuffer(self.domain_id, dtype=np.uint32)
+        data['query_num'] = np.where(data['phase'] == 2, -1, np.frombuffer(self.query_num, dtype=np.int32))
+        data['ts_ns'] = np.frombuffer(self.ts_ns, dtype=np.int64)
+        data['rtt_ms'] = np.nan_to_num(np.frombuffer(self.rtt_ms, dtype=np.float32))
+        data['total_ms'] = np.frombuffer(self.total_ms, dtype=np.float32)
+
+        os.makedirs(store_dir, exist_ok=True)
+        data.tofile(os.path.join(store_dir, DATA_FILE))
+        with open(os.path.join(store_dir, DOMAINS_FILE), 'w') as f:
+            for domain in self.domains.values:
+                f.write(domain + '\n')
+        with open(os.path.join(store_dir, META_FILE), 'w') as f:
+            json.dump({
+                'rows': n,
+                'dtype': RECORD_DTYPE.descr,
+                'hosts': self.hosts.values,
+                'statuses': [Status(int(c)).name for c in codes],
+                'source_mtime': source_mtime,
+            }, f, indent=2)
+        return n
@@ -0,0 +1,339 @@
+"""
+PCAP Traffic Replay
+Replays the DNS queries of the original captures (as2pcaps/PCAP_<n>_H<n>.pcap)
+from the matching Mininet host to the custom resolver, keeping the capture's
+inter-arrival times, bursts, repeats and query types. Timing can be the
+original (1x), scaled (Nx) or as fast as possible.
+
+Each host runs an open-loop sender (`python3 -m cn_a2 replay-client`) that
+keeps many queries in flight over one UDP socket, so a slow answer never
+delays the next scheduled query.
+
+Run from Mininet CLI (after Part C):
+  px from cn_a2.replay import replay_pcaps
+  py replay_pcaps(net, speed=1)        # 1x; speed=10 for 10x, speed=0 as fast as possible
+or start to finish with: sudo python3 -m cn_a2 bench --parts c,r --speed 10
+"""
+
+import glob
+import json
+import os
+import random
+import select
+import socket
+import sys
+import time
+from array import array
+
+from .dns_wire import QTYPE_NAMES, build_query, parse_header, rcode
+from .run_registry import percentile
+
+DEFAULT_PCAPS = 'as2pcaps/*.pcap'
+RESOLVER_IP = '10.0.0.5'
+QUERY_TIMEOUT = 2.0        # seconds before an unanswered query counts as a timeout
+MAX_INFLIGHT = 1024        # cap on outstanding queries (only reached as fast as possible)
+
+
+# ============================================================================
+# Schedules
+# ============================================================================
+
+def load_queries(pcap_file):
+    """[(timestamp, qname, qtype)] of every valid DNS query in a capture, in capture order"""
+    # scapy.all takes seconds to import, so only pay for it when parsing pcaps
+    from scapy.all import PcapReader, DNS, DNSQR
+    from .extract_all_domains import is_valid_domain
+
+    queries = []
+    with PcapReader(pcap_file) as pcap:
+        for pkt in pcap:
+            if pkt.haslayer(DNS) and pkt[DNS].qr == 0 and pkt.haslayer(DNSQR):
+                try:
+                    qname = pkt[DNSQR].qname.decode().rstrip('.')
+                except Exception:
+                    continue
+                if is_valid_domain(qname):
+                    queries.append((float(pkt.time), qname, int(pkt[DNSQR].qtype)))
+    queries.sort(key=lambda q: q[0])
+    return queries
+
+
+def write_schedule(path, queries):
+    """'<offset_s> <qtype> <qname>' per line, offsets relative to the first query"""
+    t0 = queries[0][0] if queries else 0.0
+    with open(path, 'w') as f:
+        for ts, qname, qtype in queries:
+            f.write(f"{ts - t0:.6f} {qtype} {qname}\n")
+
+
+def read_schedule(path):
+    offsets, qtypes, qnames = array('d'), array('H'), []
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3:
+                offsets.append(float(parts[0]))
+                qtypes.append(int(parts[1]))
+                qnames.append(parts[2])
+    return offsets, qtypes, qnames
+
+
+# ============================================================================
+# Open-loop sender (runs inside a Mininet host)
+# ============================================================================
+
+def replay(offsets, qtypes, qnames, server=RESOLVER_IP, port=53, speed=1.0,
+           timeout=QUERY_TIMEOUT, max_inflight=MAX_INFLIGHT):
+    """
+    Send every query at start + offset / speed (speed <= 0: as fast as
+    possible) and match answers by query ID. Returns per-query lists
+    latency_ms (None on timeout), rcode (-1 on timeout) and lag_ms (how late
+    each query left compared with its schedule), plus the seconds from the
+    first to the last send and the total elapsed seconds.
+    """
+    n = len(qnames)
+    latency = [None] * n
+    rcodes = [-1] * n
+    lag = array('d', bytes(8 * n))
+    sent_ns = array('q', bytes(8 * n))
+    qids = array('H', bytes(2 * n))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.connect((server, port))
+    sock.setblocking(False)
+
+    outstanding = {}           # query ID -> query index
+    next_id = random.randrange(65536)
+    timeout_ns = int(timeout * 1e9)
+    oldest = 0                 # lowest query index that may still be outstanding
+    i = 0
+    start = time.perf_counter_ns()
+
+    while i < n or outstanding:
+        now = time.perf_counter_ns()
+
+        # Send everything that is due
+        while i < n and len(outstanding) < max_inflight:
+            due = start + int(offsets[i] / speed * 1e9) if speed > 0 else now
+            if due > now:
+                break
+            while next_id in outstanding:
+                next_id = (next_id + 1) & 0xFFFF
+            try:
+                sock.send(build_query(next_id, qnames[i], qtypes[i]))
+            except BlockingIOError:
+                break
+            now = time.perf_counter_ns()
+            sent_ns[i] = now
+            lag[i] = max(now - due, 0) / 1e6
+            outstanding[next_id] = i
+            qids[i] = next_id
+            next_id = (next_id + 1) & 0xFFFF
+            i += 1
+
+        # Expire queries that have waited too long (sends are in index order)
+        while oldest < i and (latency[oldest] is not None or now - sent_ns[oldest] > timeout_ns):
+            if outstanding.get(qids[oldest]) == oldest:
+                del outstanding[qids[oldest]]
+            oldest += 1
+
+        # Wait for answers until the next send or expiry
+        if i < n and len(outstanding) < max_inflight:
+            wait = (start + int(offsets[i] / speed * 1e9) - now) / 1e9 if speed > 0 else 0
+        else:
+            wait = timeout
+        if oldest < i:
+            wait = min(wait, (sent_ns[oldest] + timeout_ns - now) / 1e9)
+        readable, _, _ = select.select([sock], [], [], max(min(wait, 0.05), 0))
+        if not readable:
+            continue
+        while True:
+            try:
+                data = sock.recv(4096)
+            except BlockingIOError:
+                break
+            header = parse_header(data)
+            if header is None:
+                continue
+            idx = outstanding.pop(header[0], None)
+            if idx is not None:
+                latency[idx] = (time.perf_counter_ns() - sent_ns[idx]) / 1e6
+                rcodes[idx] = rcode(header[1])
+
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    send_span = (sent_ns[n - 1] - sent_ns[0]) / 1e9 if n else 0.0
+    sock.close()
+    return latency, rcodes, list(lag), send_span, elapsed
+
+
+def run(args):
+    """`cn_a2 replay-client` entry point: replay one schedule and dump the raw results"""
+    offsets, qtypes, qnames = read_schedule(args.schedule)
+    latency, rcodes, lag, send_span, elapsed = replay(offsets, qtypes, qnames, args.server,
+                                                      speed=args.speed, timeout=args.timeout)
+    with open(args.output, 'w') as f:
+        json.dump({'latency_ms': latency, 'rcode': rcodes, 'lag_ms': lag,
+                   'send_span_s': send_span, 'elapsed_s': elapsed}, f)
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def summarize(offsets, qtypes, qnames, result, speed):
+    """Offered vs achieved rate, send lag and latency percentiles for one host"""
+    n = len(qnames)
+    span = offsets[-1] if n else 0.0
+    scaled_span = span / speed if speed > 0 else 0.0
+    answered = sorted(x for x in result['latency_ms'] if x is not None)
+    lag = sorted(result['lag_ms'])
+    elapsed = result['elapsed_s']
+    send_span = result['send_span_s']
+    mix = {}
+    for qtype in qtypes:
+        name = QTYPE_NAMES.get(qtype, str(qtype))
+        mix[name] = mix.get(name, 0) + 1
+    return {
+        'queries': n,
+        'distinct': len(set(q.lower() for q in qnames)),
+        'qtypes': dict(sorted(mix.items(), key=lambda kv: -kv[1])),
+        'capture_span_s': round(span, 3),
+        'offered_qps': round(n / scaled_span, 2) if scaled_span > 0 else None,
+        'achieved_qps': round(n / send_span, 2) if send_span > 0 else 0.0,
+        'answered': len(answered),
+        'noerror': sum(1 for r in result['rcode'] if r == 0),
+        'timeouts': n - len(answered),
+        'elapsed_s': round(elapsed, 3),
+        'lag_p50_ms': round(percentile(lag, 50), 3),
+        'lag_p99_ms': round(percentile(lag, 99), 3),
+        'p50_ms': round(percentile(answered, 50), 3),
+        'p90_ms': round(percentile(answered, 90), 3),
+        'p99_ms': round(percentile(answered, 99), 3),
+        'max_ms': round(answered[-1], 3) if answered else 0.0,
+    }
+
+
+def _speed_label(speed):
+    return 'as fast as possible' if speed <= 0 else f'{speed:g}x'
+
+
+def replay_pcaps(net, pcaps=DEFAULT_PCAPS, speed=1.0, server=RESOLVER_IP, timeout=QUERY_TIMEOUT):
+    """
+    Replay every capture matching `pcaps` from its host (PCAP_<n>_H<n>.pcap ->
+    h<n>), all hosts at once. speed: 1 = original timing, N = N times faster,
+    0 = as fast as possible. `pcaps` may also be a synthetic workload directory
+    (cn_a2 workload); its host index i is sent from h<i+1>.
+    """
+    from .run_registry import new_run_id, record_run, topology_config
+    from .work_queue import HOSTS, host_for_file
+
+    print("\n" + "="*80)
+    print(f"PCAP REPLAY against {server} ({_speed_label(speed)})")
+    print("="*80)
+
+    cwd = os.getcwd()
+    paths = sorted(glob.glob(os.path.join(cwd, pcaps)))
+    if not paths:
+        print(f"[FAIL] No captures match {pcaps}")
+        return
+    run_id = new_run_id('replay', f'{cwd}/results/runs')
+
+    jobs = {}
+    if len(paths) == 1 and os.path.isdir(paths[0]):
+        # Synthetic workload (workload.py): one schedule per host index
+        from .workload import load_workload, write_host_schedule
+        workload, _ = load_workload(paths[0])
+        for index, host_name in enumerate(HOSTS[:workload.hosts]):
+            schedule = f'/tmp/replay_{host_name}.sched'
+            count = write_host_schedule(paths[0], index, schedule)
+            if count:
+                jobs[host_name] = {'pcap': paths[0], 'schedule': schedule, 'output': f'/tmp/replay_{host_name}.json'}
+                print(f"[*] {host_name.upper()}: {count} queries from workload {os.path.basename(paths[0])}")
+        if workload.hosts > len(HOSTS):
+            print(f"[NOTE] Workload has {workload.hosts} hosts; queries of hosts beyond {len(HOSTS)} are not sent")
+        paths = []
+
+    for index, path in enumerate(paths):
+        host_name = host_for_file(path, HOSTS, index)
+        if host_name in jobs:
+            print(f"[NOTE] {host_name} already replays {os.path.basename(jobs[host_name]['pcap'])}; "
+                  f"skipping {os.path.basename(path)}")
+            continue
+        print(f"[*] Reading {os.path.basename(path)} for {host_name.upper()}...")
+        queries = load_queries(path)
+        if not queries:
+            print(f"    No DNS queries found")
+            continue
+        schedule = f'/tmp/replay_{host_name}.sched'
+        write_schedule(schedule, queries)
+        jobs[host_name] = {'pcap': path, 'schedule': schedule, 'output': f'/tmp/replay_{host_name}.json'}
+        print(f"    {len(queries)} queries over {queries[-1][0] - queries[0][0]:.1f}s of capture")
+
+    # Start every host's sender, then wait for all of them
+    print(f"\n[*] Replaying from {', '.join(h.upper() for h in jobs)}...")
+    for host_name, job in jobs.items():
+        if os.path.exists(job['output']):
+            os.remove(job['output'])
+        net.get(host_name).sendCmd(
+            f'cd {cwd} && {sys.executable} -m cn_a2 replay-client {job["schedule"]} {job["output"]} '
+            f'--server {server} --speed {speed} --timeout {timeout}')
+    for host_name in jobs:
+        out = net.get(host_name).waitOutput()
+        if out.strip():
+            print(f"  [{host_name}] {out.strip()}")
+
+    summaries, samples = {}, {}
+    for host_name, job in jobs.items():
+        if not os.path.exists(job['output']):
+            print(f"[FAIL] {host_name}: replay produced no results")
+            continue
+        with open(job['output'], 'r') as f:
+            result = json.load(f)
+        offsets, qtypes, qnames = read_schedule(job['schedule'])
+        summaries[host_name] = summarize(offsets, qtypes, qnames, result, speed)
+        latencies = [x for x in result['latency_ms'] if x is not None]
+        samples[host_name] = {
+            'latencies_ms': latencies,
+            'durations_s': [(x if x is not None else timeout * 1000) / 1000 for x in result['latency_ms']],
+            'successful': summaries[host_name]['noerror'],
+            'failed': summaries[host_name]['queries'] - summaries[host_name]['noerror'],
+            'elapsed_s': summaries[host_name]['elapsed_s'],
+        }
+
+    lines = [
+        f"{'Host':<6} {'Queries':>8} {'Distinct':>9} {'Offered':>9} {'Achieved':>9} {'Lag p99':>8} "
+        f"{'Timeouts':>9} {'p50':>8} {'p90':>8} {'p99':>8}",
+        f"{'':6} {'':8} {'':9} {'(q/s)':>9} {'(q/s)':>9} {'(ms)':>8} {'':9} {'(ms)':>8} {'(ms)':>8} {'(ms)':>8}",
+        "-"*92,
+    ]
+    for host_name, s in summaries.items():
+        offered = f"{s['offered_qps']:.1f}" if s['offered_qps'] is not None else 'max'
+        lines.append(f"{host_name.upper():<6} {s['queries']:>8} {s['distinct']:>9} {offered:>9} "
+                     f"{s['achieved_qps']:>9.1f} {s['lag_p99_ms']:>8.1f} {s['timeouts']:>9} "
+                     f"{s['p50_ms']:>8.1f} {s['p90_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+    print("\n" + '\n'.join(lines))
+    print("\nOffered = capture rate scaled by the speed factor; Achieved = queries / (last send - first send)")
+    print("Lag = how late queries left compared with the capture schedule")
+
+    os.makedirs(f'{cwd}/results', exist_ok=True)
+    with open(f'{cwd}/results/replay_summary.txt', 'w') as f:
+        f.write("="*92 + "\n")
+        f.write(f"PCAP REPLAY against {server} ({_speed_label(speed)}), run {run_id}\n")
+        f.write("="*92 + "\n\n")
+        f.write('\n'.join(lines) + "\n\n")
+        for host_name, s in summaries.items():
+            mix = ', '.join(f"{k} {v}" for k, v in s['qtypes'].items())
+            f.write(f"{host_name.upper()}: {os.path.basename(jobs[host_name]['pcap'])}, "
+                    f"{s['capture_span_s']}s of capture replayed in {s['elapsed_s']}s; qtypes: {mix}\n")
+    print(f"\n[OK] Summary saved to results/replay_summary.txt")
+
+    record_run('replay', {
+        'resolver_ip': server,
+        'speed': speed,
+        'timeout_s': timeout,
+        'pcaps': {h: os.path.basename(j['pcap']) for h, j in jobs.items()},
+        'topology': topology_config(net),
+    }, samples, root=f'{cwd}/results/runs', run_id=run_id)
+    print(f"[OK] Run recorded: results/runs/{run_id}/")
+    return summaries
@@ -0,0 +1,412 @@
+"""
+Resolver Benchmark Suite
+How much memory does a resolver use at N cached entries, and what QPS and
+p99 does it hold? Runs each backend on loopback (or any address of the
+namespace it is started in, e.g. `mininet> dns python3 -m cn_a2 resolver-bench`)
+in front of a local upstream stand-in, and sweeps:
+
+  cache size   entries the backend holds; the cache is warmed with that many
+               distinct names first, and re-warmed before every pass (1k - 1M)
+  hit ratio    share of measured queries for warmed names; the rest are names
+               never asked before, answered with TTL 0 so they go upstream
+               and never displace the warm set
+  load         offered queries/s, open loop (0 = as fast as possible)
+
+Backends:
+  dnsmasq   configured like Part C (no-resolv, no-hosts, log-queries,
+            cache-size=N) with the stand-in as its only server
+  cn_a2     `cn_a2 resolver` (resolver_pool.py), per --workers; its cache is
+            direct-mapped, so it gets SLOTS_PER_ENTRY x N slots and is warmed
+            with N names that map to distinct slots, i.e. N entries that fit
+
+Per configuration: RSS and PSS of the backend's processes after the pass, CPU
+time per query (user + system, backend only), achieved QPS, p50/p90/p99/p99.9,
+timeouts, and the observed hit ratio (1 - queries the stand-in received / sent).
+
+Run: python3 -m cn_a2 resolver-bench [--backends cn_a2,dnsmasq] [--sizes 1000,10000,100000]
+                                     [--hit-ratios 0.5,0.9,0.99] [--loads 2000,5000,0]
+Report: results/resolver_bench.json (one row per configuration) and .txt
+"""
+
+import heapq
+import json
+import multiprocessing
+import os
+import random
+import select
+import shutil
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+from .dns_wire import FLAG_QR, HEADER, build_query, question_key
+from .run_registry import percentile
+
+BACKENDS = ('cn_a2', 'dnsmasq')
+ZONE = 'bench.cn-a2.test'
+STAND_IN_PORT = 5301
+BACKEND_PORT = 5302
+STAND_IN_TTL = 86400       # answers never expire during a run
+MISS_PREFIX = b'm'         # first label of never-repeated names; answered with TTL 0
+SLOTS_PER_ENTRY = 2        # cn_a2 table slots per cached entry
+WARM_INFLIGHT = 256
+DNSMASQ_CONF = '/tmp/resolver_bench_dnsmasq.conf'
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+
+
+# ============================================================================
+# Upstream stand-in
+# ============================================================================
+
+def _stand_in_answer(query):
+    """
+    NOERROR answer to any query: one A record in 198.18.0.0/15 derived from
+    the name, TTL 0 for miss names so no backend caches them
+    """
+    key = question_key(query)
+    if key is None:
+        return None
+    qid, flags = struct.unpack_from('!HH', query)
+    question = query[HEADER.size:HEADER.size + len(key)]
+    h = zlib.crc32(key)
+    ttl = 0 if key[1:2] == MISS_PREFIX else STAND_IN_TTL
+    answer = struct.pack('!HHHIH', 0xC00C, 1, 1, ttl, 4) + struct.pack('!BBH', 198, 18 + (h & 1), h >> 16)
+    return HEADER.pack(qid, FLAG_QR | (flags & 0x0100) | 0x0080, 1, 1, 0, 0) + question + answer
+
+
+def stand_in(listen, latency_ms, received):
+    """Answer every query on `listen` after latency_ms, counting them in `received`, until SIGTERM"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.bind(listen)
+    sock.setblocking(False)
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    delay = latency_ms / 1000
+    due = []                   # heap of (send time, seq, response, addr)
+    seq = 0
+    while True:
+        wait = max(0.0, due[0][0] - time.perf_counter()) if due else 0.5
+        readable, _, _ = select.select([sock], [], [], min(wait, 0.5))
+        if readable:
+            while True:
+                try:
+                    data, addr = sock.recvfrom(4096)
+                except BlockingIOError:
+                    break
+                received.value += 1
+                response = _stand_in_answer(data)
+                if response is None:
+                    continue
+                if delay:
+                    heapq.heappush(due, (time.perf_counter() + delay, seq, response, addr))
+                    seq += 1
+                else:
+                    sock.sendto(response, addr)
+        now = time.perf_counter()
+        while due and due[0][0] <= now:
+            _, _, response, addr = heapq.heappop(due)
+            sock.sendto(response, addr)
+
+
+# ============================================================================
+# Backends
+# ============================================================================
+
+def _children(pid):
+    """PIDs of pid and all its descendants"""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat', 'r') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            parents.setdefault(ppid, []).append(int(entry))
+    tree, todo = [], [pid]
+    while todo:
+        p = todo.pop()
+        tree.append(p)
+        todo.extend(parents.get(p, ()))
+    return tree
+
+
+def process_usage(pid):
+    """(CPU seconds, RSS MiB, PSS MiB) summed over pid and its descendants"""
+    cpu = rss = pss = 0.0
+    for p in _children(pid):
+        try:
+            with open(f'/proc/{p}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / CLK_TCK
+            with open(f'/proc/{p}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        rss += int(line.split()[1]) / 1024
+            if os.path.exists(f'/proc/{p}/smaps_rollup'):
+                with open(f'/proc/{p}/smaps_rollup', 'r') as f:
+                    for line in f:
+                        if line.startswith('Pss:'):
+                            pss += int(line.split()[1]) / 1024
+        except (OSError, IndexError, ValueError):
+            continue
+    return cpu, rss, pss
+
+
+def start_backend(backend, size, listen, port, upstream, workers=1):
+    """Start a backend caching `size` entries with `upstream` ('ip#port') as its only server"""
+    if backend == 'dnsmasq':
+        # Part C's configuration, on loopback ports instead of dns-eth0:53
+        with open(DNSMASQ_CONF, 'w') as f:
+            f.write(f"listen-address={listen}\nport={port}\nbind-interfaces\nserver={upstream}\nno-resolv\n"
+                    f"log-queries\nlog-facility=/tmp/resolver_bench_dnsmasq.log\ncache-size={size}\nno-hosts\n")
+        cmd = ['dnsmasq', '-k', '-C', DNSMASQ_CONF]
+    else:
+        cmd = [sys.executable, '-m', 'cn_a2', 'resolver', '--workers', str(workers), '--listen', listen,
+               '--port', str(port), '--upstream', upstream, '--cache', 'shared',
+               '--cache-slots', str(cache_slots(backend, size))]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    if proc.poll() is not None:
+        raise RuntimeError(f"{' '.join(cmd)} exited with {proc.returncode}")
+    return proc
+
+
+def stop_backend(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# ============================================================================
+# Sweep
+# ============================================================================
+
+def _load_label(offered):
+    return f'{offered:g}' if offered else 'max'
+
+
+def cache_slots(backend, size):
+    """Table slots a backend is given to hold `size` entries"""
+    return size * SLOTS_PER_ENTRY if backend == 'cn_a2' else size
+
+
+def warm_names(backend, size):
+    """
+    The `size` names a backend is warmed with: w0, w1, ... For cn_a2 only
+    names whose question lands in a slot no earlier name took, so all of
+    them stay cached in its direct-mapped table
+    """
+    if backend != 'cn_a2':
+        return [f'w{i}.{ZONE}' for i in range(size)]
+    from .resolver_pool import cache_index
+    slots = cache_slots(backend, size)
+    taken = bytearray(slots)
+    names = []
+    i = 0
+    while len(names) < size:
+        name = f'w{i}.{ZONE}'
+        slot = cache_index(question_key(build_query(0, name)), slots)
+        if not taken[slot]:
+            taken[slot] = 1
+            names.append(name)
+        i += 1
+    return names
+
+
+def _measure(listen, port, names, offered, timeout):
+    """Send `names` open loop at `offered` q/s (0 = as fast as possible); replay() results"""
+    from .replay import replay
+    offsets = [i / offered for i in range(len(names))] if offered else [0.0] * len(names)
+    return replay(offsets, [1] * len(names), names, listen, port, speed=1.0 if offered else 0.0, timeout=timeout)
+
+
+def bench_config(proc, received, warmed, hit_ratio, offered, queries, listen, port, timeout, rng, fresh):
+    """One measured pass against a warm backend; returns the report row (without backend fields)"""
+    miss = MISS_PREFIX.decode()
+    names = [rng.choice(warmed) if rng.random() < hit_ratio else f'{miss}{next(fresh)}.{ZONE}'
+             for _ in range(queries)]
+    cpu0, _, _ = process_usage(proc.pid)
+    upstream0 = received.value
+    latency, rcodes, lag, send_span, elapsed = _measure(listen, port, names, offered, timeout)
+    time.sleep(0.2)            # late answers still count towards backend CPU
+    cpu1, rss, pss = process_usage(proc.pid)
+    answered = sorted(x for x in latency if x is not None)
+    forwarded = received.value - upstream0
+    return {
+        'cache_size': len(warmed),
+        'hit_ratio': hit_ratio,
+        'offered_qps': offered,
+        'queries': queries,
+        'answered': len(answered),
+        'timeouts': queries - len(answered),
+        'qps': round(len(answered) / elapsed, 1) if elapsed else 0.0,
+        'elapsed_s': round(elapsed, 3),
+        'p50_ms': round(percentile(answered, 50), 3),
+        'p90_ms': round(percentile(answered, 90), 3),
+        'p99_ms': round(percentile(answered, 99), 3),
+        'p999_ms': round(percentile(answered, 99.9), 3),
+        'lag_p99_ms': round(percentile(sorted(lag), 99), 3),
+        'observed_hit_pct': round(max(queries - forwarded, 0) * 100 / queries, 1) if queries else 0.0,
+        'cpu_us_per_query': round((cpu1 - cpu0) * 1e6 / queries, 1) if queries else 0.0,
+        'rss_mb': round(rss, 1),
+        'pss_mb': round(pss, 1),
+        'latencies_ms': answered,
+        'durations_s': [(x if x is not None else timeout * 1000) / 1000 for x in latency],
+        'successful': sum(1 for r in rcodes if r == 0),
+    }
+
+
+def warm(listen, port, warmed, timeout, chunk=100000):
+    """Ask every warm name once so the backend caches all of them; returns answered"""
+    from .replay import replay
+    answered = 0
+    for start in range(0, len(warmed), chunk):
+        names = warmed[start:start + chunk]
+        latency, _, _, _, _ = replay([0.0] * len(names), [1] * len(names), names, listen, port,
+                                     speed=0.0, timeout=timeout, max_inflight=WARM_INFLIGHT)
+        answered += sum(1 for x in latency if x is not None)
+    return answered
+
+
+def run_suite(backends, sizes, hit_ratios, loads, workers=(1,), queries=20000, upstream_ms=1.0,
+              listen='127.0.0.1', timeout=1.0, seed=0, out='results/resolver_bench'):
+    """Sweep every backend x workers x cache size x hit ratio x load; writes out.json and out.txt"""
+    from .run_registry import record_run
+
+    variants = []
+    for backend in backends:
+        if backend == 'dnsmasq' and not shutil.which('dnsmasq'):
+            print("[NOTE] dnsmasq is not installed; skipping it (apt-get install dnsmasq)")
+            continue
+        for n in (workers if backend == 'cn_a2' else (1,)):
+            variants.append((backend, n))
+
+    if not variants:
+        print("[FAIL] No backend to benchmark")
+        return []
+
+    cwd = os.getcwd()
+    ctx = multiprocessing.get_context('fork')
+    received = ctx.Value('q', 0, lock=False)
+    upstream = ctx.Process(target=stand_in, name='stand-in', args=((listen, STAND_IN_PORT), upstream_ms, received),
+                           daemon=True)
+    upstream.start()
+    time.sleep(0.3)
+
+    print("="*100)
+    print(f"RESOLVER BENCHMARK: {', '.join(f'{b} x{n}' if b == 'cn_a2' else b for b, n in variants)} "
+          f"on {listen}:{BACKEND_PORT}, stand-in upstream {upstream_ms:g} ms, {os.cpu_count()} CPUs")
+    print("="*100)
+
+    rng = random.Random(seed)
+    fresh = iter(range(1 << 62))
+    rows = []
+    try:
+        for backend, n in variants:
+            label = f'{backend} x{n}' if backend == 'cn_a2' else backend
+            for size in sizes:
+                proc = start_backend(backend, size, listen, BACKEND_PORT, f'{listen}#{STAND_IN_PORT}', n)
+                try:
+                    start = time.perf_counter()
+                    warmed = warm_names(backend, size)
+                    answered = warm(listen, BACKEND_PORT, warmed, timeout)
+                    _, idle_rss, _ = process_usage(proc.pid)
+                    print(f"\n[*] {label}, cache {size} ({cache_slots(backend, size)} slots): warmed "
+                          f"{answered}/{size} names in {time.perf_counter() - start:.1f}s, RSS {idle_rss:.1f} MiB")
+                    for hit_ratio in hit_ratios:
+                        for offered in loads:
+                            # Re-ask the warm set so every pass starts with all of it cached
+                            before = received.value
+                            warm(listen, BACKEND_PORT, warmed, timeout)
+                            refetched = received.value - before
+                            row = bench_config(proc, received, warmed, hit_ratio, offered, queries,
+                                               listen, BACKEND_PORT, timeout, rng, fresh)
+                            row['cache_slots'] = cache_slots(backend, size)
+                            row['rewarm_fetches'] = refetched
+                            samples = {'client': {'latencies_ms': row.pop('latencies_ms'),
+                                                  'durations_s': row.pop('durations_s'),
+                                                  'successful': row['successful'],
+                                                  'failed': queries - row.pop('successful'),
+                                                  'elapsed_s': row['elapsed_s']}}
+                            row = {'backend': backend, 'workers': n, **row}
+                            row['run_id'] = record_run('resolver_bench', {
+                                'resolver_ip': listen,
+                                'resolver_backend': label,
+                                'mode': f'{label} cache={size} hit={hit_ratio:g} load={_load_label(offered)}',
+                                'workers': n,
+                                'cache_size': size,
+                                'cache_slots': cache_slots(backend, size),
+                                'hit_ratio': hit_ratio,
+                                'offered_qps': offered,
+                                'queries': queries,
+                                'upstream_ms': upstream_ms,
+                                'timeout_s': timeout,
+                            }, samples, root=f'{cwd}/results/runs')
+                            rows.append(row)
+                            print(f"    hit {hit_ratio:>5.0%} load {_load_label(offered):>6}: {row['qps']:>9.1f} q/s, "
+                                  f"p99 {row['p99_ms']:.2f} ms, {row['cpu_us_per_query']:.0f} us CPU/query, "
+                                  f"observed hit {row['observed_hit_pct']:.1f}%, RSS {row['rss_mb']:.1f} MiB")
+                finally:
+                    stop_backend(proc)
+    finally:
+        upstream.terminate()
+        upstream.join()
+
+    lines = [
+        f"{'Backend':<10} {'Cache':>8} {'Slots':>8} {'Hit':>5} {'Offered':>8} {'QPS':>9} {'p50':>7} {'p99':>7} {'p99.9':>7} "
+        f"{'T/O':>5} {'Obs hit':>7} {'CPU/q':>7} {'RSS':>8} {'PSS':>8}",
+        f"{'':10} {'':>8} {'':>8} {'':>5} {'(q/s)':>8} {'':9} {'(ms)':>7} {'(ms)':>7} {'(ms)':>7} "
+        f"{'':5} {'%':>7} {'(us)':>7} {'(MiB)':>8} {'(MiB)':>8}",
+        "-"*109,
+    ]
+    for r in rows:
+        label = f"{r['backend']} x{r['workers']}" if r['backend'] == 'cn_a2' else r['backend']
+        lines.append(f"{label:<10} {r['cache_size']:>8} {r['cache_slots']:>8} {r['hit_ratio']:>5.0%} {_load_label(r['offered_qps']):>8} "
+                     f"{r['qps']:>9.1f} {r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} {r['p999_ms']:>7.2f} "
+                     f"{r['timeouts']:>5} {r['observed_hit_pct']:>7.1f} {r['cpu_us_per_query']:>7.1f} "
+                     f"{r['rss_mb']:>8.1f} {r['pss_mb']:>8.1f}")
+    print("\n" + '\n'.join(lines))
+    print("\nCache = entries warmed and kept cached; Slots = table size the backend was given for them; "
+          "CPU/q = backend user + system CPU per measured query; RSS counts memory shared between "
+          "workers once per process, PSS splits it between them")
+
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(f'{out}.txt', 'w') as f:
+        f.write("="*100 + "\n")
+        f.write(f"RESOLVER BENCHMARK ({queries} queries per configuration, stand-in upstream {upstream_ms:g} ms, "
+                f"{os.cpu_count()} CPUs)\n")
+        f.write("="*100 + "\n\n")
+        f.write('\n'.join(lines) + "\n")
+    with open(f'{out}.json', 'w') as f:
+        json.dump({'cpus': os.cpu_count(), 'listen': listen, 'queries': queries, 'upstream_ms': upstream_ms,
+                   'timeout_s': timeout, 'seed': seed, 'rows': rows}, f, indent=2)
+    print(f"\n[OK] Report saved to {out}.json (and {out}.txt)")
+    return rows
+
+
+def run(args):
+    """`cn_a2 resolver-bench` entry point"""
+    def numbers(value, convert):
+        return [convert(v) for v in value.split(',') if v.strip()]
+
+    backends = numbers(args.backends, str.strip)
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        print(f"[FAIL] Unknown backends: {', '.join(unknown)} (choose from {', '.join(BACKENDS)})")
+        return 2
+    sizes = numbers(args.sizes, int)
+    if any(s < 1 for s in sizes):
+        print("[FAIL] Cache sizes must be at least 1")
+        return 2
+    rows = run_suite(backends, sizes, numbers(args.hit_ratios, float), numbers(args.loads, float),
+                     numbers(args.workers, int), args.queries, args.upstream_ms, args.listen, args.timeout,
+                     args.seed, args.output)
+    return 0 if rows else 1
@@ -0,0 +1,530 @@
+"""
+Multi-Worker Resolver (SO_REUSEPORT)
+A caching forwarder for the dns host that runs N worker processes, each with
+its own UDP socket bound to 10.0.0.5:53 with SO_REUSEPORT, so the kernel
+spreads client flows (by 4-tuple hash) over per-worker socket queues instead
+of funnelling everything through dnsmasq's single process and core.
+
+Cache modes:
+  shared       one table in shared memory used by every worker (default)
+  partitioned  a private table per worker (same total size); a name cached by
+               one worker is a miss for the others
+  none         forward every query
+
+Shared cache consistency: a direct-mapped table of fixed-size slots keyed by
+the lower-cased question. Writers take one of a few stripe locks; readers
+take no lock and use a per-slot sequence number (odd while a write is in
+progress, re-checked after copying), so a reader sees either a complete
+entry or a miss, never a torn one. Entries are last-writer-wins: two workers
+missing on the same name both forward it and the later answer replaces the
+earlier; a colliding name evicts the slot. Entries expire at the smallest
+TTL in the answer and TTLs are aged when served. Within a worker, misses on
+a name that is already being forwarded wait for that one upstream answer.
+
+Run (on the dns host, with dnsmasq stopped):
+  python3 -m cn_a2 resolver --workers 4 [--cache shared|partitioned|none]
+Measure scaling with worker count: sudo python3 -m cn_a2 bench --parts c,w --workers 1,2,4
+"""
+
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import select
+import signal
+import socket
+import struct
+import sys
+import time
+import zlib
+from contextlib import nullcontext
+
+from .dns_wire import parse_header, question_key, rcode, ttl_offsets
+from .run_registry import percentile
+
+RESOLVER_IP = '10.0.0.5'
+UPSTREAMS = ('8.8.8.8', '8.8.4.4')     # same upstreams as Part C's dnsmasq
+CACHE_SLOTS = 4096
+CACHE_MODES = ('shared', 'partitioned', 'none')
+UPSTREAM_TIMEOUT = 5.0     # seconds before a forwarded query is given up
+MAX_TTL = 86400
+BATCH = 64                 # packets drained per socket per loop
+
+# Slot: seq u32 | key hash u32 | expires f64 | stored f64 | key len u16 | resp len u16 | key | response
+SLOT = struct.Struct('=IIddHH')
+SEQ = struct.Struct('=I')
+SLOT_SIZE = 1024
+KEY_MAX = 260              # 255-byte name + type + class
+RESP_MAX = SLOT_SIZE - SLOT.size - KEY_MAX
+LOCK_STRIPES = 64
+
+# Per-worker counters, one row of int64 per worker (each worker writes only its own row)
+COUNTERS = ('queries', 'hits', 'misses', 'coalesced', 'answers', 'upstream_timeouts', 'malformed', 'send_errors',
+            'mismatched')
+ROW = struct.Struct(f'={len(COUNTERS)}q')
+
+
+class ResponseCache:
+    """
+    Direct-mapped response cache in an anonymous mmap. Created before fork it
+    is shared by every worker (pass the stripe locks); created in a worker it
+    is private to it.
+    """
+
+    def __init__(self, slots=CACHE_SLOTS, locks=None):
+        self.slots = slots
+        self.buf = mmap.mmap(-1, slots * SLOT_SIZE)
+        self.locks = locks
+
+    def get(self, key, h, now):
+        """(response bytes, stored time) of a live entry, None on a miss"""
+        buf = self.buf
+        off = (h % self.slots) * SLOT_SIZE
+        seq, kh, expires, stored, klen, rlen = SLOT.unpack_from(buf, off)
+        if seq & 1 or kh != h or expires <= now or klen != len(key):
+            return None
+        base = off + SLOT.size
+        if buf[base:base + klen] != key:
+            return None
+        response = buf[base + KEY_MAX:base + KEY_MAX + rlen]
+        if SEQ.unpack_from(buf, off)[0] != seq:
+            return None   # rewritten while we copied it
+        return response, stored
+
+    def put(self, key, h, response, ttl, now):
+        if ttl <= 0 or len(key) > KEY_MAX or len(response) > RESP_MAX:
+            return False
+        buf = self.buf
+        off = (h % self.slots) * SLOT_SIZE
+        base = off + SLOT.size
+        lock = self.locks[h % len(self.locks)] if self.locks else nullcontext()
+        with lock:
+            seq = SEQ.unpack_from(buf, off)[0]
+            SEQ.pack_into(buf, off, (seq + 1) & 0xFFFFFFFF)
+            buf[base:base + len(key)] = key
+            buf[base + KEY_MAX:base + KEY_MAX + len(response)] = response
+            SLOT.pack_into(buf, off, (seq + 1) & 0xFFFFFFFF, h, now + ttl, now, len(key), len(response))
+            SEQ.pack_into(buf, off, (seq + 2) & 0xFFFFFFFF)
+        return True
+
+
+def cache_index(key, slots):
+    """Slot a question key maps to in a ResponseCache of `slots` slots"""
+    return zlib.crc32(key) % slots
+
+
+def upstream_addr(spec):
+    """'8.8.8.8' or dnsmasq's server= form '127.0.0.1#5301' -> (ip, port)"""
+    ip, _, port = spec.partition('#')
+    return ip, int(port) if port else 53
+
+
+def _aged(response, query_id, stored, now):
+    """Cached response re-addressed to query_id with its TTLs reduced by its age"""
+    out = bytearray(response)
+    out[0:2] = query_id
+    age = int(now - stored)
+    if age > 0:
+        for off in ttl_offsets(out) or ():
+            ttl = struct.unpack_from('!I', out, off)[0]
+            struct.pack_into('!I', out, off, max(ttl - age, 0))
+    return out
+
+
+def worker(index, listen, port, upstreams, cache, counters, cache_slots=0):
+    """Serve queries on one SO_REUSEPORT socket until killed"""
+    if cache is None and cache_slots:
+        cache = ResponseCache(cache_slots)    # partitioned: private to this worker
+    stats = [0] * len(COUNTERS)
+    queries, hits, misses, coalesced, answers, upstream_timeouts, malformed, send_errors, mismatched = range(len(COUNTERS))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.bind((listen, port))
+    sock.setblocking(False)
+    up = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    up.setblocking(False)
+    upstream_addrs = [upstream_addr(u) for u in upstreams]
+    upstream_set = set(upstream_addrs)
+
+    pending = {}               # upstream query ID -> ([(client addr, client ID)], key, hash, sent)
+    inflight = {}              # key -> upstream query ID, so concurrent misses share one upstream query
+    next_upstream = 0
+    last_flush = time.monotonic()
+
+    while True:
+        readable, _, _ = select.select([sock, up], [], [], 0.5)
+        now = time.time()
+
+        if sock in readable:
+            for _ in range(BATCH):
+                try:
+                    data, addr = sock.recvfrom(4096)
+                except BlockingIOError:
+                    break
+                stats[queries] += 1
+                key = question_key(data)
+                if key is None:
+                    stats[malformed] += 1
+                    continue
+                h = zlib.crc32(key)
+                hit = cache.get(key, h, now) if cache is not None else None
+                if hit is not None:
+                    stats[hits] += 1
+                    try:
+                        sock.sendto(_aged(hit[0], data[0:2], hit[1], now), addr)
+                    except OSError:
+                        stats[send_errors] += 1
+                    continue
+                stats[misses] += 1
+                qid = inflight.get(key)
+                if qid is not None:
+                    pending[qid][0].append((addr, data[0:2]))   # already forwarded: wait for that answer
+                    stats[coalesced] += 1
+                    continue
+                qid = random.randrange(65536)     # unpredictable IDs, so an off-path answer has to guess
+                while qid in pending:
+                    qid = random.randrange(65536)
+                pending[qid] = ([(addr, data[0:2])], key, h, time.monotonic())
+                inflight[key] = qid
+                try:
+                    up.sendto(struct.pack('!H', qid) + data[2:], upstream_addrs[next_upstream])
+                except OSError:
+                    del inflight[key], pending[qid]   # the client retries; don't leave it coalescing on nothing
+                    stats[send_errors] += 1
+                next_upstream = (next_upstream + 1) % len(upstream_addrs)
+
+        if up in readable:
+            for _ in range(BATCH):
+                try:
+                    data, addr = up.recvfrom(4096)
+                except BlockingIOError:
+                    break
+                header = parse_header(data)
+                if header is None or addr not in upstream_set:
+                    continue
+                entry = pending.get(header[0])
+                if entry is None:
+                    continue
+                waiters, key, h, _ = entry
+                if question_key(data) != key:
+                    stats[mismatched] += 1   # late or spoofed: keep waiting for the real answer
+                    continue
+                del pending[header[0]], inflight[key]
+                response = bytearray(data)
+                for client, client_id in waiters:
+                    response[0:2] = client_id
+                    try:
+                        sock.sendto(response, client)
+                    except OSError:
+                        stats[send_errors] += 1
+                stats[answers] += 1
+                if cache is not None and rcode(header[1]) in (0, 3):
+                    offsets = ttl_offsets(data)
+                    if offsets:
+                        ttl = min(min(struct.unpack_from('!I', data, o)[0] for o in offsets), MAX_TTL)
+                        cache.put(key, h, data, ttl, now)
+
+        # Twice a second: drop forwarded queries nobody answered and publish the counters
+        mono = time.monotonic()
+        if mono - last_flush > 0.5:
+            last_flush = mono
+            for qid in [q for q, e in pending.items() if mono - e[3] > UPSTREAM_TIMEOUT]:
+                del inflight[pending.pop(qid)[1]]
+                stats[upstream_timeouts] += 1
+            ROW.pack_into(counters, index * ROW.size, *stats)
+
+
+def read_counters(counters, workers):
+    return [dict(zip(COUNTERS, ROW.unpack_from(counters, i * ROW.size))) for i in range(workers)]
+
+
+def serve(workers=1, listen=RESOLVER_IP, port=53, upstreams=UPSTREAMS, cache_mode='shared',
+          cache_slots=CACHE_SLOTS, stats_file=None):
+    """
+    Start `workers` processes and wait for SIGTERM/SIGINT. SIGUSR1 (and exit)
+    writes the per-worker counters to stats_file as JSON.
+    """
+    ctx = multiprocessing.get_context('fork')
+    counters = mmap.mmap(-1, workers * ROW.size)
+    shared = None
+    if cache_mode == 'shared':
+        shared = ResponseCache(cache_slots, [ctx.Lock() for _ in range(LOCK_STRIPES)])
+    private_slots = max(cache_slots // workers, 1) if cache_mode == 'partitioned' else 0
+
+    procs = [ctx.Process(target=worker, name=f'resolver-{i}',
+                         args=(i, listen, port, list(upstreams), shared, counters, private_slots))
+             for i in range(workers)]
+    for p in procs:
+        p.start()
+
+    def write_stats(*_):
+        if stats_file:
+            tmp = stats_file + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump({'workers': workers, 'cache': cache_mode, 'cache_slots': cache_slots,
+                           'time': time.time(), 'per_worker': read_counters(counters, workers)}, f)
+            os.replace(tmp, stats_file)
+
+    stopping = []
+    signal.signal(signal.SIGUSR1, write_stats)
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+    print(f"[OK] {workers} resolver worker(s) on {listen}:{port} (cache: {cache_mode}, "
+          f"upstreams: {', '.join(upstreams)})", flush=True)
+
+    while not stopping:
+        for p in procs:
+            if not p.is_alive() and p.exitcode is not None:
+                print(f"[FAIL] {p.name} exited with {p.exitcode}", flush=True)
+                stopping.append(True)
+        time.sleep(0.2)
+
+    time.sleep(0.6)            # let workers flush their counters
+    for p in procs:
+        p.terminate()
+    for p in procs:
+        p.join()
+    write_stats()
+    totals = {c: sum(w[c] for w in read_counters(counters, workers)) for c in COUNTERS}
+    print(f"[OK] Stopped: {totals['queries']} queries, {totals['hits']} cache hits", flush=True)
+
+
+def run(args):
+    """`cn_a2 resolver` entry point"""
+    if args.workers < 1:
+        print("[FAIL] --workers must be at least 1")
+        return 2
+    serve(args.workers, args.listen, args.port, [u.strip() for u in args.upstream.split(',') if u.strip()],
+          args.cache, args.cache_slots, args.stats)
+
+
+# ============================================================================
+# Scaling benchmark (Mininet)
+# ============================================================================
+
+def _counter_diff(after, before):
+    return [{c: a[c] - (b[c] if b else 0) for c in COUNTERS}
+            for a, b in zip(after, before or [None] * len(after))]
+
+
+def pause_dnsmasq(host):
+    """Stop dnsmasq on a Mininet host so a pool can bind port 53; returns whether it was running"""
+    had = bool(host.cmd('pgrep dnsmasq').strip())
+    host.cmd('killall dnsmasq 2>/dev/null')
+    time.sleep(1)
+    return had
+
+
+def restore_dnsmasq(host, had):
+    """Restart dnsmasq on host if pause_dnsmasq() found it running"""
+    if had:
+        host.cmd('dnsmasq -C /tmp/dnsmasq.conf')
+        print("\n[OK] dnsmasq restarted")
+
+
+def start_pool(host, listen, stats_file, log, workers=1, cache_mode=None, cache_slots=None, cwd=None):
+    """Start `cn_a2 resolver` in the background on a Mininet host; returns its pid"""
+    if os.path.exists(stats_file):
+        os.remove(stats_file)
+    opts = f' --cache {cache_mode}' if cache_mode else ''
+    opts += f' --cache-slots {cache_slots}' if cache_slots else ''
+    return host.cmd(
+        f'cd {cwd or os.getcwd()}; {sys.executable} -m cn_a2 resolver --workers {workers} --listen {listen}'
+        f'{opts} --stats {stats_file} > {log} 2>&1 & echo $!').strip()
+
+
+def stop_pool(host, pid):
+    host.cmd(f'kill {pid} 2>/dev/null')
+
+
+def run_replay_clients(net, senders, timeout, cwd=None):
+    """
+    Run replay clients as fast as possible and wait for all of them. senders
+    maps host name -> [(schedule, output, server)]; a host's clients run at
+    once, each on its own socket, and all hosts in parallel.
+    """
+    cwd = cwd or os.getcwd()
+    for host_name, jobs in senders.items():
+        for _, output, _ in jobs:
+            if os.path.exists(output):
+                os.remove(output)
+        clients = ' '.join(
+            f'{sys.executable} -m cn_a2 replay-client {schedule} {output} --server {server} '
+            f'--speed afap --timeout {timeout} &' for schedule, output, server in jobs)
+        net.get(host_name).sendCmd(f'cd {cwd} && {clients} wait')
+    for host_name in senders:
+        net.get(host_name).waitOutput()
+
+
+def collect_replay_results(senders, timeout):
+    """
+    Read the outputs of run_replay_clients(): (per-host samples for
+    record_run, sorted latencies in ms, queries, timeouts, elapsed seconds
+    of the slowest client)
+    """
+    from .replay import read_schedule, summarize as replay_summary
+
+    parsed = {}
+    samples, latencies, queries, timeouts, elapsed = {}, [], 0, 0, 0.0
+    for host_name, jobs in senders.items():
+        host_lat, host_dur, ok, host_elapsed = [], [], 0, 0.0
+        for schedule, output, server in jobs:
+            if not os.path.exists(output):
+                print(f"[FAIL] {host_name} -> {server}: replay client produced no results")
+                continue
+            with open(output, 'r') as f:
+                result = json.load(f)
+            if schedule not in parsed:
+                parsed[schedule] = read_schedule(schedule)
+            s = replay_summary(*parsed[schedule], result, 0)
+            queries += s['queries']
+            timeouts += s['timeouts']
+            ok += s['noerror']
+            host_elapsed = max(host_elapsed, s['elapsed_s'])
+            host_lat += [x for x in result['latency_ms'] if x is not None]
+            host_dur += [(x if x is not None else timeout * 1000) / 1000 for x in result['latency_ms']]
+        latencies += host_lat
+        elapsed = max(elapsed, host_elapsed)
+        samples[host_name] = {'latencies_ms': host_lat, 'durations_s': host_dur,
+                              'successful': ok, 'failed': len(host_dur) - ok, 'elapsed_s': host_elapsed}
+    latencies.sort()
+    return samples, latencies, queries, timeouts, elapsed
+
+
+def resolver_scaling(net, domains=None, workers=(1, 2, 4), cache_mode='shared', clients=4,
+                     repeat=5, timeout=2.0, server=RESOLVER_IP):
+    """
+    For each worker count: start the pool on the dns host (dnsmasq is paused),
+    warm its cache with one pass over every host's names, then load it from
+    `clients` open-loop senders per host at once (each a separate socket, so
+    SO_REUSEPORT has flows to spread), every sender cycling the host's names
+    `repeat` times as fast as possible. Reports QPS, p50/p99, timeouts, cache
+    hit ratio and how evenly the kernel spread queries over workers.
+    """
+    from .run_registry import record_run, topology_config
+    from .work_queue import DEFAULT_DOMAINS, HOSTS, assign_domains, load_domain_files
+
+    print("\n" + "="*80)
+    print(f"RESOLVER SCALING: SO_REUSEPORT workers {', '.join(map(str, workers))} (cache: {cache_mode})")
+    print("="*80)
+
+    cwd = os.getcwd()
+    files = load_domain_files(domains or DEFAULT_DOMAINS, cwd)
+    if not files:
+        print(f"[FAIL] No domain files match {domains or DEFAULT_DOMAINS}")
+        return
+    assignment, _ = assign_domains(files, HOSTS, dedup=False)
+    schedules = {}
+    for host_name, names in assignment.items():
+        if not names:
+            continue
+        schedules[host_name] = {}
+        for label, copies in (('warm', 1), ('load', repeat)):
+            path = schedules[host_name][label] = f'/tmp/scaling_{host_name}_{label}.sched'
+            with open(path, 'w') as f:
+                for _ in range(copies):
+                    for name in names:
+                        f.write(f"0.000000 1 {name}\n")
+
+    dns_host = net.get('dns')
+    had_dnsmasq = pause_dnsmasq(dns_host)
+    print(f"[*] dnsmasq paused; {os.cpu_count()} CPUs; {len(schedules)} hosts x {clients} senders")
+
+    stats_file = '/tmp/resolver_pool_stats.json'
+    warm = {h: [(sched['warm'], f'/tmp/scaling_{h}_warm.json', server)] for h, sched in schedules.items()}
+    load = {h: [(sched['load'], f'/tmp/scaling_{h}_{k}.json', server) for k in range(clients)]
+            for h, sched in schedules.items()}
+    rows = []
+    pid = None
+    try:
+        for n in workers:
+            print(f"\n[*] {n} worker(s)")
+            pid = start_pool(dns_host, server, stats_file, '/tmp/resolver_pool.log', workers=n,
+                             cache_mode=cache_mode, cwd=cwd)
+            time.sleep(1.5)
+
+            # Warm-up pass, then snapshot the counters so the load pass is measured on its own
+            run_replay_clients(net, warm, timeout, cwd)
+            time.sleep(0.6)          # workers publish counters every 0.5 s: let the warm pass land first
+            dns_host.cmd(f'kill -USR1 {pid}')
+            time.sleep(0.5)
+            before = None
+            if os.path.exists(stats_file):
+                with open(stats_file, 'r') as f:
+                    before = json.load(f)['per_worker']
+
+            run_replay_clients(net, load, timeout, cwd)
+
+            stop_pool(dns_host, pid)
+            pid = None
+            time.sleep(1.5)
+            per_worker = []
+            if os.path.exists(stats_file):
+                with open(stats_file, 'r') as f:
+                    per_worker = _counter_diff(json.load(f)['per_worker'], before)
+
+            samples, latencies, queries, timeouts, elapsed = collect_replay_results(load, timeout)
+            served = [w['queries'] for w in per_worker]
+            total_served = sum(served)
+            rows.append({
+                'workers': n,
+                'queries': queries,
+                'qps': round(queries / elapsed, 1) if elapsed else 0.0,
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'timeouts': timeouts,
+                'hit_pct': round(sum(w['hits'] for w in per_worker) * 100 / total_served, 1) if total_served else 0.0,
+                'busiest_pct': round(max(served) * 100 / total_served, 1) if total_served else 0.0,
+                'idlest_pct': round(min(served) * 100 / total_served, 1) if total_served else 0.0,
+                'per_worker': per_worker,
+            })
+            rows[-1]['run_id'] = record_run('resolver_pool', {
+                'resolver_ip': server,
+                'resolver_backend': 'cn_a2 resolver (SO_REUSEPORT workers)',
+                'mode': f'workers={n}',
+                'workers': n,
+                'cache': cache_mode,
+                'senders_per_host': clients,
+                'repeat': repeat,
+                'timeout_s': timeout,
+                'domains': domains or DEFAULT_DOMAINS,
+                'topology': topology_config(net),
+            }, samples, root=f'{cwd}/results/runs')
+            print(f"    {queries} queries in {elapsed:.2f}s: {rows[-1]['qps']:.1f} q/s, "
+                  f"p99 {rows[-1]['p99_ms']:.1f} ms, {timeouts} timeouts")
+    finally:
+        if pid:
+            stop_pool(dns_host, pid)
+        restore_dnsmasq(dns_host, had_dnsmasq)
+
+    base = rows[0]['qps'] / rows[0]['workers'] if rows and rows[0]['qps'] else 0.0
+    lines = [
+        f"{'Workers':>7} {'Queries':>8} {'QPS':>9} {'Speedup':>8} {'Effic.':>7} {'p50':>8} {'p99':>8} "
+        f"{'Timeouts':>9} {'Hit %':>6} {'Worker share':>14}",
+        f"{'':7} {'':8} {'':9} {'':8} {'':7} {'(ms)':>8} {'(ms)':>8} {'':9} {'':6} {'min-max %':>14}",
+        "-"*96,
+    ]
+    for r in rows:
+        speedup = r['qps'] / rows[0]['qps'] if rows[0]['qps'] else 0.0
+        efficiency = r['qps'] / (base * r['workers']) if base else 0.0
+        lines.append(f"{r['workers']:>7} {r['queries']:>8} {r['qps']:>9.1f} {speedup:>7.2f}x {efficiency:>7.0%} "
+                     f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['timeouts']:>9} {r['hit_pct']:>6.1f} "
+                     f"{r['idlest_pct']:>6.1f}-{r['busiest_pct']:<6.1f}")
+    print("\n" + '\n'.join(lines))
+    print("\nEffic. = QPS / (workers x single-worker QPS); Worker share = least and most loaded "
+          "worker's share of queries (SO_REUSEPORT hashes each sender socket to one worker)")
+
+    os.makedirs(f'{cwd}/results', exist_ok=True)
+    with open(f'{cwd}/results/resolver_scaling.txt', 'w') as f:
+        f.write("="*96 + "\n")
+        f.write(f"RESOLVER SCALING against {server} (cache: {cache_mode}, {clients} senders/host, "
+                f"{os.cpu_count()} CPUs); runs: " + ', '.join(r['run_id'] for r in rows) + "\n")
+        f.write("="*96 + "\n\n")
+        f.write('\n'.join(lines) + "\n")
+    with open(f'{cwd}/results/resolver_scaling.json', 'w') as f:
+        json.dump({'cache': cache_mode, 'senders_per_host': clients, 'cpus': os.cpu_count(), 'rows': rows}, f, indent=2)
+    print(f"\n[OK] Summary saved to results/resolver_scaling.txt (per-worker counters in resolver_scaling.json)")
+    return rows
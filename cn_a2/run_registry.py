@@ -0,0 +1,284 @@
+"""
+Benchmark Run Registry
+Every harness run is stored under results/runs/<run_id>/ with its config,
+summary metrics and per-query samples, so runs can be compared over time
+with bootstrap confidence intervals instead of overwriting results/
+
+Run outside Mininet:
+  python3 -m cn_a2 runs list
+  python3 -m cn_a2 runs show <run_id>
+  python3 -m cn_a2 runs compare <baseline_run_id> <run_id> [<run_id> ...]
+"""
+
+import json
+import os
+import random
+from datetime import datetime
+
+RUNS_DIR = 'results/runs'
+BOOTSTRAP_ROUNDS = 1000
+MAX_BOOTSTRAP_SAMPLES = 20000   # larger runs are subsampled before resampling
+
+
+# ============================================================================
+# Recording
+# ============================================================================
+
+def topology_config(net):
+    """Link parameters of a running Mininet network, keyed 'node1-node2'"""
+    links = {}
+    try:
+        for src, dst, info in net.topo.links(sort=True, withInfo=True):
+            params = {k: info[k] for k in ('bw', 'delay', 'loss', 'jitter') if k in info}
+            links[f'{src}-{dst}'] = params
+    except Exception:
+        pass
+    return links
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(latencies_ms, durations_s, successful, failed, elapsed_s=None):
+    """
+    Summary metrics for one set of samples. qps is queries over the wall-clock
+    span `elapsed_s`; without it the queries are taken to have run one after
+    another, so the span is the sum of their durations.
+    """
+    lat = sorted(latencies_ms)
+    busy = elapsed_s if elapsed_s else sum(durations_s)
+    metrics = {
+        'queries': successful + failed,
+        'successful': successful,
+        'failed': failed,
+        'mean_ms': round(sum(lat) / len(lat), 3) if lat else 0.0,
+        'p50_ms': round(percentile(lat, 50), 3),
+        'p99_ms': round(percentile(lat, 99), 3),
+        'qps': round((successful + failed) / busy, 3) if busy > 0 else 0.0,
+    }
+    if elapsed_s:
+        metrics['elapsed_s'] = round(elapsed_s, 3)
+    return metrics
+
+
+def new_run_id(harness, root=RUNS_DIR):
+    """Reserve a unique run ID (and its directory) at the start of a run"""
+    run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{harness}"
+    run_dir = os.path.join(root, run_id)
+    suffix = 1
+    while os.path.exists(run_dir):
+        suffix += 1
+        run_dir = os.path.join(root, f'{run_id}-{suffix}')
+    os.makedirs(run_dir)
+    return os.path.basename(run_dir)
+
+
+def record_run(harness, config, hosts, root=RUNS_DIR, run_id=None):
+    """
+    Store a run and return its run ID (reserving one unless `run_id` was
+    already obtained from new_run_id()).
+
+    `hosts` maps host name -> dict with 'latencies_ms' (successful query
+    latencies), 'durations_s' (wall time of every query, successful or not),
+    'successful' and 'failed', and optionally 'outcomes' (outcome category ->
+    count, e.g. {'NOERROR': 90, 'NXDOMAIN': 6, 'TIMEOUT': 4}) and 'elapsed_s'
+    (wall-clock span of the host's queries; required for a correct qps when
+    they ran concurrently). Hosts are taken to run in parallel, so the overall
+    span is the longest host span when every host has one.
+    """
+    run_id = run_id or new_run_id(harness, root)
+    run_dir = os.path.join(root, run_id)
+
+    all_lat, all_dur = [], []
+    all_outcomes = {}
+    metrics = {'hosts': {}}
+    for host, h in hosts.items():
+        metrics['hosts'][host] = summarize(h['latencies_ms'], h['durations_s'],
+                                           h['successful'], h['failed'], h.get('elapsed_s'))
+        all_lat.extend(h['latencies_ms'])
+        all_dur.extend(h['durations_s'])
+        if 'outcomes' in h:
+            metrics['hosts'][host]['outcomes'] = dict(h['outcomes'])
+            for k, v in h['outcomes'].items():
+                all_outcomes[k] = all_outcomes.get(k, 0) + v
+    spans = [h.get('elapsed_s') for h in hosts.values()]
+    elapsed = max(spans) if spans and all(spans) else None
+    metrics['overall'] = summarize(all_lat, all_dur,
+                                   sum(h['successful'] for h in hosts.values()),
+                                   sum(h['failed'] for h in hosts.values()),
+                                   elapsed)
+    if all_outcomes:
+        metrics['overall']['outcomes'] = all_outcomes
+
+    with open(os.path.join(run_dir, 'config.json'), 'w') as f:
+        json.dump({'run_id': run_id, 'harness': harness,
+                   'created': datetime.now().isoformat(), **config}, f, indent=2)
+    with open(os.path.join(run_dir, 'metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+    with open(os.path.join(run_dir, 'samples.json'), 'w') as f:
+        json.dump({'latencies_ms': all_lat, 'durations_s': all_dur, 'elapsed_s': elapsed}, f)
+    return run_id
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+def list_runs(root=RUNS_DIR, harness=None):
+    """Run IDs, oldest first, optionally only those of one harness"""
+    if not os.path.isdir(root):
+        return []
+    runs = []
+    for run_id in sorted(os.listdir(root)):
+        config_path = os.path.join(root, run_id, 'config.json')
+        if not os.path.exists(config_path):
+            continue
+        if harness:
+            with open(config_path, 'r') as f:
+                if json.load(f).get('harness') != harness:
+                    continue
+        runs.append(run_id)
+    return runs
+
+
+def load_run(run_id, root=RUNS_DIR):
+    run_dir = os.path.join(root, run_id)
+    run = {}
+    for name in ('config', 'metrics', 'samples'):
+        with open(os.path.join(run_dir, f'{name}.json'), 'r') as f:
+            run[name] = json.load(f)
+    # Runs recorded before samples.json carried the span keep it only in metrics.json
+    run['samples'].setdefault('elapsed_s', run['metrics']['overall'].get('elapsed_s'))
+    return run
+
+
+# ============================================================================
+# Comparison
+# ============================================================================
+
+def _stat(metric, latencies, durations, scale=1.0):
+    if metric == 'qps':
+        busy = sum(durations)
+        return scale * len(durations) / busy if busy > 0 else 0.0
+    return percentile(sorted(latencies), 50 if metric == 'p50_ms' else 99)
+
+
+def _qps_scale(samples):
+    """
+    Factor turning 1 / mean duration into the recorded qps: a run's queries
+    over its wall-clock span, so resampled durations move the span with them
+    """
+    busy = sum(samples['durations_s'])
+    elapsed = samples.get('elapsed_s')
+    return busy / elapsed if elapsed and busy > 0 else 1.0
+
+
+def _samples_for(metric, samples):
+    return samples['durations_s'] if metric == 'qps' else samples['latencies_ms']
+
+
+def bootstrap_diff(metric, base, cand, rounds=BOOTSTRAP_ROUNDS, alpha=0.05, seed=331):
+    """
+    Bootstrap (1 - alpha) confidence intervals for the metric in both runs
+    and for the difference cand - base. Returns (base_ci, cand_ci, diff_ci).
+    """
+    rng = random.Random(seed)
+    base_scale, cand_scale = (_qps_scale(base), _qps_scale(cand)) if metric == 'qps' else (1.0, 1.0)
+    xs = _samples_for(metric, base)
+    ys = _samples_for(metric, cand)
+    if len(xs) > MAX_BOOTSTRAP_SAMPLES:
+        xs = rng.sample(xs, MAX_BOOTSTRAP_SAMPLES)
+    if len(ys) > MAX_BOOTSTRAP_SAMPLES:
+        ys = rng.sample(ys, MAX_BOOTSTRAP_SAMPLES)
+    if not xs or not ys:
+        return None
+
+    def one(values, scale):
+        resampled = rng.choices(values, k=len(values))
+        return _stat(metric, resampled, resampled, scale)
+
+    base_stats, cand_stats, diffs = [], [], []
+    for _ in range(rounds):
+        b, c = one(xs, base_scale), one(ys, cand_scale)
+        base_stats.append(b)
+        cand_stats.append(c)
+        diffs.append(c - b)
+
+    def ci(values):
+        values.sort()
+        return (percentile(values, 100 * alpha / 2), percentile(values, 100 * (1 - alpha / 2)))
+
+    return ci(base_stats), ci(cand_stats), ci(diffs)
+
+
+METRICS = (
+    # name, label, True if higher is better
+    ('p50_ms', 'p50 latency (ms)', False),
+    ('p99_ms', 'p99 latency (ms)', False),
+    ('qps', 'throughput (q/s)', True),
+)
+
+
+def compare_runs(run_ids, root=RUNS_DIR, alpha=0.05):
+    """
+    Compare every run against the first (baseline). Returns a list of
+    (run_id, metric, base_value, cand_value, diff_ci, verdict) rows where
+    verdict is 'REGRESSION', 'IMPROVEMENT' or 'no change'.
+    """
+    base = load_run(run_ids[0], root)
+    rows = []
+    for run_id in run_ids[1:]:
+        cand = load_run(run_id, root)
+        for metric, _, higher_better in METRICS:
+            result = bootstrap_diff(metric, base['samples'], cand['samples'], alpha=alpha)
+            b = base['metrics']['overall'][metric]
+            c = cand['metrics']['overall'][metric]
+            if result is None:
+                rows.append((run_id, metric, b, c, None, 'no data'))
+                continue
+            _, _, (lo, hi) = result
+            verdict = 'no change'
+            if lo > 0 or hi < 0:
+                worse = (hi < 0) if higher_better else (lo > 0)
+                verdict = 'REGRESSION' if worse else 'IMPROVEMENT'
+            rows.append((run_id, metric, b, c, (lo, hi), verdict))
+    return rows
+
+
+def print_comparison(run_ids, root=RUNS_DIR, alpha=0.05):
+    rows = compare_runs(run_ids, root, alpha)
+    labels = {m: label for m, label, _ in METRICS}
+    print(f"\nBaseline: {run_ids[0]}")
+    print(f"{'Run':<36} {'Metric':<18} {'Baseline':>10} {'Run':>10} {'Diff CI':>22}  Verdict")
+    print("-"*110)
+    for run_id, metric, b, c, diff_ci, verdict in rows:
+        ci_text = f"[{diff_ci[0]:+.2f}, {diff_ci[1]:+.2f}]" if diff_ci else 'N/A'
+        print(f"{run_id:<36} {labels[metric]:<18} {b:>10.2f} {c:>10.2f} {ci_text:>22}  {verdict}")
+    regressions = sum(1 for r in rows if r[5] == 'REGRESSION')
+    print(f"\n{int((1 - alpha) * 100)}% bootstrap CIs on the difference (run - baseline); "
+          f"{regressions} significant regression(s)")
+    return rows
+
+
+def run(args):
+    """`cn_a2 runs` entry point"""
+    if args.command == 'list':
+        for run_id in list_runs(args.root, args.harness):
+            overall = load_run(run_id, args.root)['metrics']['overall']
+            print(f"{run_id:<36} queries={overall['queries']:<6} p50={overall['p50_ms']:.1f}ms "
+                  f"p99={overall['p99_ms']:.1f}ms qps={overall['qps']:.2f}")
+    elif args.command == 'show':
+        run = load_run(args.run_id, args.root)
+        print(json.dumps({'config': run['config'], 'metrics': run['metrics']}, indent=2))
+    elif args.command == 'compare':
+        if len(args.run_ids) < 2:
+            print("[FAIL] compare needs a baseline and at least one other run")
+            return 2
+        print_comparison(args.run_ids, args.root, args.alpha)
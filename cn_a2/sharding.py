@@ -0,0 +1,400 @@
+"""
+Sharded Resolvers (Consistent Hashing with Bounded Loads)
+With `--resolvers K` DNSLinear has K resolver hosts (dns, dns2, ... dnsK at
+10.0.0.5, 10.0.0.6, ...). Clients pick the shard for a query from its QNAME,
+so each name is cached on exactly one shard and the combined cache grows with
+K instead of every resolver holding its own copy of the popular names.
+
+Routing:
+  - every shard owns `vnodes` points on a 64-bit hash ring; a name belongs to
+    the first shard clockwise of its hash (sketches.name_hash)
+  - bounded loads: with per-name weights (query counts), no shard takes more
+    than (1 + epsilon) x the mean load; names are placed heaviest first and
+    a name whose shard is full walks on to the next shard on the ring
+  - adding or removing a shard only moves the names of that shard, plus the
+    few that the load bound pushes on (reported as the disruption)
+
+Offline:  python3 -m cn_a2 shards [--domains ...|--workload DIR] [--shards 4] [--epsilon 0.25]
+Mininet:  sudo python3 -m cn_a2 bench --resolvers 4 --parts s
+"""
+
+import bisect
+import json
+import os
+import time
+from collections import Counter
+
+from .sketches import name_hash
+
+VNODES = 64
+EPSILON = 0.25
+RESOLVER_HOSTS = 'dns'
+
+
+class HashRing:
+    """Consistent hash ring over shard names with `vnodes` points per shard"""
+
+    def __init__(self, shards, vnodes=VNODES):
+        if not shards:
+            raise ValueError("a hash ring needs at least one shard")
+        self.shards = list(shards)
+        self.vnodes = vnodes
+        points = sorted((name_hash(f'{shard}#{v}'), shard) for shard in self.shards for v in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._owners = [s for _, s in points]
+
+    def _start(self, name):
+        return bisect.bisect(self._hashes, name_hash(name)) % len(self._hashes)
+
+    def lookup(self, name):
+        """Shard owning `name` without load bounds"""
+        return self._owners[self._start(name)]
+
+    def candidates(self, name):
+        """Every shard once, in ring order starting at the owner of `name`"""
+        i = self._start(name)
+        seen = set()
+        for k in range(len(self._owners)):
+            shard = self._owners[(i + k) % len(self._owners)]
+            if shard not in seen:
+                seen.add(shard)
+                yield shard
+                if len(seen) == len(self.shards):
+                    return
+
+
+def assign(ring, weights, epsilon=EPSILON):
+    """
+    {name: shard} for the {name: weight} map. epsilon=None is plain consistent
+    hashing; otherwise each shard is capped at (1 + epsilon) x the mean load
+    (never below the heaviest name) and names go heaviest first, ties in hash order.
+    """
+    if epsilon is None:
+        return {name: ring.lookup(name) for name in weights}
+    total = sum(weights.values())
+    capacity = max((1 + epsilon) * total / len(ring.shards), max(weights.values(), default=0))
+    load = dict.fromkeys(ring.shards, 0)
+    placed = {}
+    for name in sorted(weights, key=lambda n: (-weights[n], name_hash(n))):
+        w = weights[name]
+        for shard in ring.candidates(name):
+            if load[shard] + w <= capacity:
+                break
+        else:
+            shard = min(ring.shards, key=load.get)
+        load[shard] += w
+        placed[name] = shard
+    return placed
+
+
+def modulo_assign(shards, weights):
+    """{name: shard} with hash(name) mod K, the baseline that reshuffles on every change"""
+    return {name: shards[name_hash(name) % len(shards)] for name in weights}
+
+
+def balance(placed, weights, shards):
+    """{shard: {'names', 'load', 'share'}} plus the max/mean load ratio"""
+    stats = {s: {'names': 0, 'load': 0} for s in shards}
+    for name, shard in placed.items():
+        stats[shard]['names'] += 1
+        stats[shard]['load'] += weights[name]
+    total = sum(s['load'] for s in stats.values()) or 1
+    for s in stats.values():
+        s['share'] = s['load'] / total
+    mean = total / len(shards)
+    return stats, max(s['load'] for s in stats.values()) / mean
+
+
+def disruption(before, after, weights):
+    """(share of names, share of query load) whose shard differs between two assignments"""
+    moved = [n for n in before if after.get(n) != before[n]]
+    total = sum(weights.values()) or 1
+    return len(moved) / (len(before) or 1), sum(weights[n] for n in moved) / total
+
+
+def compare(weights, shards, epsilon=EPSILON, vnodes=VNODES):
+    """
+    Load balance and disruption on removing the last shard / adding one more,
+    for modulo hashing, consistent hashing and consistent hashing with bounded loads
+    """
+    added = shards + [f'{RESOLVER_HOSTS}{len(shards) + 1}']
+    fewer = shards[:-1] or shards
+    strategies = [
+        ('modulo', lambda s: modulo_assign(s, weights)),
+        ('consistent', lambda s: assign(HashRing(s, vnodes), weights, None)),
+        (f'bounded (eps {epsilon:g})', lambda s: assign(HashRing(s, vnodes), weights, epsilon)),
+    ]
+    rows = []
+    for label, place in strategies:
+        base = place(shards)
+        stats, peak = balance(base, weights, shards)
+        row = {'strategy': label, 'max_over_mean': round(peak, 3), 'per_shard': stats}
+        for change, other in (('remove', fewer), ('add', added)):
+            names, load = disruption(base, place(other), weights)
+            row[f'{change}_moved_names'] = round(names, 4)
+            row[f'{change}_moved_load'] = round(load, 4)
+        rows.append(row)
+    # The least any scheme can move: the removed shard's names, or a fair share for the new one
+    ideal = {'remove': 1 / len(shards) if len(shards) > 1 else 0.0, 'add': 1 / len(added)}
+    return rows, ideal
+
+
+def load_weights(domains=None, workload=None):
+    """{lower-cased name: query count} from domain files (one query per listed name) or a workload"""
+    if workload:
+        import numpy as np
+        from .workload import load_workload
+        spec, records = load_workload(workload)
+        counts = np.bincount(records['name'])
+        idx = np.flatnonzero(counts)
+        return dict(zip(spec.names_for(idx), counts[idx].tolist()))
+    from .work_queue import DEFAULT_DOMAINS, HOSTS, assign_domains, load_domain_files
+    files = load_domain_files(domains or DEFAULT_DOMAINS)
+    assignment, _ = assign_domains(files, HOSTS, dedup=False)
+    return Counter(name.lower() for names in assignment.values() for name in names)
+
+
+def resolver_hosts(net):
+    """[(host name, IP)] of the resolver shards in a DNSLinear network: dns, dns2, ..."""
+    names = sorted((n for n in net.keys() if n == RESOLVER_HOSTS or
+                    (n.startswith(RESOLVER_HOSTS) and n[len(RESOLVER_HOSTS):].isdigit())),
+                   key=lambda n: int(n[len(RESOLVER_HOSTS):] or 1))
+    return [(n, net.get(n).IP()) for n in names]
+
+
+# ============================================================================
+# Mininet harness (bench part s)
+# ============================================================================
+
+def _snapshot(net, pids, stats_files):
+    """Current per-shard resolver counters (summed over workers), {} for a shard that is down"""
+    from .resolver_pool import COUNTERS
+    for shard, pid in pids.items():
+        net.get(shard).cmd(f'kill -USR1 {pid}')
+    time.sleep(0.5)
+    counters = {}
+    for shard in pids:
+        path = stats_files[shard]
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                per_worker = json.load(f)['per_worker']
+            counters[shard] = {c: sum(w[c] for w in per_worker) for c in COUNTERS}
+    return counters
+
+
+def shard_bench(net, domains=None, epsilon=EPSILON, vnodes=VNODES, cache_slots=None, timeout=2.0):
+    """
+    Start the caching resolver on every shard (dnsmasq is paused) and send
+    each host's names straight to their shard, in four passes:
+      warm     cold caches, K shards
+      steady   the same names again (per-shard hit rate, load balance)
+      remove   the last shard stopped, names re-routed over K-1 shards
+      add      the last shard restarted cold, names routed over K again
+    Reports per-shard load and hit rate, upstream fetches per distinct name
+    (1.0 = no name cached twice) and the predicted vs observed disruption.
+    """
+    from .resolver_pool import (CACHE_SLOTS, COUNTERS, collect_replay_results, pause_dnsmasq, restore_dnsmasq,
+                                run_replay_clients, start_pool, stop_pool)
+    from .run_registry import percentile, record_run, topology_config
+    from .work_queue import DEFAULT_DOMAINS, HOSTS, assign_domains, load_domain_files
+
+    shards = resolver_hosts(net)
+    ips = dict(shards)
+    names = [n for n, _ in shards]
+    cache_slots = cache_slots or CACHE_SLOTS
+
+    print("\n" + "="*80)
+    print(f"SHARDED RESOLVERS: {len(names)} shard(s) ({', '.join(f'{n} {ip}' for n, ip in shards)}), "
+          f"bounded load eps {epsilon:g}")
+    print("="*80)
+
+    cwd = os.getcwd()
+    files = load_domain_files(domains or DEFAULT_DOMAINS, cwd)
+    if not files:
+        print(f"[FAIL] No domain files match {domains or DEFAULT_DOMAINS}")
+        return
+    assignment, _ = assign_domains(files, HOSTS, dedup=False)
+    host_names = {h: [n.lower() for n in ns] for h, ns in assignment.items() if ns}
+    weights = Counter(n for ns in host_names.values() for n in ns)
+
+    placements = {'all': assign(HashRing(names, vnodes), weights, epsilon)}
+    phases = [('warm', 'all'), ('steady', 'all')]
+    if len(names) > 1:
+        placements['fewer'] = assign(HashRing(names[:-1], vnodes), weights, epsilon)
+        phases += [('remove', 'fewer'), ('add', 'all')]
+    else:
+        print("[NOTE] One resolver: no shard change to measure (use bench --resolvers K, K > 1)")
+    predicted = {}
+    if 'fewer' in placements:
+        predicted['remove'] = disruption(placements['all'], placements['fewer'], weights)
+        predicted['add'] = disruption(placements['fewer'], placements['all'], weights)
+
+    # One schedule per (phase, host, shard): each host sends every name straight to its shard
+    schedules = {}
+    for phase, placement in phases:
+        for host_name, host_list in host_names.items():
+            per_shard = {}
+            for name in host_list:
+                per_shard.setdefault(placements[placement][name], []).append(name)
+            for shard, shard_names in per_shard.items():
+                path = f'/tmp/shard_{phase}_{host_name}_{shard}.sched'
+                with open(path, 'w') as f:
+                    for name in shard_names:
+                        f.write(f"0.000000 1 {name}\n")
+                schedules.setdefault(phase, {}).setdefault(host_name, {})[shard] = path
+
+    dns_host = net.get(names[0])
+    had_dnsmasq = pause_dnsmasq(dns_host)
+
+    stats_files = {s: f'/tmp/shard_{s}_stats.json' for s in names}
+    pids = {}
+
+    def start(shard):
+        pids[shard] = start_pool(net.get(shard), ips[shard], stats_files[shard], f'/tmp/shard_{shard}.log',
+                                 cache_slots=cache_slots, cwd=cwd)
+
+    def stop(shard):
+        stop_pool(net.get(shard), pids.pop(shard))
+
+    rows = []
+    try:
+        for shard in names:
+            start(shard)
+        time.sleep(1.5)
+        print(f"[*] dnsmasq paused; resolver started on {len(names)} shard(s), {cache_slots} cache slots each; "
+              f"{len(weights)} distinct names, {sum(weights.values())} queries per pass")
+
+        for phase, placement in phases:
+            if phase == 'remove':
+                stop(names[-1])
+                time.sleep(1)
+            elif phase == 'add':
+                start(names[-1])
+                time.sleep(1.5)
+            before = _snapshot(net, pids, stats_files)
+
+            senders = {h: [(path, f'/tmp/shard_{phase}_{h}_{shard}.json', ips[shard])
+                           for shard, path in per_shard.items()]
+                       for h, per_shard in schedules[phase].items()}
+            run_replay_clients(net, senders, timeout, cwd)
+            time.sleep(0.6)          # let the resolvers publish their counters
+            after = _snapshot(net, pids, stats_files)
+
+            per_shard = {}
+            for shard in names:
+                if shard in after:
+                    b = before.get(shard) or dict.fromkeys(COUNTERS, 0)
+                    per_shard[shard] = {c: after[shard][c] - b[c] for c in COUNTERS}
+            samples, latencies, queries, timeouts, _ = collect_replay_results(senders, timeout)
+
+            served = sum(c['queries'] for c in per_shard.values())
+            hits = sum(c['hits'] for c in per_shard.values())
+            row = {
+                'phase': phase,
+                'shards': len(per_shard),
+                'queries': queries,
+                'timeouts': timeouts,
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'hit_pct': round(hits * 100 / served, 1) if served else 0.0,
+                'upstream_fetches': sum(c['answers'] for c in per_shard.values()),
+                'per_shard': {s: {**c, 'share': round(c['queries'] / served, 4) if served else 0.0,
+                                  'hit_pct': round(c['hits'] * 100 / c['queries'], 1) if c['queries'] else 0.0}
+                              for s, c in per_shard.items()},
+            }
+            rows.append(row)
+            row['run_id'] = record_run('sharding', {
+                'resolver_ip': ','.join(ips[s] for s in per_shard),
+                'resolver_backend': 'cn_a2 resolver shards (consistent hashing, bounded loads)',
+                'mode': f'{phase} shards={len(per_shard)}',
+                'shards': len(per_shard),
+                'epsilon': epsilon,
+                'vnodes': vnodes,
+                'cache_slots': cache_slots,
+                'timeout_s': timeout,
+                'domains': domains or DEFAULT_DOMAINS,
+                'topology': topology_config(net),
+            }, samples, root=f'{cwd}/results/runs')
+            print(f"    {phase:<7} {queries} queries over {len(per_shard)} shard(s): hit {row['hit_pct']:.1f}%, "
+                  f"{row['upstream_fetches']} upstream fetches, p99 {row['p99_ms']:.1f} ms, {timeouts} timeouts")
+    finally:
+        for shard in list(pids):
+            stop(shard)
+        restore_dnsmasq(dns_host, had_dnsmasq)
+
+    by_phase = {r['phase']: r for r in rows}
+    steady = by_phase.get('steady')
+    lines = [f"{'Shard':<6} {'IP':<10} {'Names':>7} {'Load %':>7} {'Queries':>8} {'Hit %':>6} {'Upstream':>9}",
+             "-"*60]
+    if steady:
+        stats, peak = balance(placements['all'], weights, names)
+        warm = by_phase['warm']['per_shard']
+        for shard in names:
+            c = steady['per_shard'].get(shard, {})
+            lines.append(f"{shard:<6} {ips[shard]:<10} {stats[shard]['names']:>7} {stats[shard]['share'] * 100:>7.1f} "
+                         f"{c.get('queries', 0):>8} {c.get('hit_pct', 0.0):>6.1f} "
+                         f"{warm.get(shard, {}).get('answers', 0):>9}")
+        lines.append("-"*60)
+        lines.append(f"Max/mean load {peak:.2f}; warm pass fetched {by_phase['warm']['upstream_fetches']} answers "
+                     f"for {len(weights)} distinct names "
+                     f"({by_phase['warm']['upstream_fetches'] / len(weights):.2f} per name, 1.00 = no duplicates)")
+    for change in ('remove', 'add'):
+        if change in by_phase and steady:
+            moved_names, moved_load = predicted[change]
+            refetched = max(by_phase[change]['upstream_fetches'] - steady['upstream_fetches'], 0)
+            by_phase[change]['refetched_names'] = refetched
+            lines.append(f"{change.capitalize():<6} {names[-1]}: {moved_names:.1%} of names ({moved_load:.1%} of queries) "
+                         f"re-routed; observed {refetched} extra upstream fetches ({refetched / len(weights):.1%} "
+                         f"of names), hit rate {steady['hit_pct']:.1f}% -> {by_phase[change]['hit_pct']:.1f}%")
+    print("\n" + '\n'.join(lines))
+    print("\nLoad % = share of the query load placed on the shard; Upstream = answers the shard fetched "
+          "in the warm pass; a re-routed name misses on its new shard until cached there, so it is "
+          "fetched upstream again")
+
+    os.makedirs(f'{cwd}/results', exist_ok=True)
+    with open(f'{cwd}/results/shard_bench.txt', 'w') as f:
+        f.write("="*80 + "\n")
+        f.write(f"SHARDED RESOLVERS ({len(names)} shards, eps {epsilon:g}, {vnodes} vnodes); runs: "
+                + ', '.join(r['run_id'] for r in rows) + "\n")
+        f.write("="*80 + "\n\n")
+        f.write('\n'.join(lines) + "\n")
+    with open(f'{cwd}/results/shard_bench.json', 'w') as f:
+        json.dump({'shards': dict(shards), 'epsilon': epsilon, 'vnodes': vnodes, 'cache_slots': cache_slots,
+                   'distinct_names': len(weights),
+                   'predicted_disruption': {c: {'moved_names': n, 'moved_load': q} for c, (n, q) in predicted.items()},
+                   'phases': rows}, f, indent=2)
+    print(f"\n[OK] Summary saved to results/shard_bench.txt (per-phase counters in shard_bench.json)")
+    return rows
+
+
+def run(args):
+    """`cn_a2 shards` entry point"""
+    if args.shards < 1:
+        print("[FAIL] --shards must be at least 1")
+        return 2
+    weights = load_weights(args.domains, args.workload)
+    if not weights:
+        print(f"[FAIL] No names in {args.workload or args.domains}")
+        return 1
+    shards = [RESOLVER_HOSTS] + [f'{RESOLVER_HOSTS}{k}' for k in range(2, args.shards + 1)]
+    start = time.perf_counter()
+    rows, ideal = compare(weights, shards, args.epsilon, args.vnodes)
+
+    print("="*80)
+    print(f"SHARD PLACEMENT: {len(weights)} names, {sum(weights.values())} queries over {len(shards)} shards "
+          f"({args.vnodes} vnodes)")
+    print("="*80)
+    print(f"{'Strategy':<20} {'Max/mean':>9} {'Remove: names':>14} {'load':>7} {'Add: names':>11} {'load':>7}")
+    print("-"*80)
+    for r in rows:
+        print(f"{r['strategy']:<20} {r['max_over_mean']:>9.2f} {r['remove_moved_names']:>14.1%} "
+              f"{r['remove_moved_load']:>7.1%} {r['add_moved_names']:>11.1%} {r['add_moved_load']:>7.1%}")
+    print("-"*80)
+    print(f"{'minimum':<20} {1.0:>9.2f} {ideal['remove']:>14.1%} {'':>7} {ideal['add']:>11.1%}")
+    print(f"\nRemove = stop {shards[-1]}; Add = a new shard {RESOLVER_HOSTS}{len(shards) + 1}. "
+          f"Moved queries miss on their new shard.")
+    print(f"\nPer shard ({rows[-1]['strategy']}):")
+    for shard, s in rows[-1]['per_shard'].items():
+        print(f"  {shard:<6} {s['names']:>8} names {s['share']:>7.1%} of queries")
+    print(f"\n[*] Placed in {time.perf_counter() - start:.2f}s")
+    return 0
@@ -0,0 +1,269 @@
+"""
+Domain Set Sketches and Cross-Capture Overlap
+`cn_a2 extract` builds two small sketches of every capture's query names in
+the same pass that extracts them (domains/sketches/<capture>.json):
+  - a bottom-k MinHash (the k smallest 64-bit name hashes) for Jaccard
+    similarity between captures (exact when a capture has fewer than k names)
+  - a HyperLogLog (2^p registers) whose register-wise max over any set of
+    captures estimates the cardinality of their union
+
+`cn_a2 overlap` estimates pairwise overlap and the corpus union from the
+sketches alone, and with it how many cold misses one resolver cache shared
+by all clients saves over per-client caches: sum of distinct names per
+capture vs. distinct names in the union.
+
+Run outside Mininet: python3 -m cn_a2 overlap [--sketch-dir domains/sketches] [--exact]
+"""
+
+import base64
+import csv
+import glob
+import hashlib
+import heapq
+import json
+import math
+import os
+import time
+from itertools import combinations
+
+SKETCH_DIR = 'domains/sketches'
+MINHASH_K = 256            # Jaccard standard error about 1/sqrt(k) = 6%
+HLL_P = 14                 # 16384 registers, about 0.8% standard error
+MASK64 = (1 << 64) - 1
+
+
+def name_hash(domain):
+    """64-bit hash of a case-folded domain name"""
+    return int.from_bytes(hashlib.blake2b(domain.lower().rstrip('.').encode(), digest_size=8).digest(), 'big')
+
+
+class MinHash:
+    """Bottom-k MinHash: the k smallest distinct hash values of a set"""
+
+    def __init__(self, k=MINHASH_K, values=()):
+        self.k = k
+        self._members = set(values)
+        self._heap = [-v for v in self._members]    # max-heap of the kept values
+        heapq.heapify(self._heap)
+
+    def add_hash(self, h):
+        if h in self._members:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            self._members.discard(-heapq.heapreplace(self._heap, -h))
+            self._members.add(h)
+
+    @property
+    def values(self):
+        return sorted(self._members)
+
+    def jaccard(self, other):
+        """Estimated |A & B| / |A | B| from the bottom-k of the union"""
+        k = min(self.k, other.k)
+        union = sorted(self._members | other._members)
+        if not union:
+            return 0.0
+        cutoff = union[min(k, len(union)) - 1]     # largest value in the union's bottom-k
+        both = self._members & other._members
+        return sum(1 for v in both if v <= cutoff) / min(k, len(union))
+
+
+class HyperLogLog:
+    """HyperLogLog over 64-bit hashes; merge() is register-wise max (set union)"""
+
+    def __init__(self, p=HLL_P, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    def add_hash(self, h):
+        idx = h >> (64 - self.p)
+        w = (h << self.p) & MASK64
+        rank = min(64 - w.bit_length() + 1, 64 - self.p + 1)
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError(f"cannot merge HyperLogLogs with p={self.p} and p={other.p}")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def cardinality(self):
+        """
+        Ertl's improved estimator (arXiv:1702.01284): corrects the small- and
+        large-range bias of the raw HLL estimate from the register histogram
+        alone, so there is no switch to linear counting (and no biased band
+        between about 2.5m and 5m) and no empirical bias tables
+        """
+        m, q = self.m, 64 - self.p
+        counts = [0] * (q + 2)
+        for r in self.registers:
+            counts[r] += 1
+        if counts[0] == m:
+            return 0.0
+        z = m * _hll_tau(1 - counts[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + counts[k])
+        z += m * _hll_sigma(counts[0] / m)
+        return m * m / (2 * math.log(2) * z)
+
+
+def _hll_sigma(x):
+    """sigma(x) = x + sum_k x^(2^k) 2^(k-1) of Ertl's estimator"""
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        z_old = z
+        z += x * y
+        y += y
+        if z == z_old:
+            return z
+
+
+def _hll_tau(x):
+    """tau(x) = (1 - x - sum_k (1 - x^(2^-k))^2 2^-k) / 3 of Ertl's estimator"""
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        z_old = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == z_old:
+            return z / 3
+
+
+class CaptureSketch:
+    """MinHash + HyperLogLog of one capture's distinct query names"""
+
+    def __init__(self, name, k=MINHASH_K, p=HLL_P):
+        self.name = name
+        self.distinct = 0
+        self.minhash = MinHash(k)
+        self.hll = HyperLogLog(p)
+
+    def add(self, domain):
+        h = name_hash(domain)
+        self.minhash.add_hash(h)
+        self.hll.add_hash(h)
+
+    def to_dict(self):
+        return {
+            'capture': self.name,
+            'distinct': self.distinct,
+            'minhash_k': self.minhash.k,
+            'minhash': self.minhash.values,
+            'hll_p': self.hll.p,
+            'hll': base64.b64encode(bytes(self.hll.registers)).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        sketch = cls(d['capture'], d['minhash_k'], d['hll_p'])
+        sketch.distinct = d['distinct']
+        sketch.minhash = MinHash(d['minhash_k'], d['minhash'])
+        sketch.hll = HyperLogLog(d['hll_p'], base64.b64decode(d['hll']))
+        return sketch
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+
+def load_sketches(sketch_dir=SKETCH_DIR):
+    sketches = []
+    for path in sorted(glob.glob(os.path.join(sketch_dir, '*.json'))):
+        with open(path, 'r') as f:
+            sketches.append(CaptureSketch.from_dict(json.load(f)))
+    return sketches
+
+
+def pairwise(sketches):
+    """[(a, b, jaccard, estimated shared names)] for every pair, most similar first"""
+    pairs = []
+    for a, b in combinations(sketches, 2):
+        j = a.minhash.jaccard(b.minhash)
+        shared = j * (a.distinct + b.distinct) / (1 + j)   # |A & B| from J and the exact set sizes
+        pairs.append((a.name, b.name, j, shared))
+    pairs.sort(key=lambda p: -p[2])
+    return pairs
+
+
+def union_cardinality(sketches):
+    union = HyperLogLog(sketches[0].hll.p)
+    for s in sketches:
+        union.merge(s.hll)
+    return union.cardinality()
+
+
+def _exact_sets(domains_dir, names):
+    """Case-folded domain sets from the extracted domain lists, where present"""
+    sets = {}
+    for name in names:
+        path = os.path.join(domains_dir, f'domains_{name}.txt')
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                sets[name] = {line.strip().lower() for line in f if line.strip()}
+    return sets
+
+
+def run(args):
+    """`cn_a2 overlap` entry point"""
+    start = time.perf_counter()
+    sketches = load_sketches(args.sketch_dir)
+    if len(sketches) < 2:
+        print(f"[FAIL] Need sketches of at least two captures in {args.sketch_dir} (run `cn_a2 extract` first)")
+        return 1
+    pairs = pairwise(sketches)
+    union = union_cardinality(sketches)
+    total = sum(s.distinct for s in sketches)
+    elapsed = time.perf_counter() - start
+
+    print("="*80)
+    print(f"DOMAIN OVERLAP ACROSS {len(sketches)} CAPTURES "
+          f"(MinHash k={sketches[0].minhash.k}, HyperLogLog p={sketches[0].hll.p})")
+    print("="*80)
+    print(f"[*] Distinct names per capture, summed:  {total}")
+    print(f"[*] Distinct names in the union (HLL):   {union:.0f}  (+-{104 / math.sqrt(1 << sketches[0].hll.p):.1f}% std. error)")
+    saved = 1 - union / total if total else 0.0
+    print(f"[*] Shared resolver cache: ~{union:.0f} cold misses instead of {total} "
+          f"with per-client caches ({saved:.1%} fewer)")
+    print(f"[*] Estimated in {elapsed * 1000:.0f} ms")
+
+    print(f"\nMost similar pairs (of {len(pairs)}):")
+    print(f"  {'Capture A':<24} {'Capture B':<24} {'Jaccard':>8} {'~Shared names':>14}")
+    for a, b, j, shared in pairs[:args.top]:
+        print(f"  {a:<24} {b:<24} {j:>8.3f} {shared:>14.0f}")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['capture_a', 'capture_b', 'jaccard', 'shared_names_est'])
+            writer.writerows((a, b, round(j, 4), round(shared, 1)) for a, b, j, shared in pairs)
+        print(f"\n[OK] All pairs saved to {args.csv}")
+
+    if args.exact:
+        sets = _exact_sets(args.domains_dir, [s.name for s in sketches])
+        if len(sets) < len(sketches):
+            print(f"\n[NOTE] Exact check skipped: domain lists for only {len(sets)} of {len(sketches)} captures")
+            return 0
+        exact_union = len(set().union(*sets.values()))
+        print(f"\nExact check against {args.domains_dir}: union {exact_union} "
+              f"(HLL error {(union - exact_union) / exact_union:+.2%})")
+        worst = 0.0
+        for a, b, j, _ in pairs:
+            sa, sb = sets[a], sets[b]
+            inter = len(sa & sb)
+            union_ab = len(sa) + len(sb) - inter
+            exact = inter / union_ab if union_ab else 0.0
+            worst = max(worst, abs(j - exact))
+        print(f"  Largest Jaccard error over {len(pairs)} pairs: {worst:.3f}")
+    return 0
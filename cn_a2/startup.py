@@ -0,0 +1,74 @@
+"""
+CLI Cold Start Timing
+Runs `python3 -m cn_a2 <command> --help` in fresh interpreters and reports
+the wall-clock start-up time per subcommand, plus whether any heavy
+dependency was imported (from `python -X importtime`)
+
+Run outside Mininet: python3 -m cn_a2 startup [--runs 5] [--output results/startup_times.csv]
+"""
+
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ('scapy', 'numpy', 'matplotlib', 'mininet')
+
+
+def _time_once(argv):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *argv], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def _imported_modules(argv):
+    """Top-level packages imported by one run, from -X importtime's stderr"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *argv],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    names = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            if name != 'imported package':
+                names.add(name.split('.')[0])
+    return names
+
+
+def measure(argv, runs=5):
+    """(median, min, max) start-up seconds and heavy modules loaded for one command line"""
+    times = [_time_once(argv) for _ in range(runs)]
+    heavy = sorted(m for m in _imported_modules(argv) if m in HEAVY_MODULES)
+    return statistics.median(times), min(times), max(times), heavy
+
+
+def run(args):
+    """`cn_a2 startup` entry point"""
+    from .cli import subcommands
+
+    cases = [('python (baseline)', ['-c', 'pass']), ('cn_a2 --help', ['-m', 'cn_a2', '--help'])]
+    cases += [(f'cn_a2 {name} --help', ['-m', 'cn_a2', name, '--help']) for name in subcommands()]
+
+    print("\n" + "="*80)
+    print(f"CLI COLD START ({args.runs} fresh interpreters per command)")
+    print("="*80)
+    print(f"{'Command':<28} {'Median (ms)':>12} {'Min (ms)':>10} {'Max (ms)':>10}  Heavy imports")
+    print("-"*80)
+
+    rows = []
+    for label, argv in cases:
+        median, lo, hi, heavy = measure(argv, args.runs)
+        rows.append((label, median, lo, hi, heavy))
+        print(f"{label:<28} {median * 1000:>12.1f} {lo * 1000:>10.1f} {hi * 1000:>10.1f}  "
+              f"{', '.join(heavy) or '-'}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['command', 'median_ms', 'min_ms', 'max_ms', 'heavy_imports'])
+            for label, median, lo, hi, heavy in rows:
+                writer.writerow([label, round(median * 1000, 1), round(lo * 1000, 1),
+                                 round(hi * 1000, 1), ' '.join(heavy)])
+        print(f"\n[OK] Timings saved: {args.output}")
@@ -0,0 +1,208 @@
+"""
+Link Parameter Sweeps
+Runs harnesses over a matrix of DNSLinear link parameters (delay, bandwidth,
+loss, jitter per link class) in fresh topologies, one configuration at a
+time, and stores every configuration's results by parameter tuple. A
+configuration that already has a result in the sweep directory is skipped,
+so an interrupted sweep resumes where it stopped.
+
+Run: sudo python3 -m cn_a2 sweep --vary core.delay=5ms,20ms,50ms --vary access.loss=0,1 [--parts c,d]
+     python3 -m cn_a2 sweep --vary ... --plan      # list configurations and what is cached
+"""
+
+import csv
+import json
+import os
+import shutil
+from datetime import datetime
+from itertools import product
+
+from .netstats import NETSTATS_LOG
+from .run_registry import list_runs, load_run
+
+SWEEPS_DIR = 'results/sweeps'
+# DNSLinear link classes (host<->switch, dns<->s2, switch<->switch) and tc parameters
+LINK_CLASSES = ('access', 'dns', 'core')
+LINK_PARAMS = ('bw', 'delay', 'loss', 'jitter')
+# bench options that change what the parts measure; a cached result only counts if they all match
+RESULT_OPTIONS = ('profile', 'pcaps', 'speed', 'connections', 'pipeline', 'workers', 'upstream', 'fixture',
+                  'latency_scale', 'resolver_cache', 'resolvers', 'shard_epsilon', 'domains', 'shared_queue',
+                  'hedge')
+
+
+def _value(param, text):
+    """bw in Mbps and loss in % as numbers; delay/jitter as tc strings (bare numbers are ms)"""
+    if param in ('bw', 'loss'):
+        return float(text)
+    return text if text[-1].isalpha() else f'{text}ms'
+
+
+def parse_vary(specs):
+    """['core.delay=5ms,20ms', ...] -> [('core', 'delay', ['5ms', '20ms']), ...]"""
+    dims = []
+    for spec in specs or []:
+        name, _, values = spec.partition('=')
+        link_class, _, param = name.strip().partition('.')
+        if link_class not in LINK_CLASSES or param not in LINK_PARAMS or not values:
+            raise ValueError(f"bad --vary {spec!r}: expected <{'|'.join(LINK_CLASSES)}>."
+                             f"<{'|'.join(LINK_PARAMS)}>=v1,v2,...")
+        dims.append((link_class, param, [_value(param, v.strip()) for v in values.split(',') if v.strip()]))
+    return dims
+
+
+def configurations(dims):
+    """Every combination of the dimensions as {'core.delay': '20ms', ...}"""
+    names = [f'{c}.{p}' for c, p, _ in dims]
+    return [dict(zip(names, combo)) for combo in product(*(values for _, _, values in dims))]
+
+
+def config_key(config):
+    """Directory name of a configuration: its parameters, sorted"""
+    return '_'.join(f'{k}={v:g}' if isinstance(v, float) else f'{k}={v}'
+                    for k, v in sorted(config.items())) or 'baseline'
+
+
+def topo_params(config):
+    """{'core.delay': '20ms'} -> DNSLinear(core={'delay': '20ms'}) keyword arguments"""
+    params = {}
+    for name, value in config.items():
+        link_class, param = name.split('.')
+        params.setdefault(link_class, {})[param] = value
+    return params
+
+
+def result_options(args):
+    """The RESULT_OPTIONS of a sweep invocation, as stored with each result"""
+    return {name: getattr(args, name, None) for name in RESULT_OPTIONS}
+
+
+def load_result(sweep_dir, config, parts, options):
+    """Stored result of a configuration, None if missing or from other parts or options"""
+    path = os.path.join(sweep_dir, config_key(config), 'result.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        result = json.load(f)
+    return result if result.get('parts') == parts and result.get('options') == options else None
+
+
+def _save_result(sweep_dir, config, result):
+    out_dir = os.path.join(sweep_dir, config_key(config))
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = os.path.join(out_dir, 'result.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, 'result.json'))  # a half-written result never counts as cached
+
+
+def run_configuration(config, parts, args, runs_root):
+    """Bring up DNSLinear with `config`, run `parts` and collect the runs they recorded"""
+    from .bench import network, run_parts
+
+    before = set(list_runs(runs_root))
+    with network({**topo_params(config), 'resolvers': args.resolvers}, stop_dnsmasq='c' in parts) as net:
+        run_parts(net, parts, args)
+    runs = {}
+    for run_id in sorted(set(list_runs(runs_root)) - before):
+        recorded = load_run(run_id, runs_root)
+        runs[run_id] = {'harness': recorded['config']['harness'],
+                        'mode': recorded['config'].get('mode'),
+                        'overall': recorded['metrics']['overall']}
+    return {'params': config, 'parts': parts, 'options': result_options(args), 'runs': runs,
+            'completed': datetime.now().isoformat()}
+
+
+def write_summary(sweep_dir, dims, results):
+    """Table and CSV with one row per configuration and recorded run"""
+    names = [f'{c}.{p}' for c, p, _ in dims]
+    header = names + ['harness', 'run_id', 'queries', 'failed', 'p50_ms', 'p99_ms', 'qps']
+    rows = []
+    for result in results:
+        for run_id, r in result['runs'].items():
+            o = r['overall']
+            harness = r['harness'] + (f"/{r['mode']}" if r.get('mode') else '')
+            rows.append([result['params'][n] for n in names]
+                        + [harness, run_id, o['queries'], o['failed'], o['p50_ms'], o['p99_ms'], o['qps']])
+
+    with open(os.path.join(sweep_dir, 'summary.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+    widths = [max(len(n), 8) for n in names]
+    print("\n" + "="*100)
+    print(f"SWEEP SUMMARY ({len(results)} configurations)")
+    print("="*100)
+    print(' '.join(f"{n:<{w}}" for n, w in zip(names, widths))
+          + f" {'Harness':<14} {'Queries':>8} {'Failed':>7} {'p50 (ms)':>9} {'p99 (ms)':>9} {'QPS':>8}")
+    print("-"*100)
+    for row in rows:
+        params = ' '.join(f"{str(v):<{w}}" for v, w in zip(row, widths))
+        print(f"{params} {row[len(names)]:<14} {row[-5]:>8} {row[-4]:>7} {row[-3]:>9.1f} {row[-2]:>9.1f} {row[-1]:>8.2f}")
+    print(f"\n[OK] Summary saved to {os.path.join(sweep_dir, 'summary.csv')}")
+
+
+def run(args):
+    """`cn_a2 sweep` entry point"""
+    from .bench import parse_parts
+
+    try:
+        dims = parse_vary(args.vary)
+    except ValueError as e:
+        print(f"[FAIL] {e}")
+        return 2
+    parts = parse_parts(args.parts)
+    if parts is None:
+        return 2
+
+    cwd = os.getcwd()
+    sweep_dir = os.path.join(cwd, args.root, args.name)
+    runs_root = f'{cwd}/results/runs'
+    configs = configurations(dims)
+    options = result_options(args)
+    cached = {config_key(c): load_result(sweep_dir, c, parts, options) for c in configs}
+    if args.force:
+        cached = {k: None for k in cached}
+    todo = [c for c in configs if cached[config_key(c)] is None]
+
+    print("="*80)
+    print(f"LINK PARAMETER SWEEP '{args.name}' (parts: {', '.join(p.upper() for p in parts)})")
+    print("="*80)
+    print(f"[*] {len(configs)} configurations: {len(configs) - len(todo)} cached, {len(todo)} to run")
+    if args.plan:
+        for c in configs:
+            print(f"  {'[cached]' if cached[config_key(c)] else '[todo]  '} {config_key(c)}")
+        return 0
+    if todo and os.geteuid() != 0:
+        print("[FAIL] Mininet needs root: sudo python3 -m cn_a2 sweep ...")
+        return 1
+
+    os.makedirs(sweep_dir, exist_ok=True)
+    with open(os.path.join(sweep_dir, 'sweep.json'), 'w') as f:
+        json.dump({'name': args.name, 'parts': parts, 'options': options,
+                   'dimensions': [{'link': c, 'param': p, 'values': v} for c, p, v in dims]}, f, indent=2)
+
+    failed = 0
+    for index, config in enumerate(todo, 1):
+        print(f"\n{'#'*80}")
+        print(f"# [{index}/{len(todo)}] {config_key(config)}")
+        print(f"{'#'*80}")
+        try:
+            result = run_configuration(config, parts, args, runs_root)
+        except ImportError:
+            raise  # no Mininet here: every configuration would fail the same way
+        except Exception as e:
+            # Not cached, so the next resume retries it
+            failed += 1
+            print(f"[FAIL] {config_key(config)}: {e}")
+            continue
+        _save_result(sweep_dir, config, result)
+        if args.netstats and os.path.exists(NETSTATS_LOG):
+            shutil.copy(NETSTATS_LOG, os.path.join(sweep_dir, config_key(config), 'netstats.jsonl'))
+        cached[config_key(config)] = result
+        print(f"[OK] Cached {config_key(config)} ({len(result['runs'])} runs)")
+
+    write_summary(sweep_dir, dims, [cached[config_key(c)] for c in configs if cached[config_key(c)]])
+    if failed:
+        print(f"[NOTE] {failed} configuration(s) failed; re-run the same command to retry them")
+    return 1 if failed else 0
@@ -0,0 +1,59 @@
+"""
+DNSLinear Topology
+Four hosts on a chain of four switches, with the DNS resolver hanging off S2
+(optionally K resolver shards: dns, dns2, ... dnsK, all on S2)
+
+Used by `sudo mn --custom as2dns.py --topo dnsline --nat` and `python3 -m cn_a2 bench`
+"""
+
+from mininet.topo import Topo
+from mininet.link import TCLink
+
+MAX_RESOLVERS = 8
+
+
+class DNSLinear(Topo):
+    """
+    access / dns / core: optional {'bw', 'delay', 'loss', 'jitter'} overrides
+    applied to every link of that class (host<->switch, dns<->s2,
+    switch<->switch), e.g. DNSLinear(core={'delay': '20ms', 'loss': 1})
+    resolvers: number of resolver hosts; dns is 10.0.0.5 and dns2..dnsK get
+    10.0.0.6.. with the same link to S2 (see sharding.py)
+    """
+
+    def build(self, access=None, dns=None, core=None, resolvers=1):
+        def link(a, b, cls_params, **defaults):
+            self.addLink(a, b, cls=TCLink, **{**defaults, **(cls_params or {})})
+
+        # Hosts with fixed IPs
+        h1 = self.addHost('h1', ip='10.0.0.1/24')  # H1
+        h2 = self.addHost('h2', ip='10.0.0.2/24')  # H2
+        h3 = self.addHost('h3', ip='10.0.0.3/24')  # H3
+        h4 = self.addHost('h4', ip='10.0.0.4/24')  # H4
+        dns_host = self.addHost('dns', ip='10.0.0.5/24')  # DNS Resolver
+        if not 1 <= resolvers <= MAX_RESOLVERS:
+            raise ValueError(f"resolvers must be between 1 and {MAX_RESOLVERS}")
+        shards = [self.addHost(f'dns{k}', ip=f'10.0.0.{4 + k}/24') for k in range(2, resolvers + 1)]
+
+        # Switches S1—S4
+        s1 = self.addSwitch('s1')
+        s2 = self.addSwitch('s2')
+        s3 = self.addSwitch('s3')
+        s4 = self.addSwitch('s4')
+
+        # Access links host<->switch (100 Mbps, 2 ms)
+        link(h1, s1, access, bw=100, delay='2ms')
+        link(h2, s2, access, bw=100, delay='2ms')
+        link(h3, s3, access, bw=100, delay='2ms')
+        link(h4, s4, access, bw=100, delay='2ms')
+        # DNS vertical link from S2 (100 Mbps, 1 ms)
+        link(dns_host, s2, dns, bw=100, delay='1ms')
+        for shard in shards:
+            link(shard, s2, dns, bw=100, delay='1ms')
+
+        # Switch<–>switch links left to right
+        link(s1, s2, core, bw=100, delay='5ms')
+        link(s2, s3, core, bw=100, delay='8ms')
+        link(s3, s4, core, bw=100, delay='10ms')
+
+topos = {'dnsline': (lambda **params: DNSLinear(**params))}
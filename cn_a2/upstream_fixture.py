@@ -0,0 +1,277 @@
+"""
+Upstream Record and Replay
+Part C's dnsmasq forwards to live upstreams (8.8.8.8, 8.8.4.4), so answers,
+TTLs and upstream latency differ from run to run. This module sits between
+dnsmasq and its upstream on the dns host (dnsmasq gets server=127.0.0.1#5353):
+
+  record  forwards every query upstream and writes the question, the exact
+          response bytes and the measured upstream latency to a fixture file
+          (--append adds to an existing one)
+  replay  answers from the fixture only, each response after its recorded
+          latency (times --scale), so a workload re-runs offline against the
+          same upstream behaviour
+
+A question recorded more than once is replayed in recorded order, cycling
+(e.g. the answer after a TTL expiry). Queries that timed out while recording
+time out again; questions not in the fixture get SERVFAIL.
+
+Fixture file: MAGIC, then one record per upstream exchange:
+  key length u16 | response length u16 | latency us u32 | key | response
+(key = lower-cased question; response length 0 = no answer within the timeout)
+
+Bench:  sudo python3 -m cn_a2 bench --parts c,d --upstream record
+        sudo python3 -m cn_a2 bench --parts c,d --upstream replay [--latency-scale 0.5]
+Manual: python3 -m cn_a2 upstream record|replay|show [--fixture fixtures/upstream.fix]
+"""
+
+import heapq
+import os
+import random
+import select
+import signal
+import socket
+import struct
+import sys
+import time
+
+from .dns_wire import HEADER, FLAG_QR, parse_header, question_key
+from .run_registry import percentile
+
+FIXTURE = 'fixtures/upstream.fix'
+MAGIC = b'CNA2UPFX1\n'
+RECORD = struct.Struct('!HHI')
+LISTEN = ('127.0.0.1', 5353)
+UPSTREAMS = ('8.8.8.8', '8.8.4.4')     # same upstreams as Part C's dnsmasq
+UPSTREAM_TIMEOUT = 5.0
+PID_FILE = '/tmp/cn_a2_upstream.pid'
+RCODE_SERVFAIL = 2
+BATCH = 64                 # packets drained per socket per select, as in resolver_pool
+
+
+def write_record(f, key, response, latency_s):
+    f.write(RECORD.pack(len(key), len(response), min(int(latency_s * 1e6), 0xFFFFFFFF)) + key + response)
+
+
+def read_fixture(path=FIXTURE):
+    """{question key: [(response bytes or b'', latency s), ...]} in recorded order"""
+    fixture = {}
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an upstream fixture")
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                break
+            klen, rlen, latency_us = RECORD.unpack(head)
+            key = f.read(klen)
+            response = f.read(rlen)
+            fixture.setdefault(key, []).append((response, latency_us / 1e6))
+    return fixture
+
+
+def _udp_socket(listen):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(listen)
+    sock.setblocking(False)
+    return sock
+
+
+def _stop_on_signals():
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+    return stopping
+
+
+def record(fixture=FIXTURE, listen=LISTEN, upstreams=UPSTREAMS, timeout=UPSTREAM_TIMEOUT, append=False):
+    """Forwarding proxy that writes every upstream exchange to `fixture` until SIGTERM"""
+    os.makedirs(os.path.dirname(fixture) or '.', exist_ok=True)
+    new = not append or not os.path.exists(fixture) or os.path.getsize(fixture) == 0
+    out = open(fixture, 'wb' if new else 'ab')
+    if new:
+        out.write(MAGIC)
+    sock = _udp_socket(listen)
+    up = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    up.setblocking(False)
+    upstream_addrs = [(ip, 53) for ip in upstreams]
+    pending = {}               # upstream query ID -> (client addr, client ID, key, sent)
+    next_id = random.randrange(65536)
+    next_upstream = 0
+    recorded = timeouts = send_errors = 0
+    stopping = _stop_on_signals()
+    print(f"[OK] Recording upstream exchanges on {listen[0]}:{listen[1]} -> {', '.join(upstreams)} "
+          f"into {fixture}", flush=True)
+
+    while not stopping:
+        try:
+            readable, _, _ = select.select([sock, up], [], [], 0.5)
+        except InterruptedError:
+            continue
+        if sock in readable:
+            for _ in range(BATCH):
+                try:
+                    data, addr = sock.recvfrom(4096)
+                except BlockingIOError:
+                    break
+                key = question_key(data)
+                if key is None:
+                    continue
+                while next_id in pending:
+                    next_id = (next_id + 1) & 0xFFFF
+                pending[next_id] = (addr, data[0:2], key, time.perf_counter())
+                try:
+                    up.sendto(struct.pack('!H', next_id) + data[2:], upstream_addrs[next_upstream])
+                except OSError:
+                    del pending[next_id]   # e.g. no route yet: the client retries, nothing to record
+                    send_errors += 1
+                next_id = (next_id + 1) & 0xFFFF
+                next_upstream = (next_upstream + 1) % len(upstream_addrs)
+        if up in readable:
+            for _ in range(BATCH):
+                try:
+                    data, addr = up.recvfrom(4096)
+                except BlockingIOError:
+                    break
+                header = parse_header(data)
+                entry = pending.pop(header[0], None) if header and addr in upstream_addrs else None
+                if entry is None:
+                    continue
+                client, client_id, key, sent = entry
+                latency = time.perf_counter() - sent
+                response = bytearray(data)
+                response[0:2] = b'\x00\x00'
+                write_record(out, key, bytes(response), latency)
+                recorded += 1
+                response[0:2] = client_id
+                try:
+                    sock.sendto(response, client)
+                except OSError:
+                    send_errors += 1
+        now = time.perf_counter()
+        for qid in [q for q, e in pending.items() if now - e[3] > timeout]:
+            write_record(out, pending.pop(qid)[2], b'', timeout)
+            timeouts += 1
+        out.flush()
+
+    out.close()
+    print(f"[OK] Recorded {recorded} responses and {timeouts} timeouts to {fixture} "
+          f"({send_errors} send errors)", flush=True)
+
+
+def _servfail(query):
+    header = parse_header(query)
+    flags = FLAG_QR | (header[1] & 0x0100) | 0x0080 | RCODE_SERVFAIL
+    end = HEADER.size + len(question_key(query))
+    return HEADER.pack(header[0], flags, 1, 0, 0, 0) + query[HEADER.size:end]
+
+
+def replay(fixture=FIXTURE, listen=LISTEN, scale=1.0):
+    """Answer from `fixture` with the recorded latencies times `scale` until SIGTERM"""
+    answers = read_fixture(fixture)
+    cursor = {}                # key -> index of the next recording to serve
+    sock = _udp_socket(listen)
+    due = []                   # heap of (send time, seq, response, client)
+    seq = served = dropped = unknown = 0
+    stopping = _stop_on_signals()
+    print(f"[OK] Replaying {sum(len(v) for v in answers.values())} recorded responses for "
+          f"{len(answers)} questions on {listen[0]}:{listen[1]} (latency x{scale:g})", flush=True)
+
+    while not stopping:
+        wait = max(0.0, due[0][0] - time.perf_counter()) if due else 0.5
+        try:
+            readable, _, _ = select.select([sock], [], [], min(wait, 0.5))
+        except InterruptedError:
+            continue
+        for _ in range(BATCH if readable else 0):
+            try:
+                data, addr = sock.recvfrom(4096)
+            except BlockingIOError:
+                break
+            key = question_key(data)
+            if key is None:
+                continue
+            recordings = answers.get(key)
+            if recordings is None:
+                unknown += 1
+                sock.sendto(_servfail(data), addr)
+                continue
+            i = cursor.get(key, 0)
+            cursor[key] = (i + 1) % len(recordings)
+            response, latency = recordings[i]
+            if not response:
+                dropped += 1           # timed out while recording
+                continue
+            out = bytearray(response)
+            out[0:2] = data[0:2]
+            out[HEADER.size:HEADER.size + len(key)] = data[HEADER.size:HEADER.size + len(key)]
+            heapq.heappush(due, (time.perf_counter() + latency * scale, seq, out, addr))
+            seq += 1
+        now = time.perf_counter()
+        while due and due[0][0] <= now:
+            _, _, out, addr = heapq.heappop(due)
+            sock.sendto(out, addr)
+            served += 1
+
+    print(f"[OK] Replay stopped: {served} answered, {dropped} dropped (recorded timeouts), "
+          f"{unknown} not in the fixture (SERVFAIL)", flush=True)
+
+
+# ============================================================================
+# Mininet integration (Part C)
+# ============================================================================
+
+def start_on_host(host, mode, fixture=FIXTURE, scale=1.0, cwd=None):
+    """Start the recorder or replay server in the background on `host`; returns its dnsmasq server= line"""
+    cwd = cwd or os.getcwd()
+    stop_on_host(host)
+    extra = f' --scale {scale:g}' if mode == 'replay' else ''
+    pid = host.cmd(f'cd {cwd}; {sys.executable} -m cn_a2 upstream {mode} --fixture {fixture}{extra} '
+                   f'> /tmp/cn_a2_upstream.log 2>&1 & echo $!').strip().splitlines()[-1]
+    host.cmd(f'echo {pid} > {PID_FILE}')
+    time.sleep(1)
+    print(f"[OK] Upstream {mode} running on {LISTEN[0]}:{LISTEN[1]} (PID: {pid}, fixture: {fixture})")
+    return f'server={LISTEN[0]}#{LISTEN[1]}'
+
+
+def stop_on_host(host):
+    """Stop a recorder/replay server started by start_on_host (flushes the fixture)"""
+    host.cmd(f'[ -f {PID_FILE} ] && kill $(cat {PID_FILE}) 2>/dev/null; rm -f {PID_FILE}')
+
+
+def summarize(fixture):
+    """Questions, recordings, timeouts and upstream latency percentiles of a fixture"""
+    answers = read_fixture(fixture)
+    latencies = sorted(lat * 1000 for recs in answers.values() for resp, lat in recs if resp)
+    records = sum(len(v) for v in answers.values())
+    return {
+        'questions': len(answers),
+        'records': records,
+        'timeouts': records - len(latencies),
+        'bytes': os.path.getsize(fixture),
+        'latency_p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+        'latency_p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+    }
+
+
+def run(args):
+    """`cn_a2 upstream` entry point"""
+    listen = (args.listen, args.port)
+    if args.action == 'record':
+        record(args.fixture, listen, [u.strip() for u in args.upstream.split(',') if u.strip()],
+               append=args.append)
+    elif args.action == 'replay':
+        if not os.path.exists(args.fixture):
+            print(f"[FAIL] No fixture at {args.fixture}; record one with --upstream record")
+            return 1
+        replay(args.fixture, listen, args.scale)
+    else:
+        if not os.path.exists(args.fixture):
+            print(f"[FAIL] No fixture at {args.fixture}")
+            return 1
+        s = summarize(args.fixture)
+        print(f"{args.fixture}: {s['questions']} questions, {s['records']} recorded exchanges "
+              f"({s['timeouts']} timeouts), {s['bytes'] / 1024:.1f} KiB")
+        if s['latency_p50_ms'] is not None:
+            print(f"  upstream latency p50 {s['latency_p50_ms']} ms, p99 {s['latency_p99_ms']} ms")
+    return 0
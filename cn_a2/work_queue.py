@@ -0,0 +1,123 @@
+"""
+Domain Work Distribution
+Loads any number of domain files by glob, deduplicates names across them and
+hands the work to hosts from per-host queues with stealing: a host that runs
+out of its own names takes them from the tail of the longest remaining queue,
+so the run ends when the aggregate work is done, not when the slowest host is
+"""
+
+import glob
+import os
+import re
+import threading
+from collections import deque
+
+DEFAULT_DOMAINS = 'domains/domains_PCAP_*_H*.txt'
+HOSTS = ['h1', 'h2', 'h3', 'h4']
+
+
+def load_domain_files(patterns=DEFAULT_DOMAINS, root='.'):
+    """
+    [(path, domains)] for every file matching the comma-separated glob
+    patterns (relative to `root`), in sorted path order
+    """
+    paths = set()
+    for pattern in patterns.split(','):
+        pattern = pattern.strip()
+        if pattern:
+            paths.update(glob.glob(os.path.join(root, pattern)))
+    files = []
+    for path in sorted(paths):
+        with open(path, 'r') as f:
+            files.append((path, [line.strip() for line in f if line.strip()]))
+    return files
+
+
+def host_for_file(path, hosts, index):
+    """Host named by an `_H<n>` suffix (domains_PCAP_1_H1.txt, PCAP_1_H1.pcap), otherwise round-robin by file index"""
+    match = re.search(r'_H(\d+)\.\w+$', os.path.basename(path), re.IGNORECASE)
+    if match and f'h{match.group(1)}' in hosts:
+        return f'h{match.group(1)}'
+    return hosts[index % len(hosts)]
+
+
+def assign_domains(files, hosts=HOSTS, dedup=True):
+    """
+    Initial host -> [domains] assignment. With `dedup`, a name that appears
+    in several files (case-insensitive) is only kept for the first one.
+    Returns (assignment, duplicates_dropped).
+    """
+    assignment = {host: [] for host in hosts}
+    seen = set()
+    dropped = 0
+    for index, (path, domains) in enumerate(files):
+        owner = host_for_file(path, hosts, index)
+        for domain in domains:
+            if dedup:
+                key = domain.lower()
+                if key in seen:
+                    dropped += 1
+                    continue
+                seen.add(key)
+            assignment[owner].append(domain)
+    return assignment, dropped
+
+
+class WorkStealingQueue:
+    """
+    One deque per host. get(host) pops from the front of the host's own
+    deque; once that is empty it steals from the back of the longest other
+    deque. Every item comes back as (domain, owner).
+    """
+
+    def __init__(self, assignment):
+        self._queues = {host: deque(domains) for host, domains in assignment.items()}
+        self._lock = threading.Lock()
+        self.stolen = {host: 0 for host in assignment}
+
+    def get(self, host):
+        with self._lock:
+            own = self._queues[host]
+            if own:
+                return own.popleft(), host
+            victim = max(self._queues, key=lambda h: len(self._queues[h]))
+            if not self._queues[victim]:
+                return None
+            self.stolen[host] += 1
+            return self._queues[victim].pop(), victim
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+
+def run_shared(hosts, queue, resolve):
+    """
+    Drain `queue` with one worker thread per host, calling
+    resolve(host, domain, owner) for each item. Returns host -> seconds the
+    host was busy. Exceptions in `resolve` stop that worker and are re-raised.
+    """
+    busy = {}
+    errors = []
+
+    def worker(host):
+        import time
+        start = time.time()
+        try:
+            while True:
+                item = queue.get(host)
+                if item is None:
+                    break
+                resolve(host, *item)
+        except Exception as e:
+            errors.append(e)
+        busy[host] = time.time() - start
+
+    threads = [threading.Thread(target=worker, args=(host,), name=f'queue-{host}') for host in hosts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+    return busy
@@ -0,0 +1,322 @@
+"""
+Synthetic Zipf Workloads
+Deterministic query streams far larger than the four 100-name domain files,
+for exercising cache-size limits, eviction and harness overhead at scale:
+  - `names` distinct names whose popularity follows Zipf(alpha) by rank
+  - Poisson arrivals at `qps` (0 = no timing, as fast as possible)
+  - per-host locality: with probability `locality` a host draws from its own
+    ranking (the global ranking rotated by host * names / hosts), so hosts
+    have different hot sets
+  - an NXDOMAIN share and a TTL distribution, both fixed per name (hashed
+    from the name index), and a qtype mix drawn per query
+
+Generation is vectorised in NumPy chunks, with a separate random stream per
+field, so the stream is the same for any chunk size and never held in memory
+as a whole. A workload is stored like the columnar store: records.bin (one
+fixed-width record per query; names by index) and meta.json (the spec, so
+names, TTLs and NXDOMAIN flags are re-derived rather than stored).
+
+Generate: python3 -m cn_a2 workload workloads/zipf --names 1000000 --queries 10000000 --alpha 0.9
+Use:      sudo python3 -m cn_a2 bench --parts c,r --pcaps workloads/zipf --speed afap
+          python3 -m cn_a2 simulate workloads/zipf --sizes 1000,10000,100000
+"""
+
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from .dns_wire import QTYPES
+
+RECORD_DTYPE = np.dtype([
+    ('offset_s', '<f8'),     # seconds since the start of the stream
+    ('host', 'u1'),          # 0-based host index (h1 = 0)
+    ('name', '<u4'),         # name index, see ZipfWorkload.name()
+    ('qtype', '<u2'),
+])
+DATA_FILE = 'records.bin'
+META_FILE = 'meta.json'
+CHUNK = 1 << 20
+ZONE = 'cn-a2.test'        # RFC 6761 .test: never delegated, so names only exist where a fixture says so
+NX_ZONE = 'nx.invalid'     # .invalid: NXDOMAIN from any resolver
+DEFAULT_TTLS = '30:0.1,60:0.2,300:0.4,3600:0.2,86400:0.1'
+DEFAULT_QTYPES = 'A:0.6,AAAA:0.3,HTTPS:0.1'
+NEG_TTL = 300
+MASK64 = (1 << 64) - 1
+
+
+def _parse_weights(spec, convert):
+    """'k:w,k:w' -> (keys, cumulative probabilities)"""
+    keys, weights = [], []
+    for item in spec.split(','):
+        if item.strip():
+            k, _, w = item.strip().partition(':')
+            keys.append(convert(k))
+            weights.append(float(w) if w else 1.0)
+    cdf = np.cumsum(weights) / sum(weights)
+    cdf[-1] = 1.0
+    return keys, cdf
+
+
+def _mix64(x):
+    """splitmix64 finaliser over a uint64 array (wrapping arithmetic)"""
+    x = (x + np.uint64(0x9E3779B97F4A7C15)).astype(np.uint64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _mix64_int(x):
+    """_mix64 for one Python int, without NumPy's per-call overhead"""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def _unit(x):
+    """uint64 hashes -> floats in [0, 1)"""
+    return (x >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+class ZipfWorkload:
+    """Spec of a synthetic stream; chunks() generates it, name() / name_attrs() decode name indices"""
+
+    def __init__(self, names=100000, alpha=1.0, qps=1000.0, hosts=4, locality=0.0, nxdomain=0.0,
+                 ttls=DEFAULT_TTLS, qtypes=DEFAULT_QTYPES, zone=ZONE, seed=0):
+        if not 1 <= hosts <= 255:
+            raise ValueError("hosts must be between 1 and 255")
+        if not 1 <= names < 1 << 32:
+            raise ValueError("names must be between 1 and 2^32 - 1")
+        self.names, self.alpha, self.qps = int(names), float(alpha), float(qps)
+        self.hosts, self.locality, self.nxdomain = int(hosts), float(locality), float(nxdomain)
+        self.ttls, self.qtypes, self.zone, self.seed = ttls, qtypes, zone, int(seed)
+        self._ttl_values, self._ttl_cdf = _parse_weights(ttls, int)
+        qtype_names, self._qtype_cdf = _parse_weights(qtypes, str.upper)
+        self._qtype_values = np.array([QTYPES[q] for q in qtype_names], dtype='u2')
+        self._rank_cdf = None
+        self._salt = (self.seed * 0x2545F4914F6CDD1D) & MASK64
+
+    def spec(self):
+        return {'names': self.names, 'alpha': self.alpha, 'qps': self.qps, 'hosts': self.hosts,
+                'locality': self.locality, 'nxdomain': self.nxdomain, 'ttls': self.ttls,
+                'qtypes': self.qtypes, 'zone': self.zone, 'seed': self.seed}
+
+    # ------------------------------------------------------------------ names
+
+    def name(self, i):
+        """Domain name of name index i"""
+        i = int(i)
+        return f'n{i}.{NX_ZONE}' if self.is_nx(i) else f'n{i}.{self.zone}'
+
+    def names_for(self, idx):
+        """Domain names of an array of name indices"""
+        _, nx = self.name_attrs(idx)
+        zone = self.zone
+        return [f'n{i}.{NX_ZONE}' if x else f'n{i}.{zone}' for i, x in zip(np.asarray(idx).tolist(), nx.tolist())]
+
+    def is_nx(self, i):
+        return (_mix64_int(int(i) ^ self._salt) >> 11) * (1.0 / (1 << 53)) < self.nxdomain
+
+    def name_attrs(self, idx):
+        """(ttl, nx) arrays for an array of name indices; fixed per name for a given seed"""
+        idx = np.asarray(idx, dtype=np.uint64)
+        h1 = _mix64(idx ^ np.uint64(self._salt))
+        nx = _unit(h1) < self.nxdomain
+        ttl_pick = np.searchsorted(self._ttl_cdf, _unit(_mix64(h1)), side='right')
+        ttl = np.asarray(self._ttl_values, dtype=np.int64)[np.minimum(ttl_pick, len(self._ttl_values) - 1)]
+        return np.where(nx, NEG_TTL, ttl), nx
+
+    # ------------------------------------------------------------- generation
+
+    def _ranks(self, u):
+        if self.alpha == 0:
+            return np.minimum((u * self.names).astype(np.int64), self.names - 1)
+        if self._rank_cdf is None:
+            weights = np.arange(1, self.names + 1, dtype=np.float64) ** -self.alpha
+            self._rank_cdf = np.cumsum(weights)
+            self._rank_cdf /= self._rank_cdf[-1]
+        return np.minimum(np.searchsorted(self._rank_cdf, u, side='right'), self.names - 1)
+
+    def chunks(self, queries, chunk=CHUNK):
+        """Yield RECORD_DTYPE arrays of up to `chunk` queries, `queries` in total"""
+        streams = [np.random.Generator(np.random.PCG64(s))
+                   for s in np.random.SeedSequence(self.seed).spawn(5)]
+        rank_rng, local_rng, host_rng, gap_rng, qtype_rng = streams
+        stride = self.names // self.hosts
+        t = 0.0
+        done = 0
+        while done < queries:
+            n = min(chunk, queries - done)
+            out = np.empty(n, dtype=RECORD_DTYPE)
+            host = np.minimum((host_rng.random(n) * self.hosts).astype(np.int64), self.hosts - 1)
+            rank = self._ranks(rank_rng.random(n))
+            local = local_rng.random(n) < self.locality
+            out['name'] = np.where(local, (rank + host * stride) % self.names, rank)
+            out['host'] = host
+            out['qtype'] = self._qtype_values[np.minimum(
+                np.searchsorted(self._qtype_cdf, qtype_rng.random(n), side='right'), len(self._qtype_values) - 1)]
+            if self.qps > 0:
+                offsets = np.cumsum(-np.log1p(-gap_rng.random(n)) / self.qps) + t
+                t = offsets[-1]
+                out['offset_s'] = offsets
+            else:
+                out['offset_s'] = 0.0
+            done += n
+            yield out
+
+    def write(self, directory, queries, chunk=CHUNK):
+        """Stream `queries` records to directory/records.bin plus meta.json; returns queries/s generated"""
+        os.makedirs(directory, exist_ok=True)
+        start = time.perf_counter()
+        with open(os.path.join(directory, DATA_FILE), 'wb') as f:
+            for records in self.chunks(queries, chunk):
+                records.tofile(f)
+        elapsed = time.perf_counter() - start
+        with open(os.path.join(directory, META_FILE), 'w') as f:
+            json.dump({'spec': self.spec(), 'queries': queries,
+                       'dtype': [list(field) for field in RECORD_DTYPE.descr]}, f, indent=2)
+        return queries / elapsed if elapsed > 0 else float('inf')
+
+
+# ============================================================================
+# Upstream fixture (offline answers for every name)
+# ============================================================================
+
+def _answer(qtype, i):
+    """RDATA of a synthetic answer, derived from the name index"""
+    if qtype == QTYPES['A']:
+        return struct.pack('!BBH', 198, 18 + (i >> 16 & 1), i & 0xFFFF)    # 198.18.0.0/15, benchmarking range
+    if qtype == QTYPES['AAAA']:
+        return b'\x20\x01\x0d\xb8' + struct.pack('!8xI', i)                   # 2001:db8::/32, documentation range
+    if qtype in (QTYPES['HTTPS'], QTYPES['SVCB']):
+        return b'\x00\x01\x00'                                             # priority 1, target "."
+    return b''
+
+
+def write_fixture(workload, path, latency_ms=20.0, chunk=65536):
+    """
+    Upstream fixture (upstream_fixture.py format) answering every name of the
+    workload for every qtype in its mix: NOERROR with one record and the
+    name's TTL, or NXDOMAIN with an SOA carrying NEG_TTL. Replaying it with
+    `bench --upstream replay` runs the workload offline. Returns records written.
+    """
+    from .dns_wire import HEADER, encode_name
+    from .upstream_fixture import MAGIC, write_record
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    soa_owner = encode_name(NX_ZONE)
+    soa = soa_owner + struct.pack('!HHIH', QTYPES['SOA'], 1, NEG_TTL, 0)
+    soa_rdata = encode_name(f'ns.{NX_ZONE}') + encode_name(f'hostmaster.{NX_ZONE}') + \
+        struct.pack('!IIIII', 1, 3600, 600, 86400, NEG_TTL)
+    soa = soa[:-2] + struct.pack('!H', len(soa_rdata)) + soa_rdata
+    latency_s = latency_ms / 1000
+    written = 0
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        for start in range(0, workload.names, chunk):
+            idx = np.arange(start, min(start + chunk, workload.names), dtype=np.uint64)
+            ttls, nxs = workload.name_attrs(idx)
+            for i, ttl, nx in zip(idx.tolist(), ttls.tolist(), nxs.tolist()):
+                qname = encode_name(f'n{i}.{NX_ZONE}' if nx else f'n{i}.{workload.zone}')
+                for qtype in workload._qtype_values.tolist():
+                    question = qname + struct.pack('!HH', qtype, 1)
+                    if nx:
+                        response = HEADER.pack(0, 0x8183, 1, 0, 1, 0) + question + soa
+                    else:
+                        rdata = _answer(qtype, i)
+                        response = (HEADER.pack(0, 0x8180, 1, 1, 0, 0) + question
+                                    + struct.pack('!HHHIH', 0xC00C, qtype, 1, ttl, len(rdata)) + rdata)
+                    write_record(f, question, response, latency_s)
+                    written += 1
+    return written
+
+
+# ============================================================================
+# Reading stored workloads
+# ============================================================================
+
+def is_workload(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def load_workload(directory):
+    """(ZipfWorkload, memory-mapped records) of a stored workload"""
+    with open(os.path.join(directory, META_FILE), 'r') as f:
+        meta = json.load(f)
+    records = np.memmap(os.path.join(directory, DATA_FILE), dtype=RECORD_DTYPE, mode='r',
+                        shape=(meta['queries'],)) if meta['queries'] else np.empty(0, dtype=RECORD_DTYPE)
+    return ZipfWorkload(**meta['spec']), records
+
+
+def write_host_schedule(directory, host, path, chunk=CHUNK):
+    """replay-client schedule ('<offset_s> <qtype> <qname>') of one host; returns the query count"""
+    workload, records = load_workload(directory)
+    count = 0
+    with open(path, 'w') as f:
+        for start in range(0, len(records), chunk):
+            part = records[start:start + chunk]
+            part = part[part['host'] == host]
+            if not len(part):
+                continue
+            f.write(''.join(f"{o:.6f} {q} {name}\n"
+                            for o, q, name in zip(part['offset_s'].tolist(), part['qtype'].tolist(),
+                                                  workload.names_for(part['name']))))
+            count += len(part)
+    return count
+
+
+def iter_trace(directory, chunk=CHUNK):
+    """(offset_s, name, ttl) of every query in order, for trace-driven simulation"""
+    workload, records = load_workload(directory)
+    for start in range(0, len(records), chunk):
+        part = records[start:start + chunk]
+        ttl, _ = workload.name_attrs(part['name'])
+        yield from zip(part['offset_s'].tolist(), part['name'].tolist(), ttl.tolist())
+
+
+def run(args):
+    """`cn_a2 workload` entry point"""
+    if args.profile:
+        from .domain_profile import load_profile, workload_mix
+        try:
+            mix = workload_mix(load_profile(args.profile))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[FAIL] Cannot read profile {args.profile}: {e}")
+            return 2
+        for key, value in mix.items():
+            if value is not None:
+                setattr(args, key, value)
+        print(f"[*] From {args.profile}: qtypes {args.qtypes}, ttls {args.ttls}, NXDOMAIN {args.nxdomain:.1%}")
+    try:
+        workload = ZipfWorkload(args.names, args.alpha, args.qps, args.hosts, args.locality, args.nxdomain,
+                                args.ttls, args.qtypes, args.zone, args.seed)
+    except (ValueError, KeyError) as e:
+        print(f"[FAIL] Invalid workload spec: {e}")
+        return 2
+    print("="*80)
+    print(f"ZIPF WORKLOAD -> {args.output}")
+    print("="*80)
+    print(f"[*] {args.queries} queries over {args.names} names (alpha {args.alpha:g}), {args.hosts} hosts, "
+          f"locality {args.locality:g}, NXDOMAIN {args.nxdomain:.1%}, seed {args.seed}")
+    rate = workload.write(args.output, args.queries)
+    size = os.path.getsize(os.path.join(args.output, DATA_FILE))
+    print(f"[OK] {args.queries} records ({size / 1e6:.1f} MB) written at {rate / 1e6:.1f}M queries/s")
+
+    _, records = load_workload(args.output)
+    sample = records[:min(len(records), CHUNK)]
+    if len(sample):
+        _, counts = np.unique(sample['name'], return_counts=True)
+        span = float(records[-1]['offset_s'])
+        print(f"[*] First {len(sample)} queries: {len(counts)} distinct names, "
+              f"hottest name {counts.max() / len(sample):.1%} of them")
+        if span:
+            print(f"[*] Stream spans {span:.1f}s at {len(records) / span:.0f} q/s offered")
+    if args.fixture:
+        start = time.perf_counter()
+        written = write_fixture(workload, args.fixture, args.upstream_ms)
+        print(f"[OK] Upstream fixture with {written} answers written to {args.fixture} "
+              f"in {time.perf_counter() - start:.1f}s (use: bench --upstream replay --fixture {args.fixture})")
+    return 0